@@ -1,33 +1,123 @@
+import hashlib
+import json
 import os
-from openai import OpenAI
-from typing import List, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from importlib.util import find_spec
+from typing import List, Dict, Any, Optional
 
 # Tenta a importação relativa primeiro (para uvicorn)
 try:
     from .ml_engine import ml_engine, ScreenAnalysis
+    from .metrics import CHAT_STAGE_SECONDS, GHERKIN_GENERATED, GHERKIN_VALIDATION, LLM_REQUESTS, LLM_TOKENS, LLM_FALLBACKS, LLM_COALESCED, LLM_FLIGHTS, LLM_BREAKER_STATE, LLM_BREAKER_TRANSITIONS
+    from .gherkin import validate_llm_output, build_repair_prompt
+    from .singleflight import SingleFlight
+    from .circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError
+    from .user_memory import AgentMemory, agent_memories
 except ImportError:
     from ml_engine import ml_engine, ScreenAnalysis
+    from metrics import CHAT_STAGE_SECONDS, GHERKIN_GENERATED, GHERKIN_VALIDATION, LLM_REQUESTS, LLM_TOKENS, LLM_FALLBACKS, LLM_COALESCED, LLM_FLIGHTS, LLM_BREAKER_STATE, LLM_BREAKER_TRANSITIONS
+    from gherkin import validate_llm_output, build_repair_prompt
+    from singleflight import SingleFlight
+    from circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError
+    from user_memory import AgentMemory, agent_memories
 
-# Inicializa o cliente OpenAI
-# As variáveis de ambiente OPENAI_API_KEY e BASE_URL são configuradas automaticamente
-try:
-    # Verifica se há API key configurada
-    api_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENAI_KEY")
-    if not api_key:
-        print("⚠️ OPENAI_API_KEY não configurada. Funcionalidade LLM desabilitada.")
-        print("   Configure a variável de ambiente OPENAI_API_KEY para usar o LLM.")
-        print("   O sistema usará o motor ML local como fallback.")
-        client = None
-    else:
-        client = OpenAI(api_key=api_key)
+# ============================================
+# CLIENTE LLM (INICIALIZAÇÃO PREGUIÇOSA)
+# ============================================
+
+# O pacote openai e o cliente só são carregados no primeiro uso, para que workers que
+# atendem apenas /scrumban ou /billing não paguem esse custo no cold start.
+# `agent.client` continua acessível (e substituível) como atributo do módulo.
+_client_lock = threading.Lock()
+
+
+def _get_api_key() -> Optional[str]:
+    return os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENAI_KEY")
+
+
+def _create_client():
+    """Importa o openai e constrói o cliente. Retorna None se não houver API key ou em caso de erro."""
+    # As variáveis de ambiente OPENAI_API_KEY e BASE_URL são configuradas automaticamente
+    try:
+        api_key = _get_api_key()
+        if not api_key:
+            print("⚠️ OPENAI_API_KEY não configurada. Funcionalidade LLM desabilitada.")
+            print("   Configure a variável de ambiente OPENAI_API_KEY para usar o LLM.")
+            print("   O sistema usará o motor ML local como fallback.")
+            return None
+        from openai import OpenAI
+        llm_client = OpenAI(api_key=api_key)
         print("✅ Cliente OpenAI inicializado com sucesso.")
-except Exception as e:
-    print(f"⚠️ Erro ao inicializar o cliente OpenAI: {e}")
-    client = None
+        return llm_client
+    except Exception as e:
+        print(f"⚠️ Erro ao inicializar o cliente OpenAI: {e}")
+        return None
+
+
+def get_client():
+    """Retorna o cliente LLM, construindo-o no primeiro uso (thread-safe)."""
+    module_globals = globals()
+    if "client" in module_globals:
+        return module_globals["client"]
+    with _client_lock:
+        if "client" not in module_globals:
+            module_globals["client"] = _create_client()
+    return module_globals["client"]
+
+
+def __getattr__(name: str):
+    # Acesso a `agent.client` antes do primeiro uso dispara a inicialização
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Modelo a ser utilizado
 MODEL_NAME = os.environ.get("LLM_MODEL", "gpt-4o-mini")
 
+# Novas tentativas pedindo correção quando o LLM devolve Gherkin inválido
+GHERKIN_MAX_RETRIES = int(os.environ.get("GHERKIN_MAX_RETRIES", 1))
+
+# Chamadas ao LLM em andamento, por prompt normalizado
+llm_flights = SingleFlight()
+LLM_FLIGHTS.set_function(lambda: len(llm_flights))
+
+# ============================================
+# RESILIÊNCIA DO LLM (CIRCUIT BREAKER, PRAZOS E HEDGE)
+# ============================================
+
+# Prazo total da chamada ao LLM (inclui as novas tentativas de correção)
+LLM_DEADLINE_SECONDS = float(os.environ.get("LLM_DEADLINE_SECONDS", 30))
+# SLA de resposta: passado esse tempo, devolve o resultado do motor ML (0 desativa)
+LLM_HEDGE_SECONDS = float(os.environ.get("LLM_HEDGE_SECONDS", 0))
+
+# Durante uma indisponibilidade o circuito abre e o motor ML local responde na hora
+llm_breaker = CircuitBreaker(
+    "llm",
+    window_size=int(os.environ.get("LLM_BREAKER_WINDOW", 20)),
+    min_calls=int(os.environ.get("LLM_BREAKER_MIN_CALLS", 5)),
+    failure_rate=float(os.environ.get("LLM_BREAKER_FAILURE_RATE", 0.5)),
+    slow_call_s=float(os.environ.get("LLM_SLOW_CALL_SECONDS", 10)),
+    slow_call_rate=float(os.environ.get("LLM_BREAKER_SLOW_RATE", 0.8)),
+    open_seconds=float(os.environ.get("LLM_BREAKER_OPEN_SECONDS", 30)),
+    on_state_change=lambda state: LLM_BREAKER_TRANSITIONS.labels(state=state.value).inc(),
+)
+_BREAKER_GAUGE = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+LLM_BREAKER_STATE.set_function(lambda: _BREAKER_GAUGE[llm_breaker.state])
+
+# As chamadas líderes rodam neste pool para que quem espera possa desistir no prazo
+_llm_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("LLM_MAX_CONCURRENCY", 16)),
+    thread_name_prefix="nebula-llm"
+)
+
+
+def shutdown_llm() -> None:
+    """Cancela as chamadas ao LLM que ainda não começaram (no shutdown do servidor)."""
+    _llm_executor.shutdown(wait=False, cancel_futures=True)
+
 # ============================================
 # SISTEMA DE PROMPTS INTELIGENTE
 # ============================================
@@ -63,42 +153,124 @@ Quando o usuário pedir para analisar uma tela:
 Sempre responda em português (pt-BR) e seja conciso mas completo."""
 
 # ============================================
-# CONTEXTO E MEMÓRIA DO AGENTE
+# RESPOSTAS PRÉ-COMPILADAS
 # ============================================
 
-class AgentMemory:
-    """Gerencia a memória e contexto do agente."""
-    
-    def __init__(self):
-        self.conversation_context = []
-        self.generated_scenarios = []
-        self.analyzed_screens = []
-        self.user_preferences = {}
-    
-    def add_context(self, role: str, content: str):
-        """Adiciona contexto à memória."""
-        self.conversation_context.append({
-            "role": role,
-            "content": content
-        })
-        # Manter apenas os últimos 20 contextos
-        if len(self.conversation_context) > 20:
-            self.conversation_context = self.conversation_context[-20:]
-    
-    def get_context(self) -> List[Dict]:
-        """Retorna o contexto atual."""
-        return self.conversation_context
-    
-    def add_scenario(self, scenario: Dict):
-        """Adiciona um cenário gerado à memória."""
-        self.generated_scenarios.append(scenario)
-    
-    def add_screen_analysis(self, analysis: Dict):
-        """Adiciona uma análise de tela à memória."""
-        self.analyzed_screens.append(analysis)
+# Esqueletos das respostas longas: as partes fixas são montadas uma vez e só os
+# trechos variáveis são preenchidos a cada requisição.
+
+GHERKIN_REPLY_HEAD = """✅ **Cenário Gherkin Gerado com Sucesso!**
+
+**Análise da Tela:**
+- 🎯 Tipo: **"""
+
+GHERKIN_REPLY_TAIL = """
+
+**Próximos Passos Recomendados:**
+1. ✅ Revisar o cenário gerado
+2. 🔄 Adaptar conforme necessário para sua aplicação
+3. 🧪 Executar o teste automatizado
+4. 📈 Validar os resultados
+5. 📝 Documentar casos de teste adicionais
+
+**Dicas:**
+- Você pode pedir para gerar variações deste cenário
+- Sugira diferentes casos de uso (sucesso, erro, validação)
+- Combine com outros cenários para cobertura completa"""
+
+ANALYSIS_REPLY_HEAD = """📊 **Análise da Tela Concluída**
+
+**Tipo de Tela Identificado:** 🎯 **"""
+
+ANALYSIS_REPLY_TAIL = """, indicando um alto grau de certeza na classificação.
+
+**Sugestões de Teste:**
+1. Validar todos os campos obrigatórios
+2. Testar validações de entrada
+3. Verificar mensagens de erro
+4. Testar fluxo de sucesso
+5. Validar comportamento em dispositivos móveis
+
+**Deseja que eu:**
+- 📝 Gere um cenário Gherkin para esta tela?
+- 🔄 Analise um fluxo completo?
+- 💡 Sugira casos de teste adicionais?"""
+
+SUGGESTIONS_REPLY_HEAD = """💡 **Sugestões de Casos de Teste**
+
+Para uma tela de **"""
+
+SUGGESTIONS_REPLY_TAIL = """**, recomendo os seguintes casos de teste:
+
+**Testes Funcionais:**
+1. ✅ Fluxo de sucesso principal
+2. ❌ Validação de campos obrigatórios
+3. ⚠️ Mensagens de erro apropriadas
+4. 🔄 Comportamento após submissão
+
+**Testes de Validação:**
+1. 📧 Validação de formato (emails, telefones, etc)
+2. 🔐 Validação de segurança (senhas, dados sensíveis)
+3. 📏 Validação de comprimento de campos
+4. 🚫 Caracteres especiais e injeção
+
+**Testes de UX/UI:**
+1. 📱 Responsividade em diferentes dispositivos
+2. ♿ Acessibilidade (WCAG)
+3. ⌨️ Navegação por teclado
+4. 🎨 Consistência visual
+
+**Testes de Performance:**
+1. ⚡ Tempo de carregamento
+2. 🔄 Requisições simultâneas
+3. 💾 Uso de memória
+
+Deseja que eu gere Gherkin para algum destes casos?"""
+
 
-# Instância global de memória
-agent_memory = AgentMemory()
+def render_gherkin_reply(screen_analysis: ScreenAnalysis, gherkin: str) -> str:
+    """Resposta do chat para um cenário Gherkin gerado."""
+    elements = screen_analysis.elements
+    return "".join((
+        GHERKIN_REPLY_HEAD, screen_analysis.screen_type.value,
+        "**\n- 📊 Confiança: **", f"{screen_analysis.confidence:.0%}",
+        "**\n- 🔍 Elementos Identificados: **", str(len(elements)),
+        "**\n\n**Cenário Gherkin:**\n```gherkin\n", gherkin,
+        "\n```\n\n**Elementos Identificados na Tela:**\n",
+        "\n".join([f"• {elem.label} ({elem.element_type.value})" for elem in elements]),
+        GHERKIN_REPLY_TAIL,
+    ))
+
+
+def render_analysis_reply(screen_analysis: ScreenAnalysis) -> str:
+    """Resposta do chat para uma análise de tela."""
+    elements = screen_analysis.elements
+    screen_type = screen_analysis.screen_type.value
+    confidence = f"{screen_analysis.confidence:.0%}"
+    return "".join((
+        ANALYSIS_REPLY_HEAD, screen_type.upper(),
+        "**\n**Nível de Confiança:** 📈 **", confidence,
+        "**\n\n**Elementos Identificados (", str(len(elements)), "):**\n",
+        "\n".join([f"• **{elem.label}** ({elem.element_type.value})" for elem in elements]),
+        "\n\n**Palavras-chave Extraídas:**\n",
+        ", ".join([f"`{kw}`" for kw in screen_analysis.keywords]),
+        "\n\n**Análise Detalhada:**\nEsta é uma tela de ", screen_type,
+        " com ", str(len(elements)), " elementos principais. \nA confiança da análise é de ", confidence,
+        ANALYSIS_REPLY_TAIL,
+    ))
+
+
+def render_suggestions_reply(screen_analysis: ScreenAnalysis) -> str:
+    """Resposta do chat com sugestões de casos de teste."""
+    return "".join((SUGGESTIONS_REPLY_HEAD, screen_analysis.screen_type.value, SUGGESTIONS_REPLY_TAIL))
+
+# ============================================
+# CONTEXTO E MEMÓRIA DO AGENTE
+# ============================================
+
+# Cada usuário tem a sua memória (cenários para busca/reaproveitamento, telas analisadas e
+# contexto), com orçamento de entradas e bytes; ver user_memory.UserMemoryManager
+DEFAULT_MEMORY_USER = "default_user"
 
 # ============================================
 # FUNÇÕES DE GERAÇÃO DE CENÁRIO GHERKIN MELHORADA
@@ -107,16 +279,40 @@ agent_memory = AgentMemory()
 def generate_gherkin_scenario(
     screen_analysis: ScreenAnalysis, 
     user_intent: str, 
-    conversation_history: List[Dict[str, str]]
+    conversation_history: List[Dict[str, str]],
+    outcome: Optional[Dict[str, Any]] = None,
+    deadline_s: Optional[float] = None,
+    hedge_s: Optional[float] = None,
+    memory: Optional[AgentMemory] = None
 ) -> str:
     """
     Gera um cenário Gherkin completo usando um LLM ou o motor de ML,
     baseado na análise de tela, intenção do usuário e histórico da conversa.
+    Se `outcome` for informado, recebe a origem do resultado em "gherkin_source" (llm, ml, ml_fallback, reuse).
+    `deadline_s` e `hedge_s` sobrepõem LLM_DEADLINE_SECONDS e LLM_HEDGE_SECONDS nesta chamada.
+    Com `memory` (a memória do usuário), reaproveita um cenário do LLM já gerado para a mesma intenção.
     """
     
     # Se o cliente LLM não está disponível, usar o motor de ML
+    client = get_client()
     if not client:
-        return ml_engine.generate_gherkin(screen_analysis, user_intent)
+        GHERKIN_GENERATED.labels(source="ml").inc()
+        if outcome is not None:
+            outcome["gherkin_source"] = "ml"
+        with CHAT_STAGE_SECONDS.labels(stage="gherkin_ml").time():
+            return ml_engine.generate_gherkin(screen_analysis, user_intent)
+
+    # Antes de pagar por uma chamada ao LLM, serve um cenário já gerado para a mesma intenção
+    reusable = memory.find_reusable_scenario(user_intent, screen_analysis.screen_type.value) if memory is not None else None
+    if reusable is not None:
+        GHERKIN_GENERATED.labels(source="reuse").inc()
+        if outcome is not None:
+            outcome["gherkin_source"] = "reuse"
+        return reusable.gherkin
+
+    # Circuito aberto: nem monta o prompt, o motor ML responde imediatamente
+    if llm_breaker.state == BreakerState.OPEN:
+        return _ml_fallback(screen_analysis, user_intent, "circuit_open", outcome)
 
     # 1. Construir o histórico de mensagens para o LLM com contexto enriquecido
     messages = [
@@ -152,35 +348,110 @@ Forneça o Gherkin em um bloco de código markdown com ```gherkin```."""
 
     messages.append({"role": "user", "content": context_prompt})
 
+    deadline = LLM_DEADLINE_SECONDS if deadline_s is None else deadline_s
+    hedge = LLM_HEDGE_SECONDS if hedge_s is None else hedge_s
+    hedged = 0 < hedge < deadline
+
+    # Requisições idênticas em andamento compartilham uma única chamada ao LLM
+    future, shared = llm_flights.submit(
+        prompt_key(messages), _llm_executor, _guarded_complete, client, messages, user_intent, deadline
+    )
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages,
-            temperature=0.3,
-            max_tokens=1500
-        )
+        gherkin = future.result(timeout=hedge if hedged else deadline)
+    except FutureTimeoutError:
+        # A chamada segue em segundo plano e ainda alimenta o breaker quando terminar
+        print(f"⏱️ LLM não respondeu em {hedge if hedged else deadline:.1f}s, usando o motor ML")
+        return _ml_fallback(screen_analysis, user_intent, "hedge" if hedged else "deadline", outcome)
+    except CircuitOpenError:
+        return _ml_fallback(screen_analysis, user_intent, "circuit_open", outcome)
+    except Exception as e:
+        print(f"❌ Erro na chamada do LLM: {e}")
+        return _ml_fallback(screen_analysis, user_intent, type(e).__name__, outcome)
+
+    if shared:
+        LLM_COALESCED.inc()
+    if gherkin is None:
+        return _ml_fallback(screen_analysis, user_intent, "invalid_gherkin", outcome)
+
+    GHERKIN_GENERATED.labels(source="llm").inc()
+    if outcome is not None:
+        outcome["gherkin_source"] = "llm"
+    return gherkin
+
+
+def prompt_key(messages: List[Dict[str, str]]) -> str:
+    """Chave do prompt normalizado (modelo + mensagens com espaços colapsados)."""
+    normalized = [(m["role"], " ".join(m["content"].split())) for m in messages]
+    payload = json.dumps([MODEL_NAME, normalized], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _guarded_complete(client, messages: List[Dict[str, str]], user_intent: str, deadline: float) -> Optional[str]:
+    """Executa `_complete_gherkin` pelo circuit breaker (uma vez por voo, não por chamador)."""
+    return llm_breaker.call(_complete_gherkin, client, messages, user_intent, deadline)
+
+
+def _complete_gherkin(client, messages: List[Dict[str, str]], user_intent: str, deadline: float) -> Optional[str]:
+    """
+    Chama o LLM e valida a saída; se estiver quebrada, pede a correção antes de desistir.
+    Retorna o Gherkin normalizado ou None se continuar inválido ou se o prazo acabar.
+    """
+    expires_at = time.monotonic() + deadline
+    for attempt in range(1 + GHERKIN_MAX_RETRIES):
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            with CHAT_STAGE_SECONDS.labels(stage="gherkin_llm").time():
+                response = client.chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=1500,
+                    timeout=remaining
+                )
+        except Exception:
+            LLM_REQUESTS.labels(outcome="error").inc()
+            raise
+        LLM_REQUESTS.labels(outcome="success").inc()
+        _record_token_usage(response)
         
-        # Extrair e limpar o texto gerado
-        gherkin_text = response.choices[0].message.content.strip()
+        raw_text = (response.choices[0].message.content or "").strip()
+        with CHAT_STAGE_SECONDS.labels(stage="gherkin_validation").time():
+            result = validate_llm_output(raw_text, default_feature=user_intent[:80])
         
-        # Tentar extrair apenas o bloco de código Gherkin
-        if "```gherkin" in gherkin_text:
-            start = gherkin_text.find("```gherkin") + len("```gherkin")
-            end = gherkin_text.find("```", start)
-            return gherkin_text[start:end].strip()
-        elif "```" in gherkin_text:
-            start = gherkin_text.find("```") + len("```")
-            end = gherkin_text.find("```", start)
-            return gherkin_text[start:end].strip()
+        if result.valid:
+            GHERKIN_VALIDATION.labels(result="repaired" if result.repaired else "valid").inc()
+            return result.text
         
-        return gherkin_text
-
-    except Exception as e:
-        print(f"❌ Erro na chamada do LLM: {e}")
-        # Fallback para o motor de ML
+        GHERKIN_VALIDATION.labels(result="invalid").inc()
+        print(f"⚠️ Gherkin inválido do LLM (tentativa {attempt + 1}): {result.summary()}")
+        messages = messages + [
+            {"role": "assistant", "content": raw_text},
+            {"role": "user", "content": build_repair_prompt(result)}
+        ]
+    return None
+
+
+def _ml_fallback(screen_analysis: ScreenAnalysis, user_intent: str, reason: str, outcome: Optional[Dict[str, Any]]) -> str:
+    """Gera pelo motor ML quando o LLM falha (o chamador estorna a cobrança)."""
+    LLM_FALLBACKS.labels(reason=reason).inc()
+    GHERKIN_GENERATED.labels(source="ml_fallback").inc()
+    if outcome is not None:
+        outcome["gherkin_source"] = "ml_fallback"
+    with CHAT_STAGE_SECONDS.labels(stage="gherkin_ml").time():
         return ml_engine.generate_gherkin(screen_analysis, user_intent)
 
 
+def _record_token_usage(response) -> None:
+    """Contabiliza os tokens informados pela API (quando presentes na resposta)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    LLM_TOKENS.labels(kind="prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.labels(kind="completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
 # ============================================
 # FUNÇÃO DE ANÁLISE DE TELA MELHORADA
 # ============================================
@@ -215,7 +486,8 @@ def simulate_screen_analysis(message: str) -> ScreenAnalysis:
             break
     
     # Usar o motor de ML para analisar a tela
-    return ml_engine.analyze_screen(screen_desc)
+    with CHAT_STAGE_SECONDS.labels(stage="screen_analysis").time():
+        return ml_engine.analyze_screen(screen_desc)
 
 
 # ============================================
@@ -230,7 +502,8 @@ def process_as_agent(message: str, state: Dict[str, Any]) -> str:
     
     msg_lower = message.lower()
     
-    # Adicionar à memória do agente
+    # Adicionar à memória do agente (a do usuário da requisição)
+    agent_memory = agent_memories.get(state.get("user_id") or DEFAULT_MEMORY_USER)
     agent_memory.add_context("user", message)
     
     # ============================================
@@ -243,40 +516,20 @@ def process_as_agent(message: str, state: Dict[str, Any]) -> str:
         agent_memory.add_screen_analysis(screen_analysis.to_dict())
         
         # 2. Gerar o cenário Gherkin
-        gherkin = generate_gherkin_scenario(screen_analysis, message, state["conversation_history"])
-        agent_memory.add_scenario({
-            "intent": message,
-            "gherkin": gherkin,
-            "screen_type": screen_analysis.screen_type.value
-        })
+        gherkin = generate_gherkin_scenario(
+            screen_analysis, message, state["conversation_history"], outcome=state,
+            deadline_s=state.get("llm_deadline_s"), hedge_s=state.get("llm_hedge_s"), memory=agent_memory
+        )
+        if state.get("gherkin_source") != "reuse":
+            agent_memory.add_scenario({
+                "intent": message,
+                "gherkin": gherkin,
+                "screen_type": screen_analysis.screen_type.value,
+                "source": state.get("gherkin_source", "ml")
+            })
         
         # 3. Montar a resposta com informações detalhadas e sugestões
-        response = f"""✅ **Cenário Gherkin Gerado com Sucesso!**
-
-**Análise da Tela:**
-- 🎯 Tipo: **{screen_analysis.screen_type.value}**
-- 📊 Confiança: **{screen_analysis.confidence:.0%}**
-- 🔍 Elementos Identificados: **{len(screen_analysis.elements)}**
-
-**Cenário Gherkin:**
-```gherkin
-{gherkin}
-```
-
-**Elementos Identificados na Tela:**
-{chr(10).join([f"• {elem.label} ({elem.element_type.value})" for elem in screen_analysis.elements])}
-
-**Próximos Passos Recomendados:**
-1. ✅ Revisar o cenário gerado
-2. 🔄 Adaptar conforme necessário para sua aplicação
-3. 🧪 Executar o teste automatizado
-4. 📈 Validar os resultados
-5. 📝 Documentar casos de teste adicionais
-
-**Dicas:**
-- Você pode pedir para gerar variações deste cenário
-- Sugira diferentes casos de uso (sucesso, erro, validação)
-- Combine com outros cenários para cobertura completa"""
+        response = render_gherkin_reply(screen_analysis, gherkin)
         
         return response
     
@@ -288,34 +541,7 @@ def process_as_agent(message: str, state: Dict[str, Any]) -> str:
         screen_analysis = simulate_screen_analysis(message)
         agent_memory.add_screen_analysis(screen_analysis.to_dict())
         
-        elements_str = "\n".join([f"• **{elem.label}** ({elem.element_type.value})" for elem in screen_analysis.elements])
-        
-        response = f"""📊 **Análise da Tela Concluída**
-
-**Tipo de Tela Identificado:** 🎯 **{screen_analysis.screen_type.value.upper()}**
-**Nível de Confiança:** 📈 **{screen_analysis.confidence:.0%}**
-
-**Elementos Identificados ({len(screen_analysis.elements)}):**
-{elements_str}
-
-**Palavras-chave Extraídas:**
-{', '.join([f'`{kw}`' for kw in screen_analysis.keywords])}
-
-**Análise Detalhada:**
-Esta é uma tela de {screen_analysis.screen_type.value} com {len(screen_analysis.elements)} elementos principais. 
-A confiança da análise é de {screen_analysis.confidence:.0%}, indicando um alto grau de certeza na classificação.
-
-**Sugestões de Teste:**
-1. Validar todos os campos obrigatórios
-2. Testar validações de entrada
-3. Verificar mensagens de erro
-4. Testar fluxo de sucesso
-5. Validar comportamento em dispositivos móveis
-
-**Deseja que eu:**
-- 📝 Gere um cenário Gherkin para esta tela?
-- 🔄 Analise um fluxo completo?
-- 💡 Sugira casos de teste adicionais?"""
+        response = render_analysis_reply(screen_analysis)
         
         return response
     
@@ -326,34 +552,7 @@ A confiança da análise é de {screen_analysis.confidence:.0%}, indicando um al
         
         screen_analysis = simulate_screen_analysis(message)
         
-        response = f"""💡 **Sugestões de Casos de Teste**
-
-Para uma tela de **{screen_analysis.screen_type.value}**, recomendo os seguintes casos de teste:
-
-**Testes Funcionais:**
-1. ✅ Fluxo de sucesso principal
-2. ❌ Validação de campos obrigatórios
-3. ⚠️ Mensagens de erro apropriadas
-4. 🔄 Comportamento após submissão
-
-**Testes de Validação:**
-1. 📧 Validação de formato (emails, telefones, etc)
-2. 🔐 Validação de segurança (senhas, dados sensíveis)
-3. 📏 Validação de comprimento de campos
-4. 🚫 Caracteres especiais e injeção
-
-**Testes de UX/UI:**
-1. 📱 Responsividade em diferentes dispositivos
-2. ♿ Acessibilidade (WCAG)
-3. ⌨️ Navegação por teclado
-4. 🎨 Consistência visual
-
-**Testes de Performance:**
-1. ⚡ Tempo de carregamento
-2. 🔄 Requisições simultâneas
-3. 💾 Uso de memória
-
-Deseja que eu gere Gherkin para algum destes casos?"""
+        response = render_suggestions_reply(screen_analysis)
         
         return response
     
@@ -443,9 +642,20 @@ Estou aqui para ajudar! 🚀"""
 # FUNÇÃO DE SAÚDE
 # ============================================
 
-def is_llm_available() -> bool:
-    """Verifica se o cliente LLM está pronto para uso."""
-    return client is not None
+def is_llm_available(initialize: bool = False) -> bool:
+    """
+    Verifica se o LLM pode ser usado.
+    Antes do primeiro uso, não constrói o cliente (basta haver API key e o pacote openai
+    instalado), a menos que `initialize=True` seja passado por quem vai usá-lo em seguida.
+    """
+    # Com o circuito aberto o LLM é tratado como indisponível (ML gratuito, sem cobrança)
+    if llm_breaker.state == BreakerState.OPEN:
+        return False
+    if initialize:
+        return get_client() is not None
+    if "client" in globals():
+        return globals()["client"] is not None
+    return bool(_get_api_key()) and find_spec("openai") is not None
 
 
 if __name__ == "__main__":
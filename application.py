@@ -1,20 +1,36 @@
+import hmac
+import math
 import os
+import time
+import uuid
 from datetime import datetime
+from typing import Optional
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 # Tenta a importação relativa primeiro (para uvicorn)
 # Se falhar, tenta a importação direta (para execução local/debug)
 try:
-    from .agent import process_as_agent, is_llm_available
+    from .agent import process_as_agent, is_llm_available, llm_breaker, shutdown_llm, agent_memories
     from .billing import billing_manager, ActionType, PlanType
     from .scrumban import scrumban_manager, TaskStatus, TaskPriority, create_task_from_message
+    from .assets import AssetPipeline
+    from .jobs import JobQueue
+    from .ml_engine import ml_engine, HTMLScreenReader
+    from .report_export import EXPORT_FORMATS, ReportSnapshot, export_filename, iter_report
+    from .metrics import registry, CONTENT_TYPE, CHAT_STAGE_SECONDS, CHAT_REQUESTS, CHAT_IN_FLIGHT, ASSET_RESPONSES, REPORT_EXPORTS, REPORT_EXPORT_BYTES
 except ImportError:
-    from agent import process_as_agent, is_llm_available
+    from agent import process_as_agent, is_llm_available, llm_breaker, shutdown_llm, agent_memories
     from billing import billing_manager, ActionType, PlanType
     from scrumban import scrumban_manager, TaskStatus, TaskPriority, create_task_from_message
+    from assets import AssetPipeline
+    from jobs import JobQueue
+    from ml_engine import ml_engine, HTMLScreenReader
+    from report_export import EXPORT_FORMATS, ReportSnapshot, export_filename, iter_report
+    from metrics import registry, CONTENT_TYPE, CHAT_STAGE_SECONDS, CHAT_REQUESTS, CHAT_IN_FLIGHT, ASSET_RESPONSES, REPORT_EXPORTS, REPORT_EXPORT_BYTES
 
 # ============================================
 # NEBULA AGENT v6.0 - Agente de IA com Gherkin
@@ -46,21 +62,94 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if "default_user" not in billing_manager.users:
     billing_manager.create_user("default_user", PlanType.LITE)
 
+# ============================================
+# JOBS EM SEGUNDO PLANO (FORA DO CAMINHO CRÍTICO DO CHAT)
+# ============================================
+
+# Histórico e tarefa do Scrumban de cada mensagem são gravados depois da resposta.
+# NEBULA_JOB_SPOOL_DIR (opcional) guarda os jobs em disco para reexecutá-los após uma queda
+JOB_DRAIN_SECONDS = float(os.environ.get("NEBULA_JOB_DRAIN_SECONDS", 10))
+chat_jobs = JobQueue(
+    "chat",
+    maxsize=int(os.environ.get("NEBULA_JOB_QUEUE_SIZE", 1000)),
+    spool_dir=os.environ.get("NEBULA_JOB_SPOOL_DIR") or None,
+    fsync=os.environ.get("NEBULA_JOB_SPOOL_FSYNC", "0") == "1"
+)
+
+def record_chat_history(payload: dict):
+    """Job: adiciona a mensagem do usuário e a resposta ao histórico, em par."""
+    STATE["conversation_history"].extend(payload["messages"])
+
+CHAT_TASK_STEPS = {
+    TaskStatus.TODO.value: [TaskStatus.IN_PROGRESS, TaskStatus.DONE],
+    TaskStatus.IN_PROGRESS.value: [TaskStatus.DONE],
+}
+
+def record_chat_task(payload: dict):
+    """
+    Job: cria a tarefa da mensagem no Scrumban e a move para "em progresso" e "concluído".
+    Reexecutar o job (spool após uma queda) só completa os passos que faltam.
+    """
+    task_data = create_task_from_message(payload["board_id"], payload["message"], payload["task_id"])
+    if task_data:
+        steps = CHAT_TASK_STEPS.get(task_data["status"], [])
+        if steps:
+            scrumban_manager.update_statuses(payload["board_id"], [(task_data["id"], status) for status in steps])
+
+chat_jobs.register("chat_history", record_chat_history)
+chat_jobs.register("chat_task", record_chat_task)
+
 # ============================================
 # ROTA PRINCIPAL DO CHAT (AGENTE)
 # ============================================
 
+# Campo opcional da requisição (em ms) -> chave do estado do agente (em segundos)
+CHAT_WAIT_FIELDS = {
+    "deadline_ms": "llm_deadline_s",
+    "hedge_ms": "llm_hedge_s",
+}
+
+def parse_wait_ms(data: dict, field: str) -> float:
+    """Converte um tempo em milissegundos da requisição para segundos (número finito e positivo)."""
+    try:
+        value = float(data[field])
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} deve ser um número de milissegundos")
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError(f"{field} deve ser maior que zero")
+    return value / 1000
+
+# Origem do Gherkin -> motivo do estorno da geração cobrada antes da chamada ao agente
+GHERKIN_REFUND_REASONS = {
+    "ml_fallback": "llm_fallback",
+    "reuse": "scenario_reuse",
+}
+
 @app.post("/chat")
 async def chat_endpoint(request: Request):
     """Endpoint principal para processar mensagens do chat usando o Agente LLM ou ML fallback."""
+    CHAT_IN_FLIGHT.inc()
+    started = time.perf_counter()
     try:
         data = await request.json()
         message = data.get("message", "").strip()
         user_id = data.get("user_id", STATE["user_id"])
 
         if not message:
+            CHAT_REQUESTS.labels(outcome="empty").inc()
             return JSONResponse({"reply": "Por favor, envie uma mensagem válida."})
 
+        # deadline_ms / hedge_ms opcionais limitam a espera pelo LLM nesta requisição;
+        # validados antes da cobrança para um valor inválido não custar créditos
+        try:
+            llm_limits = {
+                state_key: parse_wait_ms(data, field) for field, state_key in CHAT_WAIT_FIELDS.items()
+                if data.get(field) is not None
+            }
+        except ValueError as e:
+            CHAT_REQUESTS.labels(outcome="invalid").inc()
+            return JSONResponse({"reply": f"⚠️ {e}"}, status_code=400)
+
         # Verificar créditos do usuário
         user = billing_manager.get_user(user_id)
         if not user:
@@ -68,51 +157,65 @@ async def chat_endpoint(request: Request):
         
         # Tentar realizar a ação (deduz créditos apenas se LLM estiver disponível)
         # Se LLM não estiver disponível, usa ML fallback gratuito
-        if is_llm_available():
-            action_result = billing_manager.perform_action(user_id, ActionType.GENERATE_GHERKIN)
+        charged = False
+        if is_llm_available(initialize=True):
+            with CHAT_STAGE_SECONDS.labels(stage="billing").time():
+                action_result = billing_manager.perform_action(user_id, ActionType.GENERATE_GHERKIN)
             
             if not action_result["success"]:
+                CHAT_REQUESTS.labels(outcome="no_credits").inc()
                 return JSONResponse({
                     "reply": f"⚠️ {action_result['message']}\n\nCréditos disponíveis: {action_result['credits_remaining']}\n\n💡 **Dica:** Configure a OPENAI_API_KEY para usar o LLM completo, ou continue usando o modo ML gratuito.",
                     "credits_remaining": action_result["credits_remaining"]
                 })
+            charged = True
         else:
             # Modo fallback ML - não consome créditos
             print("ℹ️ LLM não disponível, usando motor ML local (gratuito)")
 
-        # Adiciona ao histórico
-        STATE["conversation_history"].append({
+        user_entry = {
             "role": "user",
             "content": message,
             "timestamp": datetime.now().isoformat()
-        })
-
-        # Processa a mensagem usando o Agente (funciona com LLM ou ML fallback)
-        reply = process_as_agent(message, STATE)
-
-        # Adiciona resposta ao histórico
-        STATE["conversation_history"].append({
-            "role": "assistant",
-            "content": reply,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        # Criar tarefa no Scrumban
-        task_data = create_task_from_message(STATE["board_id"], message)
-        
-        # Atualizar status da tarefa para "em progresso" e depois "concluído"
-        if task_data:
-            scrumban_manager.update_task_status(STATE["board_id"], task_data["id"], TaskStatus.IN_PROGRESS)
-            scrumban_manager.update_task_status(STATE["board_id"], task_data["id"], TaskStatus.DONE)
-
-        return JSONResponse({
-            "reply": reply,
-            "credits_remaining": user.credits,
-            "task_id": task_data["id"] if task_data else None,
-            "llm_available": is_llm_available()
-        })
+        }
+
+        # Processa a mensagem usando o Agente (funciona com LLM ou ML fallback).
+        # Roda fora do event loop: a chamada ao LLM é bloqueante e a análise ML usa o pool do motor.
+        # O estado por requisição compartilha o histórico e recebe a origem do Gherkin gerado.
+        request_state = {**STATE, "user_id": user_id, **llm_limits}
+        with CHAT_STAGE_SECONDS.labels(stage="agent").time():
+            reply = await run_in_threadpool(process_as_agent, message, request_state)
+
+        # Sem chamada ao LLM não há cobrança: o LLM falhou (ou foi compartilhado e falhou)
+        # e o motor ML gratuito respondeu, ou um cenário da memória foi reaproveitado
+        if charged and request_state.get("gherkin_source") in GHERKIN_REFUND_REASONS:
+            billing_manager.refund_action(
+                user_id, ActionType.GENERATE_GHERKIN, GHERKIN_REFUND_REASONS[request_state["gherkin_source"]]
+            )
+
+        # Histórico e tarefa no Scrumban ficam para a fila de jobs (executados após a resposta).
+        # O ID da tarefa é reservado aqui para já voltar na resposta
+        task_id = str(uuid.uuid4())
+        with CHAT_STAGE_SECONDS.labels(stage="task_creation").time():
+            chat_jobs.submit("chat_history", {"messages": [user_entry, {
+                "role": "assistant",
+                "content": reply,
+                "timestamp": datetime.now().isoformat()
+            }]})
+            chat_jobs.submit("chat_task", {"board_id": STATE["board_id"], "message": message, "task_id": task_id})
+
+        with CHAT_STAGE_SECONDS.labels(stage="serialization").time():
+            response = JSONResponse({
+                "reply": reply,
+                "credits_remaining": user.credits,
+                "task_id": task_id,
+                "llm_available": is_llm_available()
+            })
+        CHAT_REQUESTS.labels(outcome="ok").inc()
+        return response
 
     except Exception as e:
+        CHAT_REQUESTS.labels(outcome="error").inc()
         print(f"❌ Erro no chat: {e}")
         import traceback
         traceback.print_exc()
@@ -120,6 +223,31 @@ async def chat_endpoint(request: Request):
             {"reply": f"⚠️ Ocorreu um erro interno ao processar sua mensagem.\n\n**Detalhes:** {str(e)}\n\nTente novamente ou verifique os logs do servidor."},
             status_code=500
         )
+    finally:
+        CHAT_IN_FLIGHT.dec()
+        CHAT_STAGE_SECONDS.labels(stage="total").observe(time.perf_counter() - started)
+
+# ============================================
+# CICLO DE VIDA DO MOTOR ML
+# ============================================
+
+@app.on_event("startup")
+async def start_ml_engine():
+    """Sobe e aquece os workers do motor ML (NEBULA_ML_EXECUTOR=inline|thread|process)."""
+    await run_in_threadpool(ml_engine.start)
+
+@app.on_event("startup")
+async def start_chat_jobs():
+    """Inicia a fila de jobs do chat (e reexecuta o que ficou no spool)."""
+    chat_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_ml_engine():
+    """Drena a fila de jobs do chat, grava as memórias do agente e encerra o motor ML e as chamadas pendentes ao LLM."""
+    await chat_jobs.drain(JOB_DRAIN_SECONDS)
+    await run_in_threadpool(agent_memories.flush)
+    ml_engine.shutdown(wait=False)
+    shutdown_llm()
 
 # ============================================
 # ROTA DE HISTÓRICO E LIMPEZA
@@ -140,27 +268,48 @@ async def clear_history():
 # SERVIR ARQUIVOS ESTÁTICOS E INDEX
 # ============================================
 
-# Monta a pasta static
-static_path = os.path.join(BASE_DIR, "static")
-if os.path.exists(static_path):
-    app.mount("/static", StaticFiles(directory=static_path), name="static")
+# Assets pré-carregados e comprimidos em memória (index.html, service-worker.js e static/*)
+asset_pipeline = AssetPipeline(BASE_DIR)
+
+@app.on_event("startup")
+async def preload_assets():
+    """Carrega e comprime os assets na inicialização do servidor."""
+    asset_pipeline.load()
+
+def asset_response(url_path: str, request: Request) -> Optional[Response]:
+    """Serve um asset da memória com negociação de Accept-Encoding e validação de ETag."""
+    result = asset_pipeline.respond(
+        url_path,
+        request.headers.get("accept-encoding", ""),
+        request.headers.get("if-none-match", "")
+    )
+    if result is None:
+        return None
+    ASSET_RESPONSES.labels(status=result.status_code, encoding=result.headers.get("Content-Encoding", "identity")).inc()
+    return Response(content=result.body, status_code=result.status_code, headers=result.headers, media_type=result.media_type)
+
+@app.get("/static/{asset_path:path}")
+async def serve_static(asset_path: str, request: Request):
+    """Serve arquivos de static/ (URLs com hash de conteúdo são imutáveis)."""
+    response = asset_response(f"/static/{asset_path}", request)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
 
 @app.get("/service-worker.js", response_class=HTMLResponse)
-async def serve_service_worker():
+async def serve_service_worker(request: Request):
     """Serve o service-worker.js."""
-    sw_path = os.path.join(BASE_DIR, "service-worker.js")
-    if os.path.exists(sw_path):
-        with open(sw_path, 'r', encoding='utf-8') as f:
-            return HTMLResponse(content=f.read(), media_type="application/javascript")
+    response = asset_response("/service-worker.js", request)
+    if response is not None:
+        return response
     return HTMLResponse("/* Service Worker not found */", status_code=404)
 
 @app.get("/", response_class=HTMLResponse)
-async def serve_index():
+async def serve_index(request: Request):
     """Serve o index.html principal."""
-    index_path = os.path.join(BASE_DIR, "index.html")
-    if os.path.exists(index_path):
-        with open(index_path, 'r', encoding='utf-8') as f:
-            return HTMLResponse(content=f.read())
+    response = asset_response("/", request)
+    if response is not None:
+        return response
     return HTMLResponse("<h1>❌ Nebula Agent - index.html não encontrado</h1>", status_code=404)
 
 # ============================================
@@ -214,6 +363,16 @@ async def get_scrumban_stats(board_id: str = STATE["board_id"]):
     
     return JSONResponse(stats)
 
+@app.get("/scrumban/metrics")
+async def get_scrumban_metrics(board_id: str = STATE["board_id"], days: int = 30):
+    """Métricas de fluxo (cycle time, throughput, WIP) servidas dos agregados, sem varrer o board."""
+    metrics = scrumban_manager.get_flow_metrics(board_id, max(1, min(days, 90)))
+    if not metrics:
+        scrumban_manager.create_board(board_id)
+        metrics = scrumban_manager.get_flow_metrics(board_id, max(1, min(days, 90)))
+    
+    return JSONResponse(metrics)
+
 @app.post("/scrumban/task")
 async def create_scrumban_task(request: Request):
     """Cria uma nova tarefa no Scrumban."""
@@ -254,6 +413,249 @@ async def update_task_status(request: Request):
     except ValueError:
         return JSONResponse({"success": False, "message": f"Status inválido: {new_status}"}, status_code=400)
 
+@app.get("/scrumban/search")
+async def search_scrumban_tasks(
+    q: str = "",
+    board_id: str = STATE["board_id"],
+    offset: int = 0,
+    limit: int = 20,
+    status: Optional[str] = None
+):
+    """Busca textual nas tarefas (título, descrição, comentários e tags), ranqueada e paginada."""
+    if not q.strip():
+        return JSONResponse({"success": False, "message": "Parâmetro q é obrigatório"}, status_code=400)
+    
+    try:
+        task_status = TaskStatus(status) if status else None
+    except ValueError:
+        return JSONResponse({"success": False, "message": f"Status inválido: {status}"}, status_code=400)
+    
+    results = scrumban_manager.search_tasks(board_id, q, max(0, offset), max(1, min(limit, 100)), task_status)
+    if results is None:
+        return JSONResponse({"success": False, "message": "Board não encontrado"}, status_code=404)
+    
+    return JSONResponse({"success": True, **results})
+
+# ============================================
+# ROTAS DE CENÁRIOS GERADOS
+# ============================================
+
+@app.get("/scenarios/similar")
+async def get_similar_scenarios(q: str = "", limit: int = 5, screen_type: Optional[str] = None, user_id: str = STATE["user_id"]):
+    """Busca, entre os cenários já gerados pelo usuário, os parecidos com o texto (intenção ou passos Gherkin)."""
+    if not q.strip():
+        return JSONResponse({"success": False, "message": "Parâmetro q é obrigatório"}, status_code=400)
+    
+    # A memória pode precisar ser recarregada do disco: fora do event loop
+    memory = await run_in_threadpool(agent_memories.get, user_id)
+    results = memory.similar_scenarios(q, max(1, min(limit, 50)), screen_type)
+    return JSONResponse({
+        "success": True,
+        "query": q,
+        "results": results,
+        "total_scenarios": len(memory.scenarios)
+    })
+
+# ============================================
+# EXPORTAÇÃO DE RELATÓRIOS (EXPORT_REPORT)
+# ============================================
+
+# Status HTTP de cada motivo de recusa do billing
+EXPORT_REFUSAL_STATUS = {"user_not_found": 404, "feature_unavailable": 403, "insufficient_credits": 402}
+
+async def settle_export(charge: dict) -> None:
+    """
+    Fecha a reserva de créditos da exportação (uma única vez): estorna se o download
+    não terminou. Assíncrona para rodar no event loop, como as demais ações de billing.
+    """
+    if charge["settled"]:
+        return
+    charge["settled"] = True
+    if not charge["completed"]:
+        # Cliente desconectou ou a geração falhou: devolve o que foi reservado
+        billing_manager.refund_action(charge["user_id"], ActionType.EXPORT_REPORT, "export_aborted")
+    REPORT_EXPORTS.labels(format=charge["format"], result="completed" if charge["completed"] else "aborted").inc()
+
+async def stream_export(snapshot: ReportSnapshot, export_format: str, charge: dict):
+    """Blocos do relatório (gerados numa thread); ao terminar ou falhar, fecha a reserva."""
+    sent = 0
+    try:
+        async for chunk in iterate_in_threadpool(iter_report(snapshot, export_format)):
+            sent += len(chunk)
+            yield chunk
+        charge["completed"] = True
+    finally:
+        REPORT_EXPORT_BYTES.labels(format=export_format).inc(sent)
+        await settle_export(charge)
+
+@app.get("/export/report")
+async def export_report(user_id: str = STATE["user_id"], board_id: str = STATE["board_id"], format: str = "zip"):
+    """
+    Exporta os cenários gerados, as análises de tela e as tarefas do board como zip de
+    arquivos .feature, CSV ou JSON, em streaming (memória constante, sem arquivo
+    temporário). Os créditos são reservados (cobrados) antes de o stream começar e
+    estornados se a exportação não chegar ao fim.
+    """
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        return JSONResponse(
+            {"success": False, "message": f"Formato inválido. Use: {', '.join(EXPORT_FORMATS)}"},
+            status_code=400
+        )
+    
+    reservation = billing_manager.perform_action(user_id, ActionType.EXPORT_REPORT)
+    if not reservation["success"]:
+        REPORT_EXPORTS.labels(format=export_format, result=reservation["reason"]).inc()
+        return JSONResponse(reservation, status_code=EXPORT_REFUSAL_STATUS.get(reservation["reason"], 400))
+    
+    charge = {"user_id": user_id, "format": export_format, "completed": False, "settled": False}
+    try:
+        memory = await run_in_threadpool(agent_memories.get, user_id)
+        snapshot = ReportSnapshot.capture(user_id, memory, scrumban_manager.get_board(board_id))
+    except Exception:
+        await settle_export(charge)
+        raise
+    # O background roda mesmo se o cliente desconectar antes do primeiro bloco (o gerador nem começa)
+    return StreamingResponse(
+        stream_export(snapshot, export_format, charge),
+        media_type=EXPORT_FORMATS[export_format][0],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(snapshot, export_format)}"'},
+        background=BackgroundTask(settle_export, charge)
+    )
+
+# ============================================
+# ADMINISTRAÇÃO: MEMÓRIA DO AGENTE POR USUÁRIO
+# ============================================
+
+# As rotas /admin exigem o header X-Admin-Token com este valor; sem ele configurado, ficam desativadas
+ADMIN_TOKEN = os.environ.get("NEBULA_ADMIN_TOKEN", "")
+
+def check_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Rotas de administração desativadas (defina NEBULA_ADMIN_TOKEN)")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Token de administração inválido")
+
+@app.get("/admin/memory")
+async def get_memory_usage(request: Request, limit: int = 50):
+    """Uso de memória do agente: limites, descartes e os usuários residentes que mais usam."""
+    check_admin(request)
+    return JSONResponse(agent_memories.stats(max(1, min(limit, 1000))))
+
+@app.get("/admin/memory/{user_id}")
+async def get_user_memory_usage(user_id: str, request: Request):
+    """Uso de memória do agente de um usuário (residente ou gravado em disco)."""
+    check_admin(request)
+    usage = agent_memories.usage(user_id)
+    if usage is None:
+        return JSONResponse({"success": False, "message": "Usuário sem memória"}, status_code=404)
+    return JSONResponse(usage)
+
+# ============================================
+# ANÁLISE DE TELA A PARTIR DO HTML
+# ============================================
+
+HTML_MAX_BYTES = int(os.environ.get("NEBULA_HTML_MAX_BYTES", 20 * 1024 * 1024))
+
+@app.post("/screens/html")
+async def analyze_screen_html(request: Request, intent: str = ""):
+    """
+    Analisa uma página real enviada como corpo HTML (upload ou página salva).
+    O corpo é lido em partes e passa pelo parser incremental sem ser montado em memória;
+    com `intent`, também gera o cenário Gherkin pelo motor ML.
+    """
+    content_type = request.headers.get("content-type", "")
+    encoding = "utf-8"
+    if "charset=" in content_type:
+        encoding = content_type.split("charset=", 1)[1].split(";")[0].strip().strip('"') or encoding
+    try:
+        reader = HTMLScreenReader(encoding)
+    except LookupError:
+        return JSONResponse({"success": False, "message": f"Charset desconhecido: {encoding}"}, status_code=400)
+    
+    async for chunk in request.stream():
+        if reader.bytes_read + len(chunk) > HTML_MAX_BYTES:
+            return JSONResponse({"success": False, "message": "Página maior que o limite permitido"}, status_code=413)
+        if chunk:
+            await run_in_threadpool(reader.feed, chunk)
+    
+    if not reader.bytes_read:
+        return JSONResponse({"success": False, "message": "Corpo HTML vazio"}, status_code=400)
+    
+    analysis = await run_in_threadpool(reader.finish)
+    result = {
+        "success": True,
+        "analysis": analysis.to_dict(),
+        "elements_total": reader.elements_total,
+        "bytes": reader.bytes_read
+    }
+    if intent.strip():
+        result["gherkin"] = await run_in_threadpool(ml_engine.generate_gherkin, analysis, intent)
+    return JSONResponse(result)
+
+# ============================================
+# ROTAS DO SCRUMBAN EM LOTE (TUDO OU NADA)
+# ============================================
+
+@app.post("/scrumban/tasks")
+async def create_scrumban_tasks(request: Request):
+    """Cria várias tarefas numa requisição. Qualquer item inválido cancela o lote."""
+    data = await request.json()
+    board_id = data.get("board_id", STATE["board_id"])
+    items = data.get("tasks", [])
+    
+    specs, errors = [], []
+    for i, item in enumerate(items):
+        title = item.get("title", "")
+        if not title:
+            errors.append({"index": i, "message": "Título obrigatório"})
+            continue
+        try:
+            priority = TaskPriority(item.get("priority", "medium"))
+        except ValueError:
+            errors.append({"index": i, "message": f"Prioridade inválida: {item.get('priority')}"})
+            continue
+        specs.append({
+            "title": title,
+            "description": item.get("description", ""),
+            "priority": priority,
+            "assignee": item.get("assignee", "Nebula Agent")
+        })
+    
+    if errors:
+        return JSONResponse({"success": False, "created": 0, "errors": errors}, status_code=400)
+    
+    tasks = scrumban_manager.create_tasks(board_id, specs)
+    return JSONResponse({"success": True, "created": len(tasks), "tasks": tasks})
+
+@app.post("/scrumban/tasks/status")
+async def update_scrumban_statuses(request: Request):
+    """Atualiza o status de várias tarefas numa requisição (tudo ou nada)."""
+    data = await request.json()
+    board_id = data.get("board_id", STATE["board_id"])
+    
+    changes, errors = [], []
+    for i, item in enumerate(data.get("updates", [])):
+        try:
+            changes.append((item.get("task_id", ""), TaskStatus(item.get("status", "todo"))))
+        except ValueError:
+            errors.append({"index": i, "message": f"Status inválido: {item.get('status')}"})
+    
+    if errors:
+        return JSONResponse({"success": False, "updated": 0, "errors": errors}, status_code=400)
+    
+    result = scrumban_manager.update_statuses(board_id, changes)
+    return JSONResponse(result, status_code=200 if result["success"] else 404)
+
+@app.post("/scrumban/tasks/delete")
+async def delete_scrumban_tasks(request: Request):
+    """Deleta várias tarefas numa requisição (tudo ou nada)."""
+    data = await request.json()
+    board_id = data.get("board_id", STATE["board_id"])
+    
+    result = scrumban_manager.delete_tasks(board_id, data.get("task_ids", []))
+    return JSONResponse(result, status_code=200 if result["success"] else 404)
+
 # ============================================
 # ROTA DE SAÚDE (HEALTH CHECK)
 # ============================================
@@ -268,12 +670,24 @@ async def health_check():
         "status": "online",
         "version": "6.0",
         "llm_available": is_llm_available(),
+        "llm_breaker": llm_breaker.snapshot(),
+        "jobs": chat_jobs.stats(),
+        "agent_memory_users": len(agent_memories),
         "conversation_messages": len(STATE["conversation_history"]),
         "user_plan": user.plan.value if user else "unknown",
         "user_credits": user.credits if user else 0,
         "scrumban_tasks": len(board.tasks) if board else 0
     })
 
+# ============================================
+# MÉTRICAS (PROMETHEUS)
+# ============================================
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Exporta as métricas no formato de texto do Prometheus."""
+    return PlainTextResponse(registry.render(), headers={"Content-Type": CONTENT_TYPE})
+
 # ============================================
 # LIMPEZA DE ARQUIVOS ANTIGOS
 # ============================================
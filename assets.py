@@ -0,0 +1,252 @@
+"""
+Pipeline de Assets Estáticos (cache em memória, compressão e ETags)
+Nebula Agent v6.0
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli é opcional; sem ele servimos apenas gzip
+    brotli = None
+
+
+# ============================================
+# CONSTANTES
+# ============================================
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Tipos textuais que compensam compressão (imagens PNG já são comprimidas)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+MIN_COMPRESS_SIZE = 512
+
+# Ordem de preferência quando o cliente aceita várias codificações com o mesmo peso
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+# Sufixo do ETag de cada variante: corpos diferentes precisam de validadores diferentes
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+
+
+# ============================================
+# CLASSE DE ASSET
+# ============================================
+
+class Asset:
+    """Um arquivo pré-carregado em memória com suas variantes comprimidas."""
+
+    def __init__(self, url_path: str, content: bytes, media_type: str):
+        self.url_path = url_path
+        self.media_type = media_type
+        self.digest = hashlib.sha256(content).hexdigest()
+        self.etag = self.etag_for("identity")
+        self.hashed_url = self._hashed_url(url_path, self.digest[:10])
+        self.bodies: Dict[str, bytes] = {"identity": content}
+        self._compress(content)
+
+    @staticmethod
+    def _hashed_url(url_path: str, short_hash: str) -> str:
+        """Insere o hash do conteúdo antes da extensão (style.css -> style.<hash>.css)."""
+        head, name = url_path.rsplit("/", 1)
+        stem, dot, ext = name.rpartition(".")
+        if not dot:
+            return f"{url_path}.{short_hash}"
+        return f"{head}/{stem}.{short_hash}.{ext}"
+
+    def _compress(self, content: bytes) -> None:
+        """Gera as variantes gzip/brotli quando o tipo é textual e a compressão compensa."""
+        if len(content) < MIN_COMPRESS_SIZE or not self.media_type.startswith(COMPRESSIBLE_TYPES):
+            return
+        gz = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(gz) < len(content):
+            self.bodies["gzip"] = gz
+        if brotli is not None:
+            br = brotli.compress(content, quality=11)
+            if len(br) < len(content):
+                self.bodies["br"] = br
+
+    @property
+    def encodings(self) -> List[str]:
+        return list(self.bodies)
+
+    def etag_for(self, encoding: str) -> str:
+        """ETag forte da variante (ex.: "<hash>-gz" para o corpo gzip)."""
+        return f'"{self.digest[:16]}{ETAG_SUFFIXES[encoding]}"'
+
+
+class AssetResponse:
+    """Resposta pronta para ser convertida em Response pelo framework HTTP."""
+
+    def __init__(self, status_code: int, body: bytes, headers: Dict[str, str], media_type: str):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+        self.media_type = media_type
+
+
+# ============================================
+# NEGOCIAÇÃO DE CODIFICAÇÃO
+# ============================================
+
+def negotiate_encoding(accept_encoding: str, available: List[str]) -> str:
+    """Escolhe a melhor codificação disponível segundo o cabeçalho Accept-Encoding."""
+    if not accept_encoding:
+        return "identity"
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    wildcard = weights.get("*")
+    identity_q = weights.get("identity", wildcard if wildcard is not None else 1.0)
+    for encoding in ENCODING_PREFERENCE:
+        if encoding == "identity" or encoding not in available:
+            continue
+        q = weights.get(encoding, wildcard if wildcard is not None else 0.0)
+        if q > 0.0 and q >= identity_q:
+            return encoding
+    return "identity"
+
+
+def _etag_list(if_none_match: str) -> List[str]:
+    """Separa os ETags de um If-None-Match, ignorando o prefixo de ETag fraco."""
+    tags = []
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        tags.append(tag[2:] if tag.startswith("W/") else tag)
+    return tags
+
+
+# ============================================
+# PIPELINE DE ASSETS
+# ============================================
+
+class AssetPipeline:
+    """Pré-carrega index.html, service-worker.js e static/* em memória, com ETags e URLs versionadas."""
+
+    # Arquivos servidos fora de /static: caminho no disco -> URL
+    ROOT_FILES = {
+        "index.html": "/",
+        "service-worker.js": "/service-worker.js",
+    }
+
+    def __init__(self, base_dir: str, static_dir: str = "static", static_prefix: str = "/static"):
+        self.base_dir = base_dir
+        self.static_dir = os.path.join(base_dir, static_dir)
+        self.static_prefix = static_prefix
+        self.assets: Dict[str, Asset] = {}
+        self.hashed: Dict[str, Asset] = {}
+        self.loaded = False
+
+    def load(self) -> None:
+        """Lê e comprime todos os assets (chamado na inicialização)."""
+        assets: Dict[str, Asset] = {}
+        if os.path.isdir(self.static_dir):
+            for root, _, files in os.walk(self.static_dir):
+                for filename in sorted(files):
+                    disk_path = os.path.join(root, filename)
+                    rel = os.path.relpath(disk_path, self.static_dir).replace(os.sep, "/")
+                    url = f"{self.static_prefix}/{rel}"
+                    assets[url] = self._read(disk_path, url)
+
+        hashed = {asset.hashed_url: asset for asset in assets.values()}
+
+        for filename, url in self.ROOT_FILES.items():
+            disk_path = os.path.join(self.base_dir, filename)
+            if not os.path.exists(disk_path):
+                continue
+            asset = self._read(disk_path, url)
+            if filename.endswith(".html"):
+                # Reescreve referências a /static/* para as URLs imutáveis com hash
+                html = asset.bodies["identity"].decode("utf-8")
+                for static_url in sorted(assets, key=len, reverse=True):
+                    html = html.replace(f'"{static_url}"', f'"{assets[static_url].hashed_url}"')
+                asset = Asset(url, html.encode("utf-8"), asset.media_type)
+            assets[url] = asset
+
+        self.assets = assets
+        self.hashed = hashed
+        self.loaded = True
+
+    def ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    @staticmethod
+    def _read(disk_path: str, url: str) -> Asset:
+        with open(disk_path, "rb") as f:
+            content = f.read()
+        media_type = mimetypes.guess_type(disk_path)[0] or "application/octet-stream"
+        # Starlette já acrescenta o charset em text/*
+        if media_type in ("application/javascript", "application/json"):
+            media_type += "; charset=utf-8"
+        return Asset(url, content, media_type)
+
+    def url_for(self, url_path: str) -> str:
+        """Retorna a URL versionada (imutável) de um asset, ou a própria URL se não existir."""
+        self.ensure_loaded()
+        asset = self.assets.get(url_path)
+        return asset.hashed_url if asset else url_path
+
+    def lookup(self, url_path: str) -> Optional[Tuple[Asset, str]]:
+        """Busca um asset pela URL (versionada ou não) e retorna o Cache-Control adequado."""
+        self.ensure_loaded()
+        asset = self.hashed.get(url_path)
+        if asset is not None:
+            return asset, IMMUTABLE_CACHE_CONTROL
+        asset = self.assets.get(url_path)
+        if asset is not None:
+            return asset, REVALIDATE_CACHE_CONTROL
+        return None
+
+    def respond(self, url_path: str, accept_encoding: str = "", if_none_match: str = "") -> Optional[AssetResponse]:
+        """
+        Monta a resposta (200 ou 304) negociando a codificação e validando o ETag da
+        variante escolhida. O 304 também leva Vary, para os caches não misturarem variantes.
+        """
+        found = self.lookup(url_path)
+        if found is None:
+            return None
+        asset, cache_control = found
+        encoding = negotiate_encoding(accept_encoding, asset.encodings)
+        etag = asset.etag_for(encoding)
+        headers = {"Cache-Control": cache_control, "ETag": etag, "Vary": "Accept-Encoding"}
+        if if_none_match and etag in _etag_list(if_none_match):
+            return AssetResponse(304, b"", headers, asset.media_type)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return AssetResponse(200, asset.bodies[encoding], headers, asset.media_type)
+
+    def stats(self) -> Dict:
+        """Resumo dos assets carregados (quantidade e bytes por codificação)."""
+        self.ensure_loaded()
+        totals: Dict[str, int] = {}
+        for asset in self.assets.values():
+            for encoding, body in asset.bodies.items():
+                totals[encoding] = totals.get(encoding, 0) + len(body)
+        return {"assets": len(self.assets), "bytes": totals, "brotli": brotli is not None}
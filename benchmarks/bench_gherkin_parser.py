@@ -0,0 +1,68 @@
+"""
+Benchmark do parser/validador de Gherkin em arquivos .feature grandes.
+
+Gera features com o FeatureGenerator do motor ML (Scenario Outlines com Examples
+cobrindo todos os elementos) em tamanhos crescentes e mede parse e normalização.
+O custo por linha deve ficar estável entre os tamanhos (tempo linear).
+
+Uso:
+    python benchmarks/bench_gherkin_parser.py --elements 1000,10000,100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from gherkin import normalize_gherkin, parse, render, validate  # noqa: E402
+from ml_engine import ElementType, FeatureGenerator, ScreenAnalysis, UIElement  # noqa: E402
+
+ELEMENT_CYCLE = [ElementType.INPUT, ElementType.BUTTON, ElementType.DROPDOWN, ElementType.CHECKBOX, ElementType.LINK]
+
+
+def build_feature(elements: int) -> str:
+    analysis = ScreenAnalysis("Tela de Cadastro com formulário")
+    analysis.elements = [
+        UIElement(ELEMENT_CYCLE[i % len(ELEMENT_CYCLE)], f"Campo {i}") for i in range(elements)
+    ]
+    return FeatureGenerator(analysis).generate("cadastrar um novo usuário")
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do parser Gherkin")
+    parser.add_argument("--elements", default="1000,10000,100000", help="Tamanhos (número de UIElements)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'elementos':>10} {'linhas':>9} {'MB':>7} {'parse MB/s':>11} {'total MB/s':>11} {'µs/linha':>9}")
+    for elements in (int(n) for n in args.elements.split(",")):
+        text = build_feature(elements)
+        lines = text.count("\n") + 1
+        size_mb = len(text.encode("utf-8")) / 1e6
+
+        parse_s = best_of(args.repeat, lambda: parse(text))
+        total_s = best_of(args.repeat, lambda: render(validate(parse(text))))
+
+        result = normalize_gherkin(text)
+        assert result.valid, result.summary()
+        assert result.text == text.rstrip("\n"), "normalização deveria preservar a saída do motor ML"
+        print(
+            f"{elements:>10,} {lines:>9,} {size_mb:>7.2f} {size_mb / parse_s:>11.1f} "
+            f"{size_mb / total_s:>11.1f} {total_s / lines * 1e6:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
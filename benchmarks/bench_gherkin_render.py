@@ -0,0 +1,112 @@
+"""
+Benchmark de vazão da renderização de cenários Gherkin e das respostas do chat.
+
+Compara o gerador antigo (dicionários reconstruídos e f-strings a cada chamada) com os
+templates pré-compilados por ScreenType em cada formato de saída, e mede a montagem da
+resposta markdown do /chat.
+
+Uso:
+    python benchmarks/bench_gherkin_render.py --iterations 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from agent import render_gherkin_reply  # noqa: E402
+from ml_engine import OutputFormat, ScenarioGenerator, ScreenAnalysis, ScreenType  # noqa: E402
+
+DESCRIPTIONS = [
+    "Tela de Login com campos 'Usuário', 'Senha', botão 'Entrar' e link 'Esqueci a Senha'.",
+    "Tela de Cadastro de Novo Usuário com campos 'Nome', 'Email', 'CPF', 'Senha', 'Confirmar Senha' e botão 'Criar Conta'.",
+    "Tela de Checkout com formulário de endereço, seleção de método de pagamento (Cartão, Pix) e botão 'Finalizar Compra'.",
+    "Tela de Dashboard com gráficos, tabelas de dados, botões de ação e menu lateral de navegação.",
+]
+
+
+class LegacyScenarioGenerator:
+    """Cópia do gerador anterior aos templates compilados, mantida só para comparação."""
+
+    def __init__(self, screen_analysis: ScreenAnalysis):
+        self.screen_analysis = screen_analysis
+
+    def generate_scenario(self, user_intent: str) -> str:
+        feature_names = {
+            ScreenType.LOGIN: "Autenticação de Usuário",
+            ScreenType.REGISTRATION: "Registro de Novo Usuário",
+            ScreenType.CHECKOUT: "Processo de Checkout",
+            ScreenType.DASHBOARD: "Acesso ao Dashboard",
+            ScreenType.FORM: "Preenchimento de Formulário",
+            ScreenType.LIST: "Visualização de Lista",
+        }
+        given_map = {
+            ScreenType.LOGIN: "Dado que estou na página de login",
+            ScreenType.REGISTRATION: "Dado que estou na página de registro",
+            ScreenType.CHECKOUT: "Dado que tenho itens no carrinho",
+            ScreenType.DASHBOARD: "Dado que estou autenticado no sistema",
+            ScreenType.FORM: "Dado que estou na página com o formulário",
+        }
+        then_map = {
+            ScreenType.LOGIN: "Então devo ser redirecionado para o dashboard",
+            ScreenType.REGISTRATION: "Então devo receber uma mensagem de sucesso",
+            ScreenType.CHECKOUT: "Então o pedido deve ser confirmado",
+            ScreenType.DASHBOARD: "Então devo visualizar meus dados",
+            ScreenType.FORM: "Então o formulário deve ser enviado com sucesso",
+        }
+        screen_type = self.screen_analysis.screen_type
+        scenario = user_intent[:80] + ("..." if len(user_intent) > 80 else "")
+        given = "\n".join([f"    {given_map.get(screen_type, 'Dado que estou na aplicação')}"])
+        when = "\n".join([f"    {e.to_gherkin_step()}" for e in self.screen_analysis.elements[:3]]) or "    Quando eu realizo uma ação"
+        then = "\n".join([f"    {then_map.get(screen_type, 'Então a ação deve ser bem-sucedida')}"])
+        return f"""Feature: {feature_names.get(screen_type, "Funcionalidade da Aplicação")}
+  Como um usuário
+  Quero {user_intent}
+  Para validar a funcionalidade
+
+  Scenario: {scenario}
+{given}
+{when}
+{then}"""
+
+
+def measure(label: str, iterations: int, fn: Callable[[int], str]) -> float:
+    for i in range(min(1000, iterations)):
+        fn(i)
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    rate = iterations / (time.perf_counter() - start)
+    print(f"{label:<34} {rate:>12,.0f} renders/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vazão da renderização Gherkin")
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    analyses = [ScreenAnalysis(d) for d in DESCRIPTIONS]
+    intents = [f"validar o fluxo principal número {i}" for i in range(64)]
+    n, m = len(analyses), len(intents)
+
+    legacy = measure("legado (plain)", args.iterations, lambda i: LegacyScenarioGenerator(analyses[i % n]).generate_scenario(intents[i % m]))
+    for output_format in OutputFormat:
+        rate = measure(
+            f"compilado ({output_format.value})",
+            args.iterations,
+            lambda i, f=output_format: ScenarioGenerator(analyses[i % n]).generate_scenario(intents[i % m], f),
+        )
+        if output_format == OutputFormat.PLAIN:
+            print(f"{'':<34} {rate / legacy:>11.2f}x sobre o legado")
+
+    gherkins = [ScenarioGenerator(a).generate_scenario(intents[0]) for a in analyses]
+    measure("resposta markdown do /chat", args.iterations, lambda i: render_gherkin_reply(analyses[i % n], gherkins[i % n]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark da ingestão de HTML pelo parser incremental do motor ML.
+
+Gera páginas sintéticas de vários tamanhos (formulários, tabelas, links, blocos de
+script e estilo) em partes de 64 KB, sem montar a página inteira, e mede a vazão
+(MB/s e elementos/s) e o crescimento máximo do RSS durante o parse, que deve ficar
+estável enquanto o tamanho da página cresce.
+
+Uso:
+    python benchmarks/bench_html_parser.py --sizes 1 4 16
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Iterator
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from ml_engine import HTML_CHUNK_SIZE, HTMLScreenReader  # noqa: E402
+
+FIELDS = ["Nome", "E-mail", "CPF", "Telefone", "Endereço", "Cidade", "CEP", "Senha", "Confirmar Senha", "Data de Nascimento"]
+
+
+def page_blocks(rng: random.Random) -> Iterator[str]:
+    yield "<!DOCTYPE html><html><head><title>Cadastro de Clientes</title>"
+    yield "<style>" + ".campo{margin:4px;padding:2px}" * 200 + "</style></head><body><h1>Novo cliente</h1>"
+    block = 0
+    while True:
+        block += 1
+        kind = rng.random()
+        if kind < 0.5:
+            field = rng.choice(FIELDS)
+            yield (
+                f'<div class="campo"><label for="f{block}">{field} *</label>'
+                f'<input id="f{block}" name="{field.lower()}_{block}" type="text" required placeholder="{field}"></div>'
+            )
+        elif kind < 0.6:
+            yield f'<label><input type="checkbox" name="aceite_{block}"> Aceito os termos {block}</label>'
+        elif kind < 0.7:
+            yield f'<select name="uf_{block}" aria-label="Estado">' + "".join(f"<option>UF{i}</option>" for i in range(27)) + "</select>"
+        elif kind < 0.8:
+            yield f'<p>Texto explicativo da seção {block} com <a href="/ajuda/{block}">ajuda</a> e <button>Salvar {block}</button></p>'
+        elif kind < 0.9:
+            rows = "".join(f"<tr><td>{i}</td><td>Cliente {i}</td><td>Ativo</td></tr>" for i in range(20))
+            yield f'<table id="t{block}"><tr><th>ID<th>Nome<th>Status</tr>{rows}</table>'
+        else:
+            yield "<script>var dados = " + repr(["<button>falso</button>"] * 50) + ";</script>"
+
+
+def html_chunks(size_bytes: int, seed: int) -> Iterator[bytes]:
+    """Partes de HTML_CHUNK_SIZE até `size_bytes`, geradas sob demanda."""
+    rng = random.Random(seed)
+    buffer, produced = [], 0
+    buffered = 0
+    for block in page_blocks(rng):
+        data = block.encode("utf-8")
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= HTML_CHUNK_SIZE:
+            chunk = b"".join(buffer)
+            yield chunk
+            produced += len(chunk)
+            buffer, buffered = [], 0
+            if produced >= size_bytes:
+                break
+    yield b"</body></html>"
+
+
+def current_rss_mb() -> float:
+    """RSS atual (Linux via /proc); em outros sistemas usa o pico do processo."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do parser incremental de HTML")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="tamanhos das páginas em MB")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{'página':>8} {'tempo':>8} {'MB/s':>7} {'elementos':>10} {'elem/s':>9} {'+RSS':>9}")
+    for size_mb in args.sizes:
+        size_bytes = int(size_mb * 1024 * 1024)
+        baseline = peak = current_rss_mb()
+        start = time.perf_counter()
+        reader = HTMLScreenReader()
+        for chunk in html_chunks(size_bytes, args.seed):
+            reader.feed(chunk)
+            peak = max(peak, current_rss_mb())
+        analysis = reader.finish()
+        elapsed = time.perf_counter() - start
+
+        mb = reader.bytes_read / (1024 * 1024)
+        print(
+            f"{mb:>6.1f}MB {elapsed:>7.2f}s {mb / elapsed:>7.2f} {reader.elements_total:>10,} "
+            f"{reader.elements_total / elapsed:>9,.0f} {peak - baseline:>7.1f}MB"
+        )
+    print(f"\núltima análise: tipo {analysis.screen_type.value}, {len(analysis.elements)} elementos guardados")
+    print(f"palavras-chave: {analysis.keywords}")
+
+
+if __name__ == "__main__":
+    main()
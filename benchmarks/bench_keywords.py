@@ -0,0 +1,83 @@
+"""
+Benchmark do extrator de palavras-chave (TF-IDF + top-k por heap).
+
+Gera descrições de tela sintéticas de vários tamanhos (de uma frase a documentos
+longos, como specs coladas no chat) e mede a latência de `extract` por tamanho, a
+vazão de `extract_many` e, para referência, o extrator antigo (split + set, sem
+ordem definida).
+
+Uso:
+    python benchmarks/bench_keywords.py --sizes 20 500 5000 50000 --batch 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from keywords import keyword_extractor  # noqa: E402
+
+VOCABULARY = (
+    "tela botão campo campos usuário senha entrar login link esqueci cadastro nome email cpf telefone "
+    "endereço checkout pagamento cartão boleto pix carrinho cupom frete pedido produto produtos total "
+    "dashboard gráfico gráficos relatório tabela filtros busca paginação resultados detalhes modal "
+    "confirmar cancelar salvar excluir editar notificações permissões administrador upload avatar "
+    "obrigatório inválido mensagem erro sucesso exibe mostra com de da do para e o a os as em no na"
+).split()
+OLD_STOP_WORDS = {"o", "a", "de", "da", "do", "e", "ou", "com", "para", "em", "que", "um", "uma", "os", "as", "dos", "das", "é", "são"}
+
+
+def legacy_extract(text: str) -> List[str]:
+    """Extrator anterior, para comparação."""
+    words = text.lower().split()
+    keywords = [word.strip(".,!?;:") for word in words if word.lower() not in OLD_STOP_WORDS and len(word) > 3]
+    return list(set(keywords))[:10]
+
+
+def random_description(rng: random.Random, words: int) -> str:
+    # Frequências desiguais (Zipf aproximado), como em descrições reais
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+    chosen = rng.choices(VOCABULARY, weights=weights, k=words)
+    return "Tela de " + " ".join(chosen) + "."
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do extrator de palavras-chave")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 500, 5000, 50_000])
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'palavras':>9} {'extract':>12} {'antigo':>12} {'MB/s':>7}")
+    for size in args.sizes:
+        text = random_description(rng, size)
+        repeat = max(3, 20_000 // size)
+        new_s = timed(lambda: keyword_extractor.extract(text), repeat)
+        old_s = timed(lambda: legacy_extract(text), repeat)
+        mb_s = len(text.encode("utf-8")) / new_s / 1e6
+        print(f"{size:>9,} {new_s * 1e6:>9.1f} µs {old_s * 1e6:>9.1f} µs {mb_s:>7.1f}")
+
+    texts = [random_description(rng, rng.randint(10, 60)) for _ in range(args.batch)]
+    batch_s = timed(lambda: keyword_extractor.extract_many(texts), 3)
+    print(f"\nextract_many com {args.batch:,} descrições curtas: {args.batch / batch_s:,.0f}/s")
+
+    sample = texts[0]
+    stable = all(keyword_extractor.extract(sample) == keyword_extractor.extract(sample) for _ in range(100))
+    print(f"resultado estável entre chamadas: {stable}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Teste de carga ponta a ponta de application:app, in-process via ASGI (sem rede).
+
+Dispara /chat, /scrumban/board, /billing/status e /history com a concorrência e a
+mistura configuradas, usando um LLM falso determinístico no lugar de `agent.client`.
+Reporta p50/p95/p99, vazão por endpoint e a evolução do RSS ao longo do tempo, e grava
+tudo em JSON para comparação entre versões.
+
+Uso:
+    python benchmarks/bench_load.py --requests 2000 --concurrency 32 --output load.json
+    python benchmarks/bench_load.py --duration 30 --mix chat=1,board=1 --llm-latency 0.05
+    python benchmarks/bench_load.py --no-llm   # exercita o fallback do motor ML
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_llm import FakeLLM  # noqa: E402
+
+REPORT_VERSION = 1
+BENCH_USER = "bench_user"
+DEFAULT_MIX = "chat=4,board=2,billing=2,history=1"
+
+CHAT_MESSAGES = [
+    "Gerar cenário gherkin para a tela de login",
+    "Criar teste BDD para o cadastro de usuário",
+    "Automatizar o checkout com pagamento via Pix",
+    "Analisar a tela de dashboard",
+    "Validar o fluxo de perfil do usuário",
+    "Gerar cenário de teste para a listagem com filtros",
+    "Quais são as configurações disponíveis?",
+]
+
+
+def current_rss_mb() -> float:
+    """RSS atual (Linux via /proc); em outros sistemas usa o pico do processo."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"endpoint desconhecido na mistura: {name} (opções: {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ============================================
+# ENDPOINTS
+# ============================================
+
+async def call_chat(client: httpx.AsyncClient, i: int) -> httpx.Response:
+    message = CHAT_MESSAGES[i % len(CHAT_MESSAGES)]
+    return await client.post("/chat", json={"message": message, "user_id": BENCH_USER})
+
+
+async def call_board(client: httpx.AsyncClient, i: int) -> httpx.Response:
+    return await client.get("/scrumban/board")
+
+
+async def call_billing(client: httpx.AsyncClient, i: int) -> httpx.Response:
+    return await client.get("/billing/status", params={"user_id": BENCH_USER})
+
+
+async def call_history(client: httpx.AsyncClient, i: int) -> httpx.Response:
+    return await client.get("/history")
+
+
+ENDPOINTS = {
+    "chat": call_chat,
+    "board": call_board,
+    "billing": call_billing,
+    "history": call_history,
+}
+
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+class LoadRun:
+    def __init__(self, app, mix: Dict[str, float], concurrency: int, total: Optional[int], duration: Optional[float], seed: int, sample_interval: float):
+        self.app = app
+        self.concurrency = concurrency
+        self.total = total
+        self.duration = duration
+        self.sample_interval = sample_interval
+        self.latencies: Dict[str, List[float]] = {name: [] for name in mix}
+        self.errors: Dict[str, int] = {name: 0 for name in mix}
+        self.timeline: List[Dict] = []
+        self._names = list(mix)
+        self._weights = [mix[n] for n in self._names]
+        self._rng = random.Random(seed)
+        self._issued = 0
+        self._completed = 0
+
+    def _next(self) -> Optional[tuple]:
+        if self.total is not None and self._issued >= self.total:
+            return None
+        if self.duration is not None and time.perf_counter() - self._start >= self.duration:
+            return None
+        i = self._issued
+        self._issued += 1
+        return i, self._rng.choices(self._names, self._weights)[0]
+
+    async def _worker(self, client: httpx.AsyncClient) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            i, name = item
+            t0 = time.perf_counter()
+            try:
+                response = await ENDPOINTS[name](client, i)
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            self.latencies[name].append(time.perf_counter() - t0)
+            if not ok:
+                self.errors[name] += 1
+            self._completed += 1
+            if time.perf_counter() - self._last_sample >= self.sample_interval:
+                self._sample()
+
+    def _sample(self) -> None:
+        # Amostrado pelos próprios workers: via ASGI in-process os handlers síncronos
+        # raramente cedem o event loop, e uma task de amostragem ficaria sem rodar
+        self._last_sample = time.perf_counter()
+        self.timeline.append({
+            "t_s": round(self._last_sample - self._start, 3),
+            "rss_mb": round(current_rss_mb(), 1),
+            "completed": self._completed,
+        })
+
+    async def run(self) -> float:
+        transport = httpx.ASGITransport(app=self.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            self._start = time.perf_counter()
+            self._sample()
+            await asyncio.gather(*(self._worker(client) for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - self._start
+        self._sample()
+        return elapsed
+
+    def summary(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for name, values in self.latencies.items():
+            ordered = sorted(values)
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "mean_ms": round(1000 * sum(values) / len(values), 3) if values else 0.0,
+                "p50_ms": round(1000 * percentile(ordered, 50), 3),
+                "p95_ms": round(1000 * percentile(ordered, 95), 3),
+                "p99_ms": round(1000 * percentile(ordered, 99), 3),
+                "max_ms": round(1000 * ordered[-1], 3) if ordered else 0.0,
+            }
+        everything = sorted(v for values in self.latencies.values() for v in values)
+        rss = [s["rss_mb"] for s in self.timeline]
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": len(everything),
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(len(everything) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(1000 * percentile(everything, 50), 3),
+            "p95_ms": round(1000 * percentile(everything, 95), 3),
+            "p99_ms": round(1000 * percentile(everything, 99), 3),
+            "rss_start_mb": rss[0] if rss else 0.0,
+            "rss_end_mb": rss[-1] if rss else 0.0,
+            "rss_growth_mb": round(rss[-1] - rss[0], 1) if rss else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def prepare_app(args):
+    import agent
+    import application
+    from billing import billing_manager, PlanType
+
+    if args.no_llm:
+        agent.client = None
+    else:
+        agent.client = FakeLLM(
+            latency_s=args.llm_latency,
+            tokens_per_s=args.llm_token_rate,
+            completion_tokens=args.llm_tokens,
+            error_rate=args.llm_error_rate,
+        )
+    # Créditos de sobra para o billing não interromper a carga (o ULTRA usa float("inf"),
+    # que não é serializável em JSON)
+    user = billing_manager.create_user(BENCH_USER, PlanType.PRO)
+    user.credits = user.max_credits = 10 ** 9
+    application.asset_pipeline.load()
+    return application.app, agent.client
+
+
+def print_summary(summary: Dict) -> None:
+    print(f"{'endpoint':<10} {'reqs':>7} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in summary["endpoints"].items():
+        print(f"{name:<10} {s['requests']:>7} {s['errors']:>5} {s['throughput_rps']:>9.1f} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}")
+    print(
+        f"{'total':<10} {summary['requests']:>7} {summary['errors']:>5} {summary['throughput_rps']:>9.1f} "
+        f"{summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f}"
+    )
+    print(f"RSS: {summary['rss_start_mb']:.1f} -> {summary['rss_end_mb']:.1f} MB ({summary['rss_growth_mb']:+.1f} MB) em {summary['elapsed_s']:.1f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga in-process de application:app")
+    parser.add_argument("--requests", type=int, default=2000, help="Total de requisições (ignorado com --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Duração em segundos em vez de um total fixo")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Pesos por endpoint, ex.: chat=4,board=2,billing=2,history=1")
+    parser.add_argument("--warmup", type=int, default=50, help="Requisições de aquecimento (fora das estatísticas)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Tempo até o primeiro token do LLM falso (s)")
+    parser.add_argument("--llm-token-rate", type=float, default=2000.0, help="Tokens/s do LLM falso (0 = instantâneo)")
+    parser.add_argument("--llm-tokens", type=int, default=120, help="Tokens de completion por resposta")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fração de prompts que falham")
+    parser.add_argument("--no-llm", action="store_true", help="Sem LLM: /chat usa o fallback do motor ML")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="Intervalo de amostragem do RSS (s)")
+    parser.add_argument("--output", default=None, help="Arquivo JSON com os resultados")
+    parser.add_argument("--verbose", action="store_true", help="Mantém os prints da aplicação")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    total = None if args.duration else args.requests
+
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(sys.stdout if args.verbose else devnull), \
+            contextlib.redirect_stderr(sys.stderr if args.verbose else devnull):
+        app, llm = prepare_app(args)
+        if args.warmup:
+            asyncio.run(LoadRun(app, mix, args.concurrency, args.warmup, None, args.seed + 1, 60.0).run())
+        run = LoadRun(app, mix, args.concurrency, total, args.duration, args.seed, args.sample_interval)
+        elapsed = asyncio.run(run.run())
+
+    summary = run.summary(elapsed)
+    print_summary(summary)
+    if llm is not None:
+        print(f"Chamadas ao LLM falso: {llm.calls}")
+
+    if args.output:
+        report = {
+            "version": REPORT_VERSION,
+            "started_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "config": {
+                "requests": total,
+                "duration_s": args.duration,
+                "concurrency": args.concurrency,
+                "mix": mix,
+                "seed": args.seed,
+                "llm": None if args.no_llm else {
+                    "latency_s": args.llm_latency,
+                    "tokens_per_s": args.llm_token_rate,
+                    "completion_tokens": args.llm_tokens,
+                    "error_rate": args.llm_error_rate,
+                },
+            },
+            "summary": summary,
+            "rss_timeline": run.timeline,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de escalabilidade do motor ML por modo de executor e número de workers.
+
+Processa o mesmo lote de pares (descrição de tela, intenção) com MLEngine em modo
+inline, thread e process, variando os workers, e reporta a vazão e o ganho sobre o
+inline. `--heavy` repete a descrição para simular um analisador mais pesado.
+
+Uso:
+    python benchmarks/bench_ml_executor.py --jobs 4000 --heavy 20
+    python benchmarks/bench_ml_executor.py --workers 1,2,4,8 --modes process
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+from typing import List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from ml_engine import MLEngine  # noqa: E402
+
+DESCRIPTIONS = [
+    "Tela de Login com campos 'Usuário', 'Senha', botão 'Entrar' e link 'Esqueci a Senha'.",
+    "Tela de Cadastro de Novo Usuário com campos 'Nome', 'Email', 'CPF', 'Senha', 'Confirmar Senha' e botão 'Criar Conta'.",
+    "Tela de Checkout com formulário de endereço, seleção de método de pagamento (Cartão, Pix) e botão 'Finalizar Compra'.",
+    "Tela de Listagem com tabela de itens, filtros, busca, paginação e botões de ação (editar, deletar).",
+]
+
+
+def build_jobs(count: int, heavy: int) -> List[Tuple[str, str]]:
+    return [
+        (" ".join([DESCRIPTIONS[i % len(DESCRIPTIONS)]] * heavy), f"validar o fluxo {i}")
+        for i in range(count)
+    ]
+
+
+def run_case(mode: str, workers: int, jobs: List[Tuple[str, str]], chunksize: int) -> float:
+    engine = MLEngine(mode, workers)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        engine.start()  # workers aquecidos fora da medição
+    try:
+        start = time.perf_counter()
+        results = engine.analyze_and_generate_batch(jobs, chunksize=chunksize)
+        elapsed = time.perf_counter() - start
+    finally:
+        engine.shutdown()
+    assert len(results) == len(jobs)
+    return len(jobs) / elapsed
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(w) for w in sorted({1, 2, 4, cpus}) if w <= cpus)
+    parser = argparse.ArgumentParser(description="Escalabilidade do motor ML por executor")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--heavy", type=int, default=10, help="Repetições da descrição por job (custo de CPU)")
+    parser.add_argument("--workers", default=default_workers, help="Lista de contagens de workers")
+    parser.add_argument("--modes", default="thread,process")
+    parser.add_argument("--chunksize", type=int, default=16)
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.jobs, args.heavy)
+    baseline = run_case("inline", 1, jobs, args.chunksize)
+    print(f"CPUs: {cpus}  jobs: {args.jobs}  heavy: {args.heavy}")
+    print(f"{'modo':<8} {'workers':>7} {'jobs/s':>10} {'ganho':>7}")
+    print(f"{'inline':<8} {1:>7} {baseline:>10,.0f} {1.0:>6.2f}x")
+    for mode in args.modes.split(","):
+        for workers in (int(w) for w in args.workers.split(",")):
+            rate = run_case(mode, workers, jobs, args.chunksize)
+            print(f"{mode:<8} {workers:>7} {rate:>10,.0f} {rate / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark da exportação de relatórios em streaming (zip de .feature, CSV e JSON).
+
+Monta um histórico sintético grande (cenários, análises de tela e tarefas) e, para
+cada formato, consome os blocos do gerador sem guardá-los, medindo a vazão e o
+crescimento do RSS durante a exportação. Para comparação, monta o mesmo relatório
+inteiro em memória (json.dumps / zip em BytesIO), como faria uma exportação sem
+streaming.
+
+Uso:
+    python benchmarks/bench_report_export.py --scenarios 20000 --screens 2000 --tasks 5000
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from typing import Callable, Iterator
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from report_export import EXPORT_FORMATS, ReportSnapshot, iter_report, slugify  # noqa: E402
+from scenario_store import ScenarioEntry  # noqa: E402
+from scrumban import Task, TaskPriority, TaskStatus  # noqa: E402
+
+SCREENS = ["login", "registration", "checkout", "dashboard", "list", "form"]
+
+
+def build_snapshot(scenarios: int, screens: int, tasks: int) -> ReportSnapshot:
+    entries = []
+    for i in range(scenarios):
+        screen = SCREENS[i % len(SCREENS)]
+        steps = "".join(f'    E eu preencho o campo "campo {k}" com "<valor {i}>"\n' for k in range(8))
+        gherkin = (
+            f"Feature: Validação da tela {screen} {i}\n  Como um usuário\n  Quero validar o fluxo {i}\n\n"
+            f"  Scenario: fluxo principal {i}\n    Dado que estou na página de {screen}\n{steps}"
+            f'    Então devo ver a mensagem "sucesso {i}"\n'
+        )
+        entries.append(ScenarioEntry(i + 1, f"gerar cenário {i} para a tela de {screen}", screen, gherkin, "llm"))
+    analyses = [
+        {
+            "screen_type": SCREENS[i % len(SCREENS)],
+            "confidence": 0.9,
+            "elements": [{"type": "input", "label": f"Campo {k}", "name": f"campo_{k}", "required": True, "placeholder": ""} for k in range(6)],
+            "keywords": ["tela", "campo", "botão"],
+            "description": f"Tela {i} com campos e botão 'Salvar'.",
+        }
+        for i in range(screens)
+    ]
+    board_tasks = []
+    for i in range(tasks):
+        task = Task(f"Validar fluxo {i}", f"Cenário de regressão número {i}", TaskPriority.MEDIUM)
+        task.update_status(TaskStatus.DONE if i % 3 == 0 else TaskStatus.TODO)
+        board_tasks.append(task)
+    return ReportSnapshot("bench_user", entries, analyses, board_tasks, "bench")
+
+
+def buffered_report(snapshot: ReportSnapshot, export_format: str) -> bytes:
+    """Mesmo conteúdo montado inteiro em memória (referência sem streaming)."""
+    if export_format == "json":
+        return json.dumps({
+            **snapshot.summary(),
+            "scenarios": [entry.to_dict() for entry in snapshot.scenarios],
+            "screen_analyses": list(snapshot.screen_records()),
+            "tasks": [task.to_dict() for task in snapshot.tasks],
+        }, ensure_ascii=False).encode("utf-8")
+    if export_format == "zip":
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for number, entry in enumerate(snapshot.scenarios, 1):
+                archive.writestr(f"features/{number:05d}-{entry.screen_type}-{slugify(entry.intent)}.feature", entry.gherkin)
+            archive.writestr("screen_analyses.jsonl", "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in snapshot.screen_records()))
+            archive.writestr("tasks.jsonl", "".join(json.dumps(t.to_dict(), ensure_ascii=False) + "\n" for t in snapshot.tasks))
+        return buffer.getvalue()
+    return b"".join(iter_report(snapshot, export_format))
+
+
+def current_rss_mb() -> float:
+    """RSS atual (Linux via /proc); em outros sistemas usa o pico do processo."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def measure(produce: Callable[[], Iterator[bytes]]) -> tuple:
+    baseline = peak = current_rss_mb()
+    total = chunks = largest = 0
+    start = time.perf_counter()
+    for chunk in produce():
+        total += len(chunk)
+        chunks += 1
+        largest = max(largest, len(chunk))
+        peak = max(peak, current_rss_mb())
+    return time.perf_counter() - start, total, chunks, largest, peak - baseline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da exportação de relatórios em streaming")
+    parser.add_argument("--scenarios", type=int, default=20_000)
+    parser.add_argument("--screens", type=int, default=2_000)
+    parser.add_argument("--tasks", type=int, default=5_000)
+    args = parser.parse_args()
+
+    snapshot = build_snapshot(args.scenarios, args.screens, args.tasks)
+    print(f"histórico: {args.scenarios:,} cenários, {args.screens:,} análises, {args.tasks:,} tarefas\n")
+    print(f"{'formato':<8} {'modo':<10} {'tempo':>8} {'MB':>8} {'MB/s':>7} {'blocos':>7} {'maior':>9} {'+RSS':>8}")
+    for export_format in EXPORT_FORMATS:
+        modes = (
+            ("streaming", lambda: iter_report(snapshot, export_format)),
+            ("em memória", lambda: iter([buffered_report(snapshot, export_format)])),
+        )
+        for mode, produce in modes:
+            elapsed, total, chunks, largest, rss = measure(produce)
+            mb = total / (1024 * 1024)
+            print(
+                f"{export_format:<8} {mode:<10} {elapsed:>7.2f}s {mb:>8.1f} {mb / elapsed:>7.1f} {chunks:>7,} "
+                f"{largest / 1024:>7.0f}KB {rss:>6.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark da exportação de roads.geojson (tools/osm_export.py).
+
+Compara o caminho antigo (GeoDataFrame + to_file + lista de LineStrings) com o
+escritor em streaming. Cada modo roda em um subprocesso para que o pico de RSS
+seja medido de forma independente.
+
+Uso:
+    python benchmarks/bench_roads_export.py --grid 250
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import networkx as nx
+import numpy as np
+from shapely.geometry import LineString
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS_DIR)
+
+from export_stats import peak_rss_mb  # noqa: E402
+from osm_export import M_PER_DEG_LAT, M_PER_DEG_LON, stream_roads  # noqa: E402
+
+LON0, LAT0 = -46.57, -23.62
+BLOCK_M = 100.0
+
+
+def build_graph(grid: int) -> nx.MultiDiGraph:
+    dx = BLOCK_M / (M_PER_DEG_LON * np.cos(np.radians(LAT0)))
+    dy = BLOCK_M / M_PER_DEG_LAT
+    G = nx.MultiDiGraph(crs="EPSG:4326")
+    for i in range(grid):
+        for j in range(grid):
+            G.add_node(i * grid + j, x=LON0 + i * dx, y=LAT0 + j * dy)
+    for i in range(grid):
+        for j in range(grid):
+            u = i * grid + j
+            for v in ((u + grid) if i + 1 < grid else None, (u + 1) if j + 1 < grid else None):
+                if v is None:
+                    continue
+                ux, uy = G.nodes[u]["x"], G.nodes[u]["y"]
+                vx, vy = G.nodes[v]["x"], G.nodes[v]["y"]
+                # Curved centerline with a few vertices, like simplified OSM ways
+                t = np.linspace(0.0, 1.0, 6)
+                bend = np.sin(t * np.pi) * dx * 0.05
+                coords = np.column_stack((ux + (vx - ux) * t + bend, uy + (vy - uy) * t + bend))
+                attrs = {
+                    "osmid": u * 10 + v,
+                    "highway": "residential",
+                    "name": f"Rua {i}-{j}",
+                    "oneway": False,
+                    "length": BLOCK_M,
+                    "geometry": LineString(coords),
+                }
+                G.add_edge(u, v, **attrs)
+                G.add_edge(v, u, **attrs)
+    return G
+
+
+def run_mode(mode: str, grid: int, out_path: str, precision: int) -> None:
+    G = build_graph(grid)
+    start = time.perf_counter()
+    if mode == "legacy":
+        import osmnx as ox
+
+        edges_gdf = ox.graph_to_gdfs(G, nodes=False, edges=True)
+        edges_gdf.to_file(out_path, driver="GeoJSON")
+        lines = [geom for geom in edges_gdf.geometry if isinstance(geom, LineString)]
+    else:
+        lines = stream_roads(G, out_path, precision)
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "features": len(lines),
+                "seconds": round(elapsed, 3),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "output_mb": round(os.path.getsize(out_path) / (1024.0 * 1024.0), 2),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de exportação de roads.geojson")
+    parser.add_argument("--grid", type=int, default=250, help="Nós por lado da malha sintética")
+    parser.add_argument("--precision", type=int, default=6)
+    parser.add_argument("--mode", choices=["legacy", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.grid, args.out, args.precision)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("legacy", "stream"):
+            out = os.path.join(tmp, f"roads_{mode}.geojson")
+            cmd = [sys.executable, __file__, "--mode", mode, "--grid", str(args.grid), "--precision", str(args.precision), "--out", out]
+            result = json.loads(subprocess.check_output(cmd, text=True).strip().splitlines()[-1])
+            print(
+                f"{result['mode']:<8} {result['features']:>9} features  {result['seconds']:>7.2f} s  "
+                f"peak RSS {result['peak_rss_mb']:>8.1f} MB  output {result['output_mb']:>8.2f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark do armazenamento de cenários com índice invertido.
+
+Insere N cenários sintéticos (intenções variadas, Gherkin do motor ML) e mede a vazão
+de inserção, a latência das consultas de reaproveitamento (`find_reusable`) e de
+"cenários similares", a taxa de acerto de quase duplicatas e a memória ocupada.
+
+Uso:
+    python benchmarks/bench_scenario_store.py --entries 100000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from ml_engine import ScenarioGenerator, ScreenAnalysis  # noqa: E402
+from scenario_store import ScenarioStore  # noqa: E402
+
+SCREENS = [
+    "Tela de Login com campos 'Usuário', 'Senha', botão 'Entrar' e link 'Esqueci a Senha'.",
+    "Tela de Cadastro com campos 'Nome', 'Email', 'CPF', 'Senha' e botão 'Criar Conta'.",
+    "Tela de Checkout com endereço, método de pagamento e botão 'Finalizar Compra'.",
+    "Tela de Dashboard com gráficos, tabelas de dados e menu lateral.",
+    "Tela de Listagem com tabela de itens, filtros, busca e paginação.",
+]
+VERBS = ["validar", "verificar", "testar", "garantir", "checar", "confirmar", "automatizar", "cobrir"]
+OBJECTS = [
+    "login", "cadastro", "pagamento", "boleto", "pix", "cartão", "endereço", "senha", "email", "cpf",
+    "carrinho", "cupom", "frete", "relatório", "filtro", "busca", "paginação", "exportação", "perfil",
+    "notificação", "permissão", "sessão", "token", "upload", "avatar", "pedido", "estoque", "nota",
+]
+QUALIFIERS = [
+    "com sucesso", "inválido", "expirado", "sem permissão", "em branco", "duplicado", "bloqueado",
+    "no mobile", "com timeout", "após logout", "com acentuação", "em lote", "parcial", "agendado",
+]
+
+
+def random_intent(rng: random.Random) -> str:
+    words = [rng.choice(VERBS), "o fluxo de", rng.choice(OBJECTS), "e", rng.choice(OBJECTS), rng.choice(QUALIFIERS)]
+    return " ".join(words) + f" caso {rng.randrange(100_000)}"
+
+
+def build_entries(count: int, seed: int) -> List[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    analyses = [ScreenAnalysis(d) for d in SCREENS]
+    entries = []
+    for _ in range(count):
+        analysis = rng.choice(analyses)
+        intent = random_intent(rng)
+        gherkin = ScenarioGenerator(analysis).generate_scenario(intent)
+        entries.append((intent, analysis.screen_type.value, gherkin))
+    return entries
+
+
+def current_rss_mb() -> float:
+    """RSS atual (Linux via /proc); em outros sistemas usa o pico do processo."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6  # noqa: E731
+    return f"p50 {pick(0.50):7.1f} µs  p99 {pick(0.99):7.1f} µs"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do índice de cenários")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=6)
+    args = parser.parse_args()
+
+    entries = build_entries(args.entries, args.seed)
+    store = ScenarioStore(max_entries=args.entries)
+
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    for intent, screen_type, gherkin in entries:
+        store.add(intent, screen_type, gherkin, "llm")
+    elapsed = time.perf_counter() - start
+    print(
+        f"inserção: {len(store):,} cenários em {elapsed:.1f}s ({len(store) / elapsed:,.0f}/s), "
+        f"+{current_rss_mb() - rss_before:.0f} MB de RSS (termos + índice)"
+    )
+
+    rng = random.Random(args.seed + 1)
+    sample = [entries[rng.randrange(len(entries))] for _ in range(args.queries)]
+
+    # Quase duplicatas: mesma intenção com outra caixa, acentos e palavra extra
+    reuse_times, hits = [], 0
+    for intent, screen_type, _ in sample:
+        variant = intent.upper().replace("Ã", "A") + " agora"
+        t = time.perf_counter()
+        found = store.find_reusable(variant, screen_type)
+        reuse_times.append(time.perf_counter() - t)
+        hits += found is not None and found.intent == intent
+    print(f"find_reusable: {percentiles(reuse_times)}  acerto {hits / len(sample):.1%}")
+
+    similar_times = []
+    for intent, screen_type, _ in sample:
+        t = time.perf_counter()
+        store.similar(intent, limit=5)
+        similar_times.append(time.perf_counter() - t)
+    print(f"similar:       {percentiles(similar_times)}")
+
+    miss_times = []
+    for _ in range(args.queries):
+        t = time.perf_counter()
+        store.find_reusable(random_intent(rng), "login")
+        miss_times.append(time.perf_counter() - t)
+    print(f"intenção nova: {percentiles(miss_times)}")
+
+
+if __name__ == "__main__":
+    main()
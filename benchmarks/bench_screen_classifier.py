@@ -0,0 +1,112 @@
+"""
+Benchmark do classificador de tipo de tela contra a busca por palavras-chave.
+
+Avalia os dois num conjunto rotulado separado do treino (descrições sintéticas com
+outra semente e as descrições de tela usadas pelo agente), e mede a acurácia, o
+erro de calibração (ECE) da confiança, a latência por item (chamada individual e em
+lote) e o tempo de carregamento do modelo. Confere também que o cache de palavras,
+com um limite pequeno, é reiniciado sem perder as palavras do lote corrente.
+
+Uso:
+    python benchmarks/bench_screen_classifier.py --per-class 200 --batch 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from ml_engine import ScreenAnalysis  # noqa: E402
+from screen_classifier import (  # noqa: E402
+    MODEL_PATH, ScreenClassifier, expected_calibration_error, synthetic_corpus
+)
+
+# Descrições do agente (simulate_screen_analysis) com o tipo esperado
+AGENT_SCREENS = [
+    ("Tela de Login com campos 'Usuário', 'Senha', botão 'Entrar' e link 'Esqueci a Senha'.", "login"),
+    ("Tela de Autenticação com campos 'Email', 'Senha', botão 'Conectar' e opção 'Lembrar-me'.", "login"),
+    ("Tela de Cadastro de Novo Usuário com campos 'Nome', 'Email', 'CPF', 'Senha', 'Confirmar Senha' e botão 'Criar Conta'.", "registration"),
+    ("Tela de Checkout com formulário de endereço, seleção de método de pagamento (Cartão, Pix) e botão 'Finalizar Compra'.", "checkout"),
+    ("Tela de Dashboard com gráficos, tabelas de dados, botões de ação e menu lateral de navegação.", "dashboard"),
+    ("Tela de Listagem com tabela de itens, filtros, busca, paginação e botões de ação (editar, deletar).", "list"),
+    ("Tela de Perfil de Usuário com campos editáveis, foto, informações pessoais e botão 'Salvar'.", "form"),
+    ("Tela de Configurações com abas, toggles, dropdowns e botão 'Salvar Alterações'.", "form"),
+]
+
+
+def per_item_us(fn: Callable[[], object], items: int, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / items * 1e6
+
+
+def check_word_cache_reset(texts: List[str]) -> bool:
+    """Com o cache limitado a poucas palavras, os logits continuam iguais aos do modelo sem limite."""
+    reference = ScreenClassifier.load(MODEL_PATH)
+    small = ScreenClassifier.load(MODEL_PATH, max_cached_words=100)
+    small.predict(["tela de login com senha"])
+    batches = [["tela de login com senha " + " ".join(f"campo{i}x{k}" for k in range(60))] for i in range(5)]
+    batches.append(texts[:50])
+    return all(np.allclose(small.logits(batch), reference.logits(batch), atol=1e-5) for batch in batches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Classificador de tipo de tela vs. palavras-chave")
+    parser.add_argument("--per-class", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = ScreenClassifier.load(MODEL_PATH)
+    print(f"carregamento do modelo: {(time.perf_counter() - start) * 1000:.1f} ms ({os.path.getsize(MODEL_PATH) / 1024:.0f} KB)")
+
+    texts, labels = synthetic_corpus(args.per_class, args.seed)
+    texts += [text for text, _ in AGENT_SCREENS]
+    labels += [label for _, label in AGENT_SCREENS]
+    analyses = [ScreenAnalysis(text, elements=[]) for text in texts]
+
+    keyword_hits = [a._keyword_screen_type().value == label for a, label in zip(analyses, labels)]
+    proba = model.predict_proba(texts)
+    y = np.array([model.classes.index(label) for label in labels])
+    model_hits = proba.argmax(axis=1) == y
+    legacy_confidence = np.array([
+        min(0.5 + 0.2 * (a._keyword_screen_type().value != "unknown") + 0.2 * bool(a.elements) + 0.1 * (len(a.keywords) > 5), 1.0)
+        for a in analyses
+    ])
+
+    print(f"\n{len(texts):,} descrições rotuladas ({len(AGENT_SCREENS)} do agente)")
+    print(f"{'':<22} {'acurácia':>9} {'agente':>8} {'ECE':>7}")
+    agent_slice = slice(len(texts) - len(AGENT_SCREENS), None)
+    keyword_ece = float(np.mean(np.abs(np.array(keyword_hits, dtype=float) - legacy_confidence)))
+    print(
+        f"{'palavras-chave':<22} {np.mean(keyword_hits):>9.1%} {np.mean(keyword_hits[agent_slice]):>8.1%} "
+        f"{keyword_ece:>7.3f}*"
+    )
+    print(
+        f"{'classificador':<22} {model_hits.mean():>9.1%} {model_hits[agent_slice].mean():>8.1%} "
+        f"{expected_calibration_error(proba, y):>7.3f}"
+    )
+    print("* confiança aditiva fixa; erro médio entre confiança e acerto")
+
+    sample: List[str] = (texts * (args.batch // len(texts) + 1))[:args.batch]
+    holders = [ScreenAnalysis(text, elements=[]) for text in sample]
+    keyword_us = per_item_us(lambda: [h._keyword_screen_type() for h in holders], len(sample))
+    single_us = per_item_us(lambda: [model.predict_one(text) for text in sample[:200]], 200)
+    batch_us = per_item_us(lambda: model.predict(sample), len(sample))
+    print(f"\ncache de palavras reiniciado sem erro: {check_word_cache_reset(texts)}")
+    print(f"latência por item: palavras-chave {keyword_us:.1f} µs | classificador individual {single_us:.1f} µs | "
+          f"em lote de {len(sample):,} {batch_us:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark das rotas em lote do Scrumban contra as rotas por tarefa.
+
+In-process via ASGI (sem rede): cria N tarefas, move todas para "em progresso" e
+depois as deleta, primeiro com uma requisição por tarefa (/scrumban/task e
+/scrumban/task/status) e depois com as rotas em lote (/scrumban/tasks,
+/scrumban/tasks/status e /scrumban/tasks/delete), e compara a vazão em tarefas/s.
+
+Uso:
+    python benchmarks/bench_scrumban_bulk.py --tasks 2000 --batch 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from application import app  # noqa: E402
+
+
+def task_payload(i: int) -> dict:
+    return {"title": f"Validar fluxo {i}", "description": f"Cenário de regressão número {i}", "priority": "medium"}
+
+
+async def per_task(client: httpx.AsyncClient, board_id: str, count: int) -> List[float]:
+    ids = []
+    start = time.perf_counter()
+    for i in range(count):
+        response = await client.post("/scrumban/task", json={"board_id": board_id, **task_payload(i)})
+        ids.append(response.json()["task"]["id"])
+    create_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for task_id in ids:
+        await client.post("/scrumban/task/status", json={"board_id": board_id, "task_id": task_id, "status": "inprogress"})
+    status_s = time.perf_counter() - start
+    return [create_s, status_s]
+
+
+async def bulk(client: httpx.AsyncClient, board_id: str, count: int, batch: int) -> List[float]:
+    ids = []
+    start = time.perf_counter()
+    for offset in range(0, count, batch):
+        tasks = [task_payload(i) for i in range(offset, min(offset + batch, count))]
+        response = await client.post("/scrumban/tasks", json={"board_id": board_id, "tasks": tasks})
+        ids.extend(task["id"] for task in response.json()["tasks"])
+    create_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, count, batch):
+        updates = [{"task_id": task_id, "status": "inprogress"} for task_id in ids[offset:offset + batch]]
+        response = await client.post("/scrumban/tasks/status", json={"board_id": board_id, "updates": updates})
+        assert response.json()["success"]
+    status_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, count, batch):
+        response = await client.post("/scrumban/tasks/delete", json={"board_id": board_id, "task_ids": ids[offset:offset + batch]})
+        assert response.json()["success"]
+    delete_s = time.perf_counter() - start
+    return [create_s, status_s, delete_s]
+
+
+async def run(count: int, batch: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        single = await per_task(client, "bench_single", count)
+        batched = await bulk(client, "bench_bulk", count, batch)
+
+    print(f"{count:,} tarefas, lotes de {batch}")
+    print(f"{'operação':<12} {'por tarefa/s':>13} {'em lote/s':>11} {'ganho':>7}")
+    for label, single_s, bulk_s in zip(["criar", "status"], single, batched):
+        print(f"{label:<12} {count / single_s:>13,.0f} {count / bulk_s:>11,.0f} {single_s / bulk_s:>6.1f}x")
+    print(f"{'deletar':<12} {'-':>13} {count / batched[2]:>11,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rotas em lote do Scrumban vs. por tarefa")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark da busca textual do Scrumban com o índice invertido.
+
+Cria N tarefas a partir de mensagens de chat sintéticas (como create_task_from_message),
+com comentários e tags em parte delas, e mede a indexação, a latência das buscas por
+classe de consulta (termo raro, termo comum, vários termos), a paginação servida do
+cache e, para referência, a varredura completa sem índice.
+
+Uso:
+    python benchmarks/bench_scrumban_search.py --tasks 100000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from scrumban import ScrumbanBoard, TaskPriority  # noqa: E402
+from text_index import fold_text  # noqa: E402
+
+VERBS = ["Gerar cenário", "Validar", "Testar", "Automatizar", "Revisar", "Criar teste para"]
+SCREENS = ["login", "cadastro", "checkout", "dashboard", "listagem", "perfil", "relatórios", "notificações"]
+DETAILS = [
+    "com senha inválida", "com botões desabilitados", "no fluxo de pagamento via Pix", "com campos obrigatórios",
+    "após expiração da sessão", "com upload de avatar", "com filtros e paginação", "em dispositivos móveis",
+    "com cupom de desconto", "com permissões de administrador", "com acentuação nos nomes", "em lote",
+]
+TAGS = ["regressão", "smoke", "ui", "api", "mobile", "segurança", "performance", "acessibilidade"]
+
+
+def build_board(tasks: int, seed: int) -> ScrumbanBoard:
+    rng = random.Random(seed)
+    board = ScrumbanBoard("bench")
+    for i in range(tasks):
+        message = f"{rng.choice(VERBS)} da tela de {rng.choice(SCREENS)} {rng.choice(DETAILS)} (pedido {i})"
+        task = board.create_task(message[:100], message, TaskPriority.MEDIUM, "Nebula Agent")
+        if i % 4 == 0:
+            board.add_comment(task.id, "qa", f"Reproduzido {rng.choice(DETAILS)}")
+        if i % 3 == 0:
+            board.add_tag(task.id, rng.choice(TAGS))
+    return board
+
+
+def measure(label: str, queries: List[str], fn: Callable[[str], object]) -> None:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000  # noqa: E731
+    print(f"{label:<28} p50 {pick(0.50):8.3f} ms  p99 {pick(0.99):8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da busca do Scrumban")
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    board = build_board(args.tasks, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.tasks:,} tarefas criadas e indexadas em {elapsed:.1f}s ({args.tasks / elapsed:,.0f}/s)")
+
+    rng = random.Random(args.seed + 1)
+    rare = [f"pedido {rng.randrange(args.tasks)}" for _ in range(args.queries)]
+    common = [rng.choice(SCREENS) for _ in range(args.queries)]
+    multi = [f"{rng.choice(SCREENS)} {rng.choice(DETAILS).split()[-1]} {rng.choice(TAGS)}" for _ in range(args.queries)]
+
+    # Cada consulta invalida o cache antes, para medir o ranqueamento completo
+    def cold(query: str) -> None:
+        board.search_index._cache.clear()
+        board.search_tasks(query)
+
+    measure("termo raro", rare, cold)
+    measure("termo comum (1ª página)", common, cold)
+    measure("vários termos", multi, cold)
+    measure("próximas páginas (cache)", common, lambda q: board.search_tasks(q, offset=rng.randrange(0, 500), limit=20))
+    measure("comum + filtro de status", common, lambda q: board.search_tasks(q, status=board.get_task(next(iter(board.tasks))).status))
+
+    folded = {task_id: fold_text(f"{t.title} {t.description}") for task_id, t in board.tasks.items()}
+    measure(
+        "varredura sem índice",
+        rare[:20],
+        lambda q: [task_id for task_id, text in folded.items() if all(w in text for w in fold_text(q).split())],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark do gerador de spawn points (tools/osm_export.py).
+
+Gera uma malha viária sintética em lon/lat (quarteirões ao redor de São Caetano do Sul),
+com prédios ocupando o miolo de cada quarteirão, e mede o tempo de amostragem.
+
+Uso:
+    python benchmarks/bench_spawn_points.py --grid 60 --counts 100000 250000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from shapely.geometry import LineString, Polygon, box
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from osm_export import M_PER_DEG_LAT, M_PER_DEG_LON, SpawnConfig, sample_spawn_points  # noqa: E402
+
+LON0, LAT0 = -46.57, -23.62
+BLOCK_M = 100.0
+SETBACK_M = 8.0
+
+
+def build_city(grid: int):
+    dx = BLOCK_M / (M_PER_DEG_LON * np.cos(np.radians(LAT0)))
+    dy = BLOCK_M / M_PER_DEG_LAT
+    lines = []
+    for i in range(grid + 1):
+        x = LON0 + i * dx
+        y = LAT0 + i * dy
+        for j in range(grid):
+            lines.append(LineString([(x, LAT0 + j * dy), (x, LAT0 + (j + 1) * dy)]))
+            lines.append(LineString([(LON0 + j * dx, y), (LON0 + (j + 1) * dx, y)]))
+    sx = dx * SETBACK_M / BLOCK_M
+    sy = dy * SETBACK_M / BLOCK_M
+    footprints = [
+        box(LON0 + i * dx + sx, LAT0 + j * dy + sy, LON0 + (i + 1) * dx - sx, LAT0 + (j + 1) * dy - sy)
+        for i in range(grid)
+        for j in range(grid)
+    ]
+    aoi = Polygon([(LON0, LAT0), (LON0 + grid * dx, LAT0), (LON0 + grid * dx, LAT0 + grid * dy), (LON0, LAT0 + grid * dy)])
+    return aoi, lines, footprints
+
+
+def run(label: str, aoi, lines, footprints, config: SpawnConfig) -> None:
+    start = time.perf_counter()
+    xy = sample_spawn_points(aoi, lines, config, footprints)
+    elapsed = time.perf_counter() - start
+    rate = len(xy) / elapsed if elapsed else float("inf")
+    print(f"{label:<40} {len(xy):>8} pts  {elapsed * 1000:>9.1f} ms  {rate:>12,.0f} pts/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de geração de spawn points")
+    parser.add_argument("--grid", type=int, default=60, help="Quarteirões por lado da malha sintética")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100_000, 250_000])
+    parser.add_argument("--spacing", type=float, default=1.0, help="Espaçamento mínimo (m) para o caso Poisson-disk")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    aoi, lines, footprints = build_city(args.grid)
+    print(f"Malha: {len(lines)} segmentos, {len(footprints)} prédios\n")
+    for count in args.counts:
+        run(f"uniforme (n={count})", aoi, lines, None, SpawnConfig(count=count, seed=args.seed))
+        run(f"uniforme + prédios (n={count})", aoi, lines, footprints, SpawnConfig(count=count, seed=args.seed))
+        run(
+            f"poisson {args.spacing}m + prédios (n={count})",
+            aoi,
+            lines,
+            footprints,
+            SpawnConfig(count=count, seed=args.seed, min_spacing_m=args.spacing),
+        )
+
+
+if __name__ == "__main__":
+    main()
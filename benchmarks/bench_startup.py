@@ -0,0 +1,124 @@
+"""
+Orçamento de import e benchmark de cold start.
+
+1. Roda `python -X importtime -c "import application"` (com uma OPENAI_API_KEY fictícia)
+   e falha (exit 1) se o tempo cumulativo passar do orçamento ou se módulos pesados
+   que devem ser preguiçosos (openai) forem importados na inicialização.
+2. Sobe `uvicorn application:app` em um subprocesso e mede o tempo até a primeira
+   resposta 200 de /health.
+
+Uso:
+    python benchmarks/bench_startup.py --budget-ms 1500 --runs 3
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("openai",)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["OPENAI_API_KEY"] = env.get("OPENAI_API_KEY") or "sk-bench-placeholder"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_imports() -> Tuple[int, List[Tuple[int, str]], List[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import application"],
+        cwd=ROOT_DIR,
+        env=child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    # Imports diretos feitos por application (um nível abaixo na árvore do -X importtime)
+    direct: List[Tuple[int, str]] = []
+    imported: List[str] = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        imported.append(name)
+        if indent == 3:
+            direct.append((cumulative, name))
+        if name == "application":
+            total_us = cumulative
+    return total_us, sorted(direct, reverse=True), imported
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_health(timeout_s: float = 30.0) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "application:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT_DIR,
+        env=child_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout_s:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("/health não respondeu a tempo")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Orçamento de import e tempo até o primeiro /health")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Orçamento do import cumulativo de application")
+    parser.add_argument("--runs", type=int, default=3, help="Repetições do cold start")
+    parser.add_argument("--skip-server", action="store_true", help="Mede apenas o import")
+    args = parser.parse_args()
+
+    total_us, direct, imported = measure_imports()
+    print(f"import application: {total_us / 1000:.1f} ms (orçamento {args.budget_ms:.0f} ms)")
+    for cumulative, name in direct[:8]:
+        print(f"  {name:<30} {cumulative / 1000:>8.1f} ms")
+    eager = [name for name in imported if name.split(".")[0] in LAZY_MODULES]
+
+    failures = []
+    if total_us / 1000 > args.budget_ms:
+        failures.append(f"import acima do orçamento ({total_us / 1000:.1f} ms > {args.budget_ms:.0f} ms)")
+    if eager:
+        failures.append(f"módulos preguiçosos importados na inicialização: {sorted(set(eager))[:5]}")
+
+    if not args.skip_server:
+        samples = [time_to_first_health() for _ in range(args.runs)]
+        print(f"primeiro /health: mediana {statistics.median(samples) * 1000:.0f} ms ({', '.join(f'{s * 1000:.0f}' for s in samples)} ms)")
+
+    if failures:
+        for failure in failures:
+            print(f"FALHA: {failure}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark de requisições/segundo para GET / (index.html).
+
+Compara o handler antigo (abre e lê o index.html do disco a cada requisição) com o
+pipeline de assets em memória, ambos rodando in-process via ASGI (sem rede).
+
+Uso:
+    python benchmarks/bench_static.py --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Tuple
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from application import app, asset_pipeline  # noqa: E402
+
+
+def build_legacy_app() -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.get("/", response_class=HTMLResponse)
+    async def serve_index():
+        index_path = os.path.join(ROOT_DIR, "index.html")
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                return HTMLResponse(content=f.read())
+        return HTMLResponse("not found", status_code=404)
+
+    return legacy
+
+
+async def drive(target: FastAPI, path: str, total: int, concurrency: int, headers: dict) -> Tuple[float, int]:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        sample = await client.get(path, headers=headers)
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path, headers=headers)
+                assert response.status_code in (200, 304), response.status_code
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start), sample.num_bytes_downloaded
+
+
+async def main_async(args) -> None:
+    asset_pipeline.load()
+    cases = [
+        ("legado (disco)", build_legacy_app(), {}),
+        ("pipeline identity", app, {"Accept-Encoding": "identity"}),
+        ("pipeline gzip/br", app, {"Accept-Encoding": "gzip, deflate, br"}),
+    ]
+    # O ETag depende da codificação negociada: revalida a variante gzip/br
+    etag = asset_pipeline.respond("/", "gzip, deflate, br").headers["ETag"]
+    cases.append(("pipeline 304 (If-None-Match)", app, {"Accept-Encoding": "gzip, deflate, br", "If-None-Match": etag}))
+    for label, target, headers in cases:
+        await drive(target, "/", min(200, args.requests), args.concurrency, headers)  # aquecimento
+        rps, size = await drive(target, "/", args.requests, args.concurrency, headers)
+        print(f"{label:<32} {rps:>10,.0f} req/s  {size:>7} bytes/resp")
+    print(f"\nAssets: {asset_pipeline.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de GET /")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
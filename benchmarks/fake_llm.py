@@ -0,0 +1,71 @@
+"""
+LLM falso, local e determinístico, compatível com `client.chat.completions.create`.
+
+A latência simula o tempo até o primeiro token mais a geração na taxa configurada
+(tokens/s). Como o cliente OpenAI real é síncrono, a espera também é síncrona.
+
+Uso:
+    import agent
+    agent.client = FakeLLM(latency_s=0.2, tokens_per_s=400)
+"""
+
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+SCENARIO_TEMPLATE = """```gherkin
+Funcionalidade: Cenário gerado localmente ({digest})
+
+  Cenário: Fluxo principal
+    Dado que o usuário está na tela solicitada
+    Quando ele preenche os campos obrigatórios
+    E confirma a ação
+    Então o sistema exibe a mensagem de sucesso
+```"""
+
+
+class _Completions:
+    def __init__(self, owner: "FakeLLM"):
+        self._owner = owner
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        return self._owner.complete(model, messages, **kwargs)
+
+
+class FakeLLM:
+    """Substituto do cliente OpenAI: mesma resposta para o mesmo prompt, custo de tempo previsível."""
+
+    def __init__(self, latency_s: float = 0.2, tokens_per_s: float = 400.0, completion_tokens: int = 120, error_rate: float = 0.0):
+        self.latency_s = latency_s
+        self.tokens_per_s = tokens_per_s
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        prompt = "\n".join(m["content"] for m in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            self.calls += 1
+        # Erros determinísticos: a mesma fração de prompts sempre falha
+        if self.error_rate and int(digest[:8], 16) / 0xFFFFFFFF < self.error_rate:
+            time.sleep(self.latency_s)
+            raise RuntimeError("fake LLM: erro simulado")
+
+        duration = self.latency_s
+        if self.tokens_per_s > 0:
+            duration += self.completion_tokens / self.tokens_per_s
+        time.sleep(duration)
+
+        content = SCENARIO_TEMPLATE.format(digest=digest[:12])
+        usage = SimpleNamespace(
+            prompt_tokens=max(1, len(prompt) // 4),
+            completion_tokens=self.completion_tokens,
+            total_tokens=max(1, len(prompt) // 4) + self.completion_tokens,
+        )
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message)], usage=usage)
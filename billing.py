@@ -7,6 +7,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from enum import Enum
 
+try:
+    from .metrics import BILLING_ACTIONS, BILLING_CREDITS, BILLING_CREDITS_REFUNDED
+except ImportError:
+    from metrics import BILLING_ACTIONS, BILLING_CREDITS, BILLING_CREDITS_REFUNDED
+
 # ============================================
 # ENUMS E CONSTANTES
 # ============================================
@@ -93,6 +98,13 @@ ACTION_COSTS = {
     ActionType.EXPORT_REPORT: 15,
 }
 
+# Feature do plano exigida por cada ação
+ACTION_FEATURES = {
+    ActionType.GENERATE_GHERKIN: "gherkin_generation",
+    ActionType.ANALYZE_SCREEN: "screen_analysis",
+    ActionType.EXPORT_REPORT: "export_report",
+}
+
 
 # ============================================
 # CLASSE DE USUÁRIO COM CRÉDITOS
@@ -145,6 +157,22 @@ class User:
         
         return True
     
+    def refund_action(self, action: ActionType, reason: str = "") -> int:
+        """Estorna o custo de uma ação já cobrada. Retorna os créditos devolvidos."""
+        cost = ACTION_COSTS.get(action, 0)
+        self.credits += cost
+        
+        self.usage_history.append({
+            "action": action.value,
+            "cost": -cost,
+            "refund": True,
+            "reason": reason,
+            "timestamp": datetime.now().isoformat(),
+            "remaining_credits": self.credits
+        })
+        
+        return cost
+    
     def add_credits(self, amount: int) -> None:
         """Adiciona créditos ao usuário (até o limite do plano)."""
         self.credits = min(self.credits + amount, self.max_credits)
@@ -209,52 +237,86 @@ class BillingManager:
         """Obtém um usuário existente."""
         return self.users.get(user_id)
     
-    def perform_action(self, user_id: str, action: ActionType) -> Dict:
+    def check_action(self, user_id: str, action: ActionType) -> Dict:
         """
-        Realiza uma ação para um usuário.
-        Retorna um dicionário com o resultado.
+        Verifica, sem cobrar, se o usuário pode realizar a ação (feature do plano e
+        créditos). Em caso negativo, "reason" traz o motivo (user_not_found,
+        feature_unavailable, insufficient_credits).
         """
         user = self.get_user(user_id)
         if not user:
             return {
                 "success": False,
+                "reason": "user_not_found",
                 "message": "Usuário não encontrado",
                 "credits_remaining": 0
             }
         
         # Verificar se o usuário tem a feature
-        feature_map = {
-            ActionType.GENERATE_GHERKIN: "gherkin_generation",
-            ActionType.ANALYZE_SCREEN: "screen_analysis",
-            ActionType.EXPORT_REPORT: "export_report",
-        }
-        
-        feature = feature_map.get(action)
+        feature = ACTION_FEATURES.get(action)
         if feature and not user.has_feature(feature):
             return {
                 "success": False,
+                "reason": "feature_unavailable",
                 "message": f"Feature '{feature}' não disponível no plano {user.plan.value}",
                 "credits_remaining": user.credits
             }
         
-        # Realizar a ação
-        success = user.perform_action(action)
-        
-        if success:
-            return {
-                "success": True,
-                "message": f"Ação '{action.value}' realizada com sucesso",
-                "credits_remaining": user.credits,
-                "cost": ACTION_COSTS.get(action, 0)
-            }
-        else:
-            cost = ACTION_COSTS.get(action, 0)
+        cost = ACTION_COSTS.get(action, 0)
+        if not user.can_perform_action(action):
             return {
                 "success": False,
+                "reason": "insufficient_credits",
                 "message": f"Créditos insuficientes. Necessário: {cost}, Disponível: {user.credits}",
                 "credits_remaining": user.credits,
                 "cost": cost
             }
+        return {"success": True, "credits_remaining": user.credits, "cost": cost}
+    
+    def perform_action(self, user_id: str, action: ActionType) -> Dict:
+        """
+        Realiza uma ação para um usuário.
+        Retorna um dicionário com o resultado.
+        """
+        check = self.check_action(user_id, action)
+        if not check["success"]:
+            BILLING_ACTIONS.labels(action=action.value, result=check["reason"]).inc()
+            return check
+        
+        # Realizar a ação
+        user = self.get_user(user_id)
+        user.perform_action(action)
+        BILLING_ACTIONS.labels(action=action.value, result="success").inc()
+        BILLING_CREDITS.inc(ACTION_COSTS.get(action, 0))
+        return {
+            "success": True,
+            "message": f"Ação '{action.value}' realizada com sucesso",
+            "credits_remaining": user.credits,
+            "cost": ACTION_COSTS.get(action, 0)
+        }
+    
+    def refund_action(self, user_id: str, action: ActionType, reason: str = "") -> Dict:
+        """
+        Estorna uma ação cobrada que não foi entregue (ex.: o LLM falhou e o motor ML
+        gratuito respondeu). Cada chamador é estornado individualmente.
+        """
+        user = self.get_user(user_id)
+        if not user:
+            return {
+                "success": False,
+                "message": "Usuário não encontrado",
+                "credits_remaining": 0
+            }
+        
+        refunded = user.refund_action(action, reason)
+        BILLING_ACTIONS.labels(action=action.value, result="refunded").inc()
+        BILLING_CREDITS_REFUNDED.inc(refunded)
+        return {
+            "success": True,
+            "message": f"Ação '{action.value}' estornada",
+            "credits_remaining": user.credits,
+            "refunded": refunded
+        }
     
     def get_user_status(self, user_id: str) -> Optional[Dict]:
         """Obtém o status de um usuário."""
@@ -0,0 +1,188 @@
+"""
+Módulo de Circuit Breaker
+Nebula Agent v6.0
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class BreakerState(str, Enum):
+    """Estados do circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada porque o circuito está aberto."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por taxa de erro e de lentidão numa janela deslizante de chamadas.
+
+    Fechado: as chamadas passam e o resultado entra na janela. Quando há pelo menos
+    `min_calls` chamadas e a taxa de falhas ou de chamadas lentas passa do limite, abre.
+    Aberto: recusa tudo por `open_seconds`, depois passa a semiaberto.
+    Semiaberto: libera até `half_open_probes` sondas; se todas passarem rápidas, fecha,
+    e qualquer falha ou lentidão reabre.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_s: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        on_state_change: Optional[Callable[[BreakerState], None]] = None,
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_s = slow_call_s
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.on_state_change = on_state_change
+
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._rejected = 0
+
+    # ============================================
+    # CONTROLE DE ACESSO
+    # ============================================
+
+    def allow(self) -> bool:
+        """Diz se uma chamada pode ser feita agora (no semiaberto, reserva uma sonda)."""
+        with self._lock:
+            state = self._refresh(time.monotonic())
+            if state == BreakerState.CLOSED:
+                return True
+            if state == BreakerState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self, duration_s: float) -> None:
+        """Registra uma chamada concluída (lenta se passou de `slow_call_s`)."""
+        self._record(False, duration_s >= self.slow_call_s)
+
+    def record_failure(self, duration_s: float = 0.0) -> None:
+        """Registra uma chamada que falhou."""
+        self._record(True, duration_s >= self.slow_call_s)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Executa `fn` protegida pelo breaker. Levanta CircuitOpenError se recusada."""
+        if not self.allow():
+            raise CircuitOpenError(f"circuito '{self.name}' aberto")
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure(time.perf_counter() - started)
+            raise
+        self.record_success(time.perf_counter() - started)
+        return result
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._refresh(time.monotonic())
+
+    # ============================================
+    # TRANSIÇÕES
+    # ============================================
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        with self._lock:
+            state = self._refresh(time.monotonic())
+            if state == BreakerState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._transition(BreakerState.OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._transition(BreakerState.CLOSED)
+                return
+            if state == BreakerState.OPEN:
+                # Chamadas iniciadas antes da abertura que terminam depois não contam
+                return
+
+            self._window.append((failed, slow))
+            self._failures += failed
+            self._slow += slow
+            if len(self._window) > self.window_size:
+                old_failed, old_slow = self._window.popleft()
+                self._failures -= old_failed
+                self._slow -= old_slow
+
+            calls = len(self._window)
+            if calls >= self.min_calls and (
+                self._failures / calls >= self.failure_rate or self._slow / calls >= self.slow_call_rate
+            ):
+                self._transition(BreakerState.OPEN)
+
+    def _refresh(self, now: float) -> BreakerState:
+        # Chamado com o lock: o aberto vira semiaberto quando o tempo de espera acaba
+        if self._state == BreakerState.OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: BreakerState) -> None:
+        self._state = state
+        if state == BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+        self._window.clear()
+        self._failures = 0
+        self._slow = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if self.on_state_change:
+            self.on_state_change(state)
+
+    # ============================================
+    # ESTADO
+    # ============================================
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual, taxas da janela e configuração (para /health)."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._refresh(now)
+            calls = len(self._window)
+            return {
+                "name": self.name,
+                "state": state.value,
+                "window_calls": calls,
+                "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+                "rejected_calls": self._rejected,
+                "retry_in_s": round(max(0.0, self.open_seconds - (now - self._opened_at)), 1) if state == BreakerState.OPEN else 0.0,
+                "config": {
+                    "window_size": self.window_size,
+                    "min_calls": self.min_calls,
+                    "failure_rate": self.failure_rate,
+                    "slow_call_s": self.slow_call_s,
+                    "slow_call_rate": self.slow_call_rate,
+                    "open_seconds": self.open_seconds,
+                    "half_open_probes": self.half_open_probes,
+                },
+            }
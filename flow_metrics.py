@@ -0,0 +1,263 @@
+"""
+Módulo de Métricas de Fluxo (Cycle Time, Throughput e WIP)
+Nebula Agent v6.0
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ============================================
+# T-DIGEST (PERCENTIS EM STREAMING)
+# ============================================
+
+
+class TDigest:
+    """
+    Sketch t-digest (variante com merge) para percentis em streaming: memória
+    limitada por `compression`, erro menor nas caudas e mesclável entre boards
+    ou períodos com `merge`.
+    """
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means: List[float] = []
+        self._weights: List[float] = []
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_size = int(compression * 5)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """Adiciona uma observação."""
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """Incorpora os centróides de outro digest."""
+        other._compress()
+        for mean, weight in zip(other._means, other._weights):
+            self._buffer.append((mean, weight))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _k(self, q: float) -> float:
+        # Função de escala k1: centróides menores perto de q=0 e q=1
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self._means, self._weights)) + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+
+        means, weights = [], []
+        current_mean, current_weight = points[0]
+        cumulative = 0.0
+        k_lower = self._k(0.0)
+        for mean, weight in points[1:]:
+            if self._k((cumulative + current_weight + weight) / total) - k_lower <= 1.0:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                cumulative += current_weight
+                k_lower = self._k(cumulative / total)
+                current_mean, current_weight = mean, weight
+        means.append(current_mean)
+        weights.append(current_weight)
+        self._means, self._weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Valor estimado do quantil q (0..1). None se vazio."""
+        self._compress()
+        if not self._means:
+            return None
+        if len(self._means) == 1:
+            return self._means[0]
+
+        target = q * self.count
+        cumulative = 0.0
+        previous_mean, previous_center = self.min, 0.0
+        for mean, weight in zip(self._means, self._weights):
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - previous_center
+                fraction = (target - previous_center) / span if span > 0 else 0.0
+                return previous_mean + (mean - previous_mean) * fraction
+            previous_mean, previous_center = mean, center
+            cumulative += weight
+
+        span = self.count - previous_center
+        fraction = (target - previous_center) / span if span > 0 else 1.0
+        return previous_mean + (self.max - previous_mean) * min(fraction, 1.0)
+
+    def __len__(self) -> int:
+        self._compress()
+        return len(self._means)
+
+
+class DurationStats:
+    """Contagem, média e percentis de durações em segundos."""
+
+    PERCENTILES = (0.5, 0.85, 0.95)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.digest = TDigest(compression=200)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.digest.add(seconds)
+
+    def to_dict(self) -> Dict:
+        result = {
+            "count": self.count,
+            "mean_s": round(self.total / self.count, 3) if self.count else None,
+        }
+        for q in self.PERCENTILES:
+            value = self.digest.quantile(q) if self.count else None
+            result[f"p{int(q * 100)}_s"] = round(value, 3) if value is not None else None
+        return result
+
+
+# ============================================
+# AGREGADOS DE FLUXO POR BOARD
+# ============================================
+
+class FlowMetrics:
+    """
+    Agregados de fluxo mantidos a cada transição de status, sem varrer o board:
+    - WIP atual por status e sua evolução diária (valor de fechamento e pico);
+    - tempo de permanência em cada status;
+    - cycle time (primeira entrada em `start_status` até `done_status`) e lead time
+      (criação até `done_status`);
+    - throughput diário (entradas em `done_status`).
+    """
+
+    def __init__(self, statuses: Iterable[str], start_status: str, done_status: str, history_days: int = 90):
+        self.statuses = list(statuses)
+        self.start_status = start_status
+        self.done_status = done_status
+        self.history_days = history_days
+        self._wip: Dict[str, int] = {status: 0 for status in self.statuses}
+        self._entered: Dict[str, Tuple[str, datetime]] = {}
+        self._created: Dict[str, datetime] = {}
+        self._started: Dict[str, datetime] = {}
+        self._dwell: Dict[str, DurationStats] = {status: DurationStats() for status in self.statuses}
+        self._cycle_time = DurationStats()
+        self._lead_time = DurationStats()
+        self._throughput: "OrderedDict[date, int]" = OrderedDict()
+        self._wip_history: "OrderedDict[date, Dict[str, Dict[str, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ============================================
+    # EVENTOS
+    # ============================================
+
+    def task_created(self, task_id: str, status: str, at: datetime) -> None:
+        """Registra uma tarefa nova."""
+        with self._lock:
+            self._created[task_id] = at
+            self._entered[task_id] = (status, at)
+            if status == self.start_status:
+                self._started[task_id] = at
+            self._wip[status] += 1
+            self._record_wip(at.date())
+
+    def task_moved(self, task_id: str, new_status: str, at: datetime) -> None:
+        """Registra a transição de uma tarefa para `new_status`."""
+        with self._lock:
+            entered = self._entered.get(task_id)
+            if entered is None or entered[0] == new_status:
+                return
+            old_status, since = entered
+            self._dwell[old_status].add(max(0.0, (at - since).total_seconds()))
+            self._entered[task_id] = (new_status, at)
+            self._wip[old_status] -= 1
+            self._wip[new_status] += 1
+
+            if new_status == self.start_status:
+                self._started.setdefault(task_id, at)
+            elif new_status == self.done_status:
+                created = self._created[task_id]
+                self._lead_time.add(max(0.0, (at - created).total_seconds()))
+                # Tarefas concluídas sem passar pelo início contam desde a criação
+                started = self._started.get(task_id, created)
+                self._cycle_time.add(max(0.0, (at - started).total_seconds()))
+                day = at.date()
+                self._throughput[day] = self._throughput.get(day, 0) + 1
+                self._trim(self._throughput)
+            self._record_wip(at.date())
+
+    def task_removed(self, task_id: str, at: datetime) -> None:
+        """Retira uma tarefa excluída do WIP."""
+        with self._lock:
+            entered = self._entered.pop(task_id, None)
+            self._created.pop(task_id, None)
+            self._started.pop(task_id, None)
+            if entered is not None:
+                self._wip[entered[0]] -= 1
+                self._record_wip(at.date())
+
+    def _record_wip(self, day: date) -> None:
+        # Chamado com o lock: o último valor do dia e o pico de cada status
+        snapshot = self._wip_history.get(day)
+        if snapshot is None:
+            snapshot = self._wip_history[day] = {"close": {}, "peak": {}}
+            self._trim(self._wip_history)
+        snapshot["close"] = dict(self._wip)
+        peak = snapshot["peak"]
+        for status, count in self._wip.items():
+            if count > peak.get(status, 0):
+                peak[status] = count
+
+    def _trim(self, series: OrderedDict) -> None:
+        while len(series) > self.history_days:
+            series.popitem(last=False)
+
+    # ============================================
+    # CONSULTA
+    # ============================================
+
+    def wip(self) -> Dict[str, int]:
+        """Quantidade atual de tarefas em cada status."""
+        return dict(self._wip)
+
+    def snapshot(self, days: int = 30, today: Optional[date] = None) -> Dict:
+        """Agregados prontos para servir (últimos `days` dias nas séries diárias)."""
+        today = today or datetime.now().date()
+        since = today - timedelta(days=days - 1)
+        with self._lock:
+            throughput = {day.isoformat(): count for day, count in self._throughput.items() if day >= since}
+            wip_history = {
+                day.isoformat(): {"close": dict(values["close"]), "peak": dict(values["peak"])}
+                for day, values in self._wip_history.items() if day >= since
+            }
+            completed = sum(throughput.values())
+            return {
+                "wip": dict(self._wip),
+                "dwell_time": {status: stats.to_dict() for status, stats in self._dwell.items()},
+                "cycle_time": self._cycle_time.to_dict(),
+                "lead_time": self._lead_time.to_dict(),
+                "throughput": {
+                    "daily": throughput,
+                    "total": completed,
+                    "average_per_day": round(completed / days, 3) if days else 0.0,
+                },
+                "wip_history": wip_history,
+                "days": days,
+            }
@@ -0,0 +1,524 @@
+"""
+Módulo de Parsing, Validação e Normalização de Gherkin (pt-BR e en)
+Nebula Agent v6.0
+"""
+
+import re
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+# ============================================
+# ENUMS E PALAVRAS-CHAVE
+# ============================================
+
+class BlockKind(str, Enum):
+    """Tipos de bloco de um documento Gherkin."""
+    FEATURE = "feature"
+    BACKGROUND = "background"
+    SCENARIO = "scenario"
+    OUTLINE = "outline"
+    EXAMPLES = "examples"
+
+
+class StepKind(str, Enum):
+    """Tipos de passo; E/Mas herdam o tipo do passo anterior."""
+    GIVEN = "given"
+    WHEN = "when"
+    THEN = "then"
+    AND = "and"
+    BUT = "but"
+
+
+class Severity(str, Enum):
+    """Gravidade de um problema encontrado na validação."""
+    ERROR = "error"
+    REPAIRED = "repaired"
+
+
+HEADER_KEYWORDS = {
+    BlockKind.FEATURE: ("Funcionalidade", "Característica", "Caracteristica", "Feature"),
+    BlockKind.BACKGROUND: ("Cenário de Fundo", "Cenario de Fundo", "Contexto", "Background"),
+    BlockKind.OUTLINE: (
+        "Esquema do Cenário", "Esquema do Cenario", "Delineação do Cenário", "Delineacao do Cenario",
+        "Scenario Outline", "Scenario Template",
+    ),
+    BlockKind.SCENARIO: ("Cenário", "Cenario", "Exemplo", "Scenario", "Example"),
+    BlockKind.EXAMPLES: ("Exemplos", "Cenários", "Cenarios", "Examples", "Scenarios"),
+}
+
+STEP_KEYWORDS = {
+    StepKind.GIVEN: ("Dado", "Dada", "Dados", "Dadas", "Given"),
+    StepKind.WHEN: ("Quando", "When"),
+    StepKind.THEN: ("Então", "Entao", "Then"),
+    StepKind.AND: ("E", "And"),
+    StepKind.BUT: ("Mas", "But"),
+}
+
+
+def _keyword_table(table: Dict[Enum, Tuple[str, ...]]) -> Tuple[str, Dict[str, Tuple[Enum, str]]]:
+    """Regex com as palavras-chave (mais longas primeiro) e o mapa minúsculo -> (tipo, forma canônica)."""
+    canonical = {kw.lower(): (kind, kw) for kind, keywords in table.items() for kw in keywords}
+    alternation = "|".join(re.escape(kw) for kw in sorted(canonical, key=len, reverse=True))
+    return alternation, canonical
+
+
+_HEADER_ALT, HEADER_CANONICAL = _keyword_table(HEADER_KEYWORDS)
+_STEP_ALT, STEP_CANONICAL = _keyword_table(STEP_KEYWORDS)
+
+HEADER_RE = re.compile(rf"^({_HEADER_ALT})\s*:\s*(.*)$", re.IGNORECASE)
+STEP_RE = re.compile(rf"^(?:({_STEP_ALT})\s+|(\*)\s+)(.+)$", re.IGNORECASE)
+# Prefixos de lista e negrito do markdown que o LLM às vezes coloca antes dos passos
+MARKDOWN_PREFIX_RE = re.compile(r"^(?:[-•]\s+|\d+[.)]\s+|\*\s+(?=\*\*))?(?:\*\*|__)?")
+MARKDOWN_KEYWORD_RE = re.compile(r"^(\S+?)(?:\*\*|__)(:?)")
+PLACEHOLDER_RE = re.compile(r"<([^<>]+)>")
+FENCE_RE = re.compile(r"```[ \t]*([A-Za-z-]*)[ \t]*\n?")
+
+
+# ============================================
+# MODELO DO DOCUMENTO
+# ============================================
+
+class Step:
+    """Um passo (Dado/Quando/Então/E/Mas) com tabela ou docstring opcionais."""
+
+    def __init__(self, keyword: str, kind: StepKind, effective_kind: StepKind, text: str, line: int):
+        self.keyword = keyword
+        self.kind = kind
+        self.effective_kind = effective_kind
+        self.text = text
+        self.line = line
+        self.table: List[List[str]] = []
+        self.docstring: Optional[List[str]] = None
+        self.docstring_delimiter = '"""'
+
+    def to_dict(self) -> Dict:
+        return {"keyword": self.keyword, "kind": self.effective_kind.value, "text": self.text, "table": self.table}
+
+
+class Examples:
+    """Tabela Examples de um Scenario Outline."""
+
+    def __init__(self, keyword: str, name: str, line: int):
+        self.keyword = keyword
+        self.name = name
+        self.line = line
+        self.header: List[str] = []
+        self.rows: List[List[str]] = []
+        self.row_lines: List[int] = []
+
+
+class Scenario:
+    """Scenario, Scenario Outline ou Background."""
+
+    def __init__(self, kind: BlockKind, keyword: str, name: str, line: int, tags: Optional[List[str]] = None):
+        self.kind = kind
+        self.keyword = keyword
+        self.name = name
+        self.line = line
+        self.tags = tags or []
+        self.description: List[str] = []
+        self.steps: List[Step] = []
+        self.examples: List[Examples] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind.value,
+            "name": self.name,
+            "tags": self.tags,
+            "steps": [step.to_dict() for step in self.steps],
+            "examples": [{"header": e.header, "rows": e.rows} for e in self.examples],
+        }
+
+
+class Issue:
+    """Problema encontrado (erro ou reparo aplicado) com a linha de origem."""
+
+    def __init__(self, severity: Severity, line: int, message: str):
+        self.severity = severity
+        self.line = line
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"linha {self.line}: {self.message}" if self.line else self.message
+
+
+class GherkinDocument:
+    """Documento Gherkin analisado."""
+
+    def __init__(self):
+        self.language: Optional[str] = None
+        self.feature_keyword = "Feature"
+        self.feature_name: Optional[str] = None
+        self.feature_tags: List[str] = []
+        self.description: List[str] = []
+        self.background: Optional[Scenario] = None
+        self.scenarios: List[Scenario] = []
+        self.issues: List[Issue] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.issues.append(Issue(Severity.ERROR, line, message))
+
+    def repaired(self, line: int, message: str) -> None:
+        self.issues.append(Issue(Severity.REPAIRED, line, message))
+
+    def to_dict(self) -> Dict:
+        return {
+            "feature": self.feature_name,
+            "tags": self.feature_tags,
+            "background": self.background.to_dict() if self.background else None,
+            "scenarios": [s.to_dict() for s in self.scenarios],
+        }
+
+
+# ============================================
+# PARSER (UMA PASSADA, TEMPO LINEAR)
+# ============================================
+
+def split_table_row(line: str) -> List[str]:
+    """Separa as células de uma linha de tabela respeitando \\| e \\\\."""
+    body = line.strip()
+    if body.startswith("|"):
+        body = body[1:]
+    if body.endswith("|") and not body.endswith("\\|"):
+        body = body[:-1]
+    if "\\" not in body:
+        return [cell.strip() for cell in body.split("|")]
+    cells, current, i = [], [], 0
+    while i < len(body):
+        char = body[i]
+        if char == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            current.append(nxt if nxt in "|\\" else "\\" + nxt)
+            i += 2
+            continue
+        if char == "|":
+            cells.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    cells.append("".join(current).strip())
+    return cells
+
+
+def _clean_markdown(line: str) -> str:
+    """Remove marcadores de lista e negrito que o LLM coloca antes da palavra-chave."""
+    cleaned = MARKDOWN_PREFIX_RE.sub("", line, count=1)
+    return MARKDOWN_KEYWORD_RE.sub(r"\1\2", cleaned, count=1)
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.lines = text.splitlines()
+        self.doc = GherkinDocument()
+        self.scenario: Optional[Scenario] = None
+        self.examples: Optional[Examples] = None
+        self.step: Optional[Step] = None
+        self.last_kind: Optional[StepKind] = None
+        self.pending_tags: List[str] = []
+        self.docstring: Optional[str] = None
+
+    def parse(self) -> GherkinDocument:
+        for index, raw in enumerate(self.lines, start=1):
+            self._line(index, raw)
+        if self.docstring is not None:
+            self.doc.error(len(self.lines), "Docstring não foi fechada")
+        return self.doc
+
+    def _line(self, lineno: int, raw: str) -> None:
+        line = raw.strip()
+        if self.docstring is not None:
+            if line.startswith(self.docstring):
+                self.docstring = None
+            else:
+                self.step.docstring.append(raw)
+            return
+        if not line:
+            return
+        if line.startswith("#"):
+            match = re.match(r"#\s*language\s*:\s*(\S+)", line)
+            if match:
+                self.doc.language = match.group(1)
+            return
+        if line.startswith("@"):
+            self.pending_tags.extend(tag for tag in line.split() if tag.startswith("@"))
+            return
+        if line.startswith("|"):
+            self._table_row(lineno, line)
+            return
+        if line.startswith('"""') or line.startswith("```"):
+            self._open_docstring(lineno, line[:3])
+            return
+        if self._header(lineno, line) or self._step_line(lineno, line):
+            return
+        cleaned = _clean_markdown(line)
+        if cleaned != line and (self._header(lineno, cleaned) or self._step_line(lineno, cleaned)):
+            self.doc.repaired(lineno, "Marcação markdown removida")
+            return
+        self._free_text(lineno, line)
+
+    def _header(self, lineno: int, line: str) -> bool:
+        match = HEADER_RE.match(line)
+        if not match:
+            return False
+        kind, keyword = HEADER_CANONICAL[match.group(1).lower()]
+        name = match.group(2).strip()
+        tags, self.pending_tags = self.pending_tags, []
+        if kind == BlockKind.FEATURE:
+            if self.doc.feature_name is not None:
+                self.doc.repaired(lineno, "Feature duplicada ignorada")
+                return True
+            self.doc.feature_keyword, self.doc.feature_name, self.doc.feature_tags = keyword, name, tags
+            return True
+        if kind == BlockKind.EXAMPLES:
+            if self.scenario is None:
+                self.doc.error(lineno, "Examples fora de um Scenario Outline")
+                return True
+            if self.scenario.kind == BlockKind.SCENARIO:
+                self.scenario.kind = BlockKind.OUTLINE
+                self.scenario.keyword = "Scenario Outline" if self.scenario.keyword.startswith("Scenario") else "Esquema do Cenário"
+                self.doc.repaired(lineno, "Scenario com Examples convertido em Scenario Outline")
+            self.examples = Examples(keyword, name, lineno)
+            self.scenario.examples.append(self.examples)
+            self.step = None
+            return True
+        self.scenario = Scenario(kind, keyword, name, lineno, tags)
+        self.examples = None
+        self.step = None
+        self.last_kind = None
+        if kind == BlockKind.BACKGROUND:
+            if self.doc.background is not None or self.doc.scenarios:
+                self.doc.error(lineno, "Background deve ser único e vir antes dos cenários")
+            self.doc.background = self.scenario
+        else:
+            self.doc.scenarios.append(self.scenario)
+        return True
+
+    def _step_line(self, lineno: int, line: str) -> bool:
+        match = STEP_RE.match(line)
+        if not match:
+            return False
+        if match.group(2):
+            keyword, kind = "*", StepKind.AND
+        else:
+            kind, keyword = STEP_CANONICAL[match.group(1).lower()]
+        text = match.group(3).strip()
+        if self.scenario is None:
+            # Passos soltos: embrulha em um cenário implícito
+            self.scenario = Scenario(BlockKind.SCENARIO, "Scenario", "", lineno, self.pending_tags)
+            self.pending_tags = []
+            self.doc.scenarios.append(self.scenario)
+            self.doc.repaired(lineno, "Passos fora de um cenário agrupados em um Scenario")
+        elif self.examples is not None:
+            self.doc.error(lineno, "Passo depois da tabela Examples")
+        if kind in (StepKind.AND, StepKind.BUT):
+            if self.last_kind is None:
+                self.doc.error(lineno, f"'{keyword}' sem um passo anterior")
+            effective = self.last_kind or StepKind.GIVEN
+        else:
+            effective = kind
+        self.last_kind = effective
+        self.step = Step(keyword, kind, effective, text, lineno)
+        self.scenario.steps.append(self.step)
+        return True
+
+    def _table_row(self, lineno: int, line: str) -> None:
+        cells = split_table_row(line)
+        if self.examples is not None:
+            if not self.examples.header:
+                self.examples.header = cells
+            else:
+                self.examples.rows.append(cells)
+                self.examples.row_lines.append(lineno)
+        elif self.step is not None:
+            self.step.table.append(cells)
+        else:
+            self.doc.error(lineno, "Tabela sem passo ou Examples")
+
+    def _open_docstring(self, lineno: int, delimiter: str) -> None:
+        if self.step is None:
+            self.doc.error(lineno, "Docstring sem passo")
+            self.step = Step("*", StepKind.AND, StepKind.GIVEN, "", lineno)
+        self.step.docstring = []
+        self.step.docstring_delimiter = delimiter
+        self.docstring = delimiter
+
+    def _free_text(self, lineno: int, line: str) -> None:
+        if self.scenario is None:
+            if self.doc.feature_name is not None:
+                self.doc.description.append(line)
+            else:
+                self.doc.repaired(lineno, f"Texto antes da Feature ignorado: {line[:40]}")
+        elif not self.scenario.steps and self.examples is None:
+            self.scenario.description.append(line)
+        else:
+            self.doc.repaired(lineno, f"Linha não reconhecida ignorada: {line[:40]}")
+
+
+def parse(text: str) -> GherkinDocument:
+    """Analisa o texto Gherkin em uma única passada pelas linhas."""
+    return _Parser(text).parse()
+
+
+# ============================================
+# VALIDAÇÃO
+# ============================================
+
+def validate(doc: GherkinDocument, default_feature: str = "Funcionalidade gerada") -> GherkinDocument:
+    """Aplica as regras estruturais, reparando o que é seguro e registrando os erros."""
+    if not doc.scenarios:
+        doc.error(0, "Nenhum cenário encontrado")
+    if doc.feature_name is None:
+        if doc.scenarios:
+            doc.feature_name = default_feature
+            doc.repaired(0, "Feature ausente adicionada")
+        else:
+            doc.error(0, "Nenhuma Feature encontrada")
+
+    for scenario in doc.scenarios:
+        label = f"'{scenario.name}'" if scenario.name else f"da linha {scenario.line}"
+        if not scenario.steps:
+            doc.error(scenario.line, f"Cenário {label} sem passos")
+            continue
+        if not any(step.effective_kind == StepKind.THEN for step in scenario.steps):
+            doc.error(scenario.line, f"Cenário {label} sem passo Então/Then")
+        if scenario.kind == BlockKind.OUTLINE:
+            _validate_outline(doc, scenario, label)
+    return doc
+
+
+def _validate_outline(doc: GherkinDocument, scenario: Scenario, label: str) -> None:
+    placeholders = set()
+    for step in scenario.steps:
+        placeholders.update(PLACEHOLDER_RE.findall(step.text))
+    placeholders.update(PLACEHOLDER_RE.findall(scenario.name))
+    if not scenario.examples:
+        if placeholders:
+            doc.error(scenario.line, f"Scenario Outline {label} sem Examples")
+        else:
+            scenario.kind = BlockKind.SCENARIO
+            scenario.keyword = "Scenario" if scenario.keyword.startswith("Scenario") else "Cenário"
+            doc.repaired(scenario.line, f"Scenario Outline {label} sem Examples convertido em Scenario")
+        return
+    for examples in scenario.examples:
+        if not examples.header or not examples.rows:
+            doc.error(examples.line, "Examples sem cabeçalho ou sem linhas")
+            continue
+        width = len(examples.header)
+        for row, row_line in zip(examples.rows, examples.row_lines):
+            if len(row) != width:
+                doc.error(row_line, f"Linha com {len(row)} colunas, esperado {width}")
+        missing = placeholders.difference(examples.header)
+        if missing:
+            doc.error(examples.line, f"Placeholders sem coluna em Examples: {', '.join(sorted(missing))}")
+
+
+# ============================================
+# NORMALIZAÇÃO (RENDERIZAÇÃO CANÔNICA)
+# ============================================
+
+def _escape_cell(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("|", "\\|")
+
+
+def _render_row(cells: List[str], indent: str) -> str:
+    return indent + "| " + " | ".join(_escape_cell(c) for c in cells) + " |"
+
+
+def _render_block(scenario: Scenario, out: List[str]) -> None:
+    out.append("")
+    if scenario.tags:
+        out.append("  " + " ".join(scenario.tags))
+    out.append(f"  {scenario.keyword}: {scenario.name}".rstrip())
+    for line in scenario.description:
+        out.append(f"    {line}")
+    for step in scenario.steps:
+        out.append(f"    {step.keyword} {step.text}")
+        for row in step.table:
+            out.append(_render_row(row, "      "))
+        if step.docstring is not None:
+            out.append(f"      {step.docstring_delimiter}")
+            out.extend(step.docstring)
+            out.append(f"      {step.docstring_delimiter}")
+    for examples in scenario.examples:
+        out.append("")
+        out.append(f"    {examples.keyword}: {examples.name}".rstrip())
+        if examples.header:
+            out.append(_render_row(examples.header, "      "))
+        for row in examples.rows:
+            out.append(_render_row(row, "      "))
+
+
+def render(doc: GherkinDocument) -> str:
+    """Gera o texto com indentação canônica (Feature 0, cenários 2, passos 4, tabelas 6)."""
+    out: List[str] = []
+    if doc.language:
+        out.append(f"# language: {doc.language}")
+    if doc.feature_tags:
+        out.append(" ".join(doc.feature_tags))
+    out.append(f"{doc.feature_keyword}: {doc.feature_name or ''}".rstrip())
+    for line in doc.description:
+        out.append(f"  {line}")
+    if doc.background is not None:
+        _render_block(doc.background, out)
+    for scenario in doc.scenarios:
+        _render_block(scenario, out)
+    return "\n".join(out)
+
+
+# ============================================
+# API PRINCIPAL
+# ============================================
+
+class GherkinResult:
+    """Resultado da validação: texto normalizado, documento e problemas encontrados."""
+
+    def __init__(self, text: str, document: GherkinDocument):
+        self.text = text
+        self.document = document
+        self.errors = [i for i in document.issues if i.severity == Severity.ERROR]
+        self.repairs = [i for i in document.issues if i.severity == Severity.REPAIRED]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def repaired(self) -> bool:
+        return bool(self.repairs)
+
+    def summary(self, limit: int = 5) -> str:
+        issues = self.errors or self.repairs
+        return "; ".join(str(i) for i in issues[:limit]) or "ok"
+
+
+def extract_gherkin(text: str) -> str:
+    """Extrai o bloco ```gherkin``` (ou o primeiro bloco de código) da resposta do LLM."""
+    fences = list(FENCE_RE.finditer(text))
+    if not fences:
+        return text.strip()
+    opening = next((f for f in fences if f.group(1).lower() in ("gherkin", "feature", "cucumber")), fences[0])
+    start = opening.end()
+    closing = text.find("```", start)
+    return text[start:closing if closing != -1 else len(text)].strip()
+
+
+def normalize_gherkin(text: str, default_feature: str = "Funcionalidade gerada") -> GherkinResult:
+    """Analisa, valida, repara e normaliza um texto Gherkin."""
+    doc = validate(parse(text), default_feature)
+    return GherkinResult(render(doc), doc)
+
+
+def validate_llm_output(raw: str, default_feature: str = "Funcionalidade gerada") -> GherkinResult:
+    """Extrai o Gherkin da resposta do LLM e normaliza."""
+    return normalize_gherkin(extract_gherkin(raw), default_feature)
+
+
+def build_repair_prompt(result: GherkinResult) -> str:
+    """Mensagem de correção enviada ao LLM quando a saída anterior é inválida."""
+    return (
+        "A resposta anterior não é um Gherkin válido: "
+        f"{result.summary()}.\n"
+        "Responda novamente apenas com um bloco ```gherkin``` contendo Feature:, ao menos um "
+        "Scenario: e passos Dado/Quando/Então (Given/When/Then), incluindo um passo Então em cada cenário."
+    )
@@ -0,0 +1,303 @@
+"""
+Módulo de Fila de Jobs em Segundo Plano
+Nebula Agent v6.0
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+try:
+    from .metrics import JOBS_QUEUE_DEPTH, JOBS_LAG_SECONDS, JOBS_PROCESSED
+except ImportError:
+    from metrics import JOBS_QUEUE_DEPTH, JOBS_LAG_SECONDS, JOBS_PROCESSED
+
+# ============================================
+# JOB
+# ============================================
+
+
+class Job:
+    """Trabalho enfileirado: um tipo registrado e um payload serializável em JSON."""
+
+    __slots__ = ("id", "kind", "payload", "enqueued_at")
+
+    def __init__(self, kind: str, payload: Dict, job_id: Optional[str] = None, enqueued_at: Optional[float] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        # Horário de parede: o atraso continua valendo para jobs reexecutados após reiniciar
+        self.enqueued_at = enqueued_at if enqueued_at is not None else time.time()
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "kind": self.kind, "payload": self.payload, "enqueued_at": self.enqueued_at}
+
+
+# ============================================
+# SPOOL EM DISCO (OPCIONAL)
+# ============================================
+
+class JobSpool:
+    """
+    Journal append-only dos jobs: uma linha "add" ao enfileirar e uma linha "done" ao
+    terminar. Na inicialização, os jobs sem "done" são reexecutados. O arquivo é
+    truncado quando a fila esvazia depois de `compact_after` linhas.
+
+    As escritas (e o fsync) ficam numa thread própria: `append` e `ack` só colocam o
+    registro numa fila em memória e voltam na hora, sem bloquear o event loop. A thread
+    grava na ordem de chegada e faz um único fsync por lote de registros acumulados.
+    """
+
+    def __init__(self, path: str, fsync: bool = False, compact_after: int = 1000):
+        self.path = path
+        self.fsync = fsync
+        self.compact_after = compact_after
+        self._outstanding = 0
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._records: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._start_writer()
+
+    def _start_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(
+                target=self._write_loop, name=f"spool-{os.path.basename(self.path)}", daemon=True
+            )
+            self._writer.start()
+
+    def pending(self) -> List[Job]:
+        """Jobs registrados e não concluídos, na ordem em que foram enfileirados."""
+        jobs: Dict[str, Job] = {}
+        with self._lock:
+            if self._file.closed:
+                # Reaberto depois de um `close` (novo `start` após `drain`)
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._start_writer()
+            self._file.flush()
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Última linha incompleta (queda durante a escrita)
+                        continue
+                    if record.get("op") == "add":
+                        jobs[record["id"]] = Job(record["kind"], record["payload"], record["id"], record["enqueued_at"])
+                    elif record.get("op") == "done":
+                        jobs.pop(record["id"], None)
+            # Reescreve só os pendentes: o journal não cresce a cada reinício
+            self._file.close()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for job in jobs.values():
+                    f.write(json.dumps({"op": "add", **job.to_dict()}, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._outstanding = self._lines = len(jobs)
+        return list(jobs.values())
+
+    def append(self, job: Job) -> None:
+        self._records.put({"op": "add", **job.to_dict()})
+
+    def ack(self, job_id: str) -> None:
+        self._records.put({"op": "done", "id": job_id})
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._records.get()]
+            # Junta o que mais chegou enquanto a escrita anterior acontecia
+            while True:
+                try:
+                    batch.append(self._records.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in batch
+            with self._lock:
+                if not self._file.closed:
+                    for record in batch:
+                        if record is not None:
+                            self._apply(record)
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                    if closing:
+                        self._file.close()
+            if closing:
+                return
+
+    def _apply(self, record: Dict) -> None:
+        if record["op"] == "add":
+            self._outstanding += 1
+        else:
+            self._outstanding -= 1
+            if self._outstanding == 0 and self._lines >= self.compact_after:
+                self._file.truncate(0)
+                self._lines = 0
+                return
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._lines += 1
+
+    def close(self) -> None:
+        """Grava o que ainda está na fila de escrita e fecha o arquivo (bloqueia até terminar)."""
+        self._records.put(None)
+        if self._writer is not None:
+            self._writer.join()
+
+
+# ============================================
+# FILA DE JOBS
+# ============================================
+
+class JobQueue:
+    """
+    Fila limitada de jobs executados no event loop depois da resposta, fora do caminho
+    crítico das requisições. Os handlers devem ser baratos e só mexer em memória: rodam
+    no loop, como as rotas, e por isso não disputam o estado (board, histórico) com
+    elas. Se a fila estiver cheia (ou ainda não iniciada / já encerrada), o job roda na
+    hora, dentro de `submit`: quem enfileira paga o custo (contrapressão) e nada é
+    descartado. Com `spool_dir`, os jobs também vão para um journal em disco (gravado
+    pela thread do spool) e os que não terminaram são reexecutados no próximo `start`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1000,
+        workers: int = 1,
+        spool_dir: Optional[str] = None,
+        fsync: bool = False
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.workers = workers
+        self.spool = JobSpool(os.path.join(spool_dir, f"{name}.jsonl"), fsync) if spool_dir else None
+        self._handlers: Dict[str, Callable[[Dict], None]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+        JOBS_QUEUE_DEPTH.labels(queue=name).set_function(self.depth)
+
+    def register(self, kind: str, handler: Callable[[Dict], None]) -> None:
+        """Associa um tipo de job à função que o executa (recebe o payload)."""
+        self._handlers[kind] = handler
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ============================================
+    # CICLO DE VIDA
+    # ============================================
+
+    def start(self) -> None:
+        """Inicia os workers no event loop atual e reenfileira o que ficou no spool."""
+        if self._accepting:
+            return
+        self._queue = asyncio.Queue(self.maxsize)
+        self._accepting = True
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+        if self.spool is not None:
+            pending = self.spool.pending()
+            if pending:
+                print(f"♻️ Fila '{self.name}': reexecutando {len(pending)} job(s) pendentes do spool")
+            for job in pending:
+                self._enqueue(job, spooled=True)
+
+    async def drain(self, timeout: float = 10.0) -> int:
+        """
+        Para de aceitar jobs e espera a fila esvaziar por até `timeout` segundos.
+        Retorna quantos jobs ficaram sem executar (no spool, se houver).
+        """
+        if self._queue is None:
+            return 0
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        remaining = self._queue.qsize()
+        if remaining:
+            kept = "mantidos no spool" if self.spool is not None else "descartados"
+            print(f"⚠️ Fila '{self.name}': {remaining} job(s) não executados no encerramento ({kept})")
+        if self.spool is not None:
+            # Espera a thread do spool gravar o que falta sem travar o loop
+            await asyncio.get_running_loop().run_in_executor(None, self.spool.close)
+        self._queue = None
+        return remaining
+
+    # ============================================
+    # ENFILEIRAMENTO E EXECUÇÃO
+    # ============================================
+
+    def submit(self, kind: str, payload: Dict) -> bool:
+        """
+        Enfileira um job. Retorna False se ele foi executado imediatamente
+        (fila cheia, não iniciada ou em encerramento).
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"Tipo de job não registrado: {kind}")
+        job = Job(kind, payload)
+        if self._accepting and not self._queue.full():
+            return self._enqueue(job)
+        self._run(job, "inline", spooled=False)
+        return False
+
+    def _enqueue(self, job: Job, spooled: bool = False) -> bool:
+        # O "add" entra na fila de escrita do spool antes de o job ficar visível para os
+        # workers; como o "done" passa pela mesma fila, a ordem no journal é preservada
+        if self.spool is not None and not spooled:
+            self.spool.append(job)
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            self._run(job, "inline", spooled=self.spool is not None)
+            return False
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                JOBS_LAG_SECONDS.labels(queue=self.name).observe(max(0.0, time.time() - job.enqueued_at))
+                self._run(job, "ok", spooled=self.spool is not None)
+            finally:
+                self._queue.task_done()
+            # Cede o loop entre jobs para não atrasar as requisições numa rajada
+            await asyncio.sleep(0)
+
+    def _run(self, job: Job, result: str, spooled: bool) -> None:
+        handler = self._handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise KeyError(f"Tipo de job não registrado: {job.kind}")
+            handler(job.payload)
+        except Exception as e:
+            result = "error"
+            print(f"❌ Job '{job.kind}' falhou na fila '{self.name}': {e}")
+        finally:
+            if spooled:
+                self.spool.ack(job.id)
+        JOBS_PROCESSED.labels(queue=self.name, kind=job.kind, result=result).inc()
+
+    def stats(self) -> Dict:
+        """Resumo da fila para o /health."""
+        return {
+            "name": self.name,
+            "running": self._accepting,
+            "depth": self.depth(),
+            "capacity": self.maxsize,
+            "workers": self.workers,
+            "spool": self.spool.path if self.spool is not None else None,
+        }
@@ -0,0 +1,166 @@
+"""
+Módulo de Extração de Palavras-chave (pt-BR)
+Nebula Agent v6.0
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .text_index import STOPWORDS, fold_text, stem
+except ImportError:
+    from text_index import STOPWORDS, fold_text, stem
+
+# ============================================
+# TABELA DE FREQUÊNCIA DE DOCUMENTOS
+# ============================================
+
+# Frequência de documentos do vocabulário de UI em pt-BR (termos sem acento e no
+# singular), pré-calculada e distribuída com o código. Termos fora da tabela são
+# tratados como raros, ou seja, os mais informativos. A tabela é gerada por
+# `python keywords.py` a partir do corpus sintético e determinístico de descrições de
+# tela do classificador (screen_classifier.synthetic_corpus), mais os JSONL passados
+# em --data; a chave "source" do arquivo registra como ela foi montada.
+DF_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keyword_df.json")
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def build_document_frequency(texts: Iterable[str], source: str = "") -> Dict:
+    """Calcula a tabela {"documents", "df"} a partir de um corpus de descrições de tela."""
+    documents = 0
+    df: Counter = Counter()
+    for text in texts:
+        documents += 1
+        df.update({key for key in (_normalize(word) for word in WORD_RE.findall(text.lower())) if key})
+    table = {"documents": documents, "df": dict(sorted(df.items()))}
+    if source:
+        table = {"source": source, **table}
+    return table
+
+
+def save_document_frequency(table: Dict, path: str = DF_PATH) -> None:
+    """Grava a tabela em JSON, um termo por linha (diffs legíveis quando ela é regerada)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=0)
+        f.write("\n")
+
+
+def load_document_frequency(path: str = DF_PATH) -> Dict:
+    """Lê a tabela de frequência de documentos (JSON)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=65536)
+def _normalize(word: str) -> Optional[str]:
+    # Palavra (já em minúsculas) -> termo usado na pontuação, ou None se descartada
+    if len(word) <= 3 or word.isdigit():
+        return None
+    folded = fold_text(word)
+    if folded in STOPWORDS:
+        return None
+    return stem(folded)
+
+
+# ============================================
+# EXTRATOR DE PALAVRAS-CHAVE (TF-IDF + TOP-K)
+# ============================================
+
+class KeywordExtractor:
+    """
+    Palavras-chave por TF-IDF com a tabela de frequência de documentos. Acentos e
+    plurais são normalizados para contar "Botões" e "botão" como o mesmo termo, mas a
+    palavra-chave devolvida é a primeira forma que aparece no texto. Os k melhores
+    saem de um heap, com empates decididos pela posição da primeira ocorrência: o
+    resultado é determinístico entre processos.
+    """
+
+    def __init__(self, table: Optional[Dict] = None):
+        table = table if table is not None else load_document_frequency()
+        self.documents = table["documents"]
+        self._idf = {term: self._compute_idf(count) for term, count in table["df"].items()}
+        self._default_idf = self._compute_idf(0)
+
+    def _compute_idf(self, count: int) -> float:
+        return math.log((self.documents + 1) / (count + 1)) + 1.0
+
+    def idf(self, term: str) -> float:
+        """IDF de um termo já normalizado."""
+        return self._idf.get(term, self._default_idf)
+
+    def extract(self, text: str, k: int = 10) -> List[str]:
+        """As k palavras-chave mais relevantes do texto, em ordem de relevância."""
+        return self._top_k(self._count(WORD_RE.findall(text.lower())), k)
+
+    def extract_many(self, texts: Iterable[str], k: int = 10) -> List[List[str]]:
+        """Modo em lote: as k palavras-chave de cada descrição, na ordem recebida."""
+        findall, count, top_k = WORD_RE.findall, self._count, self._top_k
+        return [top_k(count(findall(text.lower())), k) for text in texts]
+
+    def _count(self, words: List[str]) -> Dict[str, List]:
+        # termo -> [frequência, ordem da primeira ocorrência, forma original].
+        # Counter conta em C e mantém a ordem da primeira ocorrência: a normalização
+        # roda uma vez por palavra distinta, não por ocorrência
+        terms: Dict[str, List] = {}
+        for order, (word, count) in enumerate(Counter(words).items()):
+            key = _normalize(word)
+            if key is None:
+                continue
+            entry = terms.get(key)
+            if entry is None:
+                terms[key] = [count, order, word]
+            else:
+                entry[0] += count
+        return terms
+
+    def _top_k(self, terms: Dict[str, List], k: int) -> List[str]:
+        idf, default = self._idf, self._default_idf
+        scored: Iterable[Tuple[float, int, str]] = (
+            (-count * idf.get(key, default), position, word)
+            for key, (count, position, word) in terms.items()
+        )
+        return [word for _, _, word in heapq.nsmallest(k, scored)]
+
+
+# ============================================
+# INSTÂNCIA GLOBAL
+# ============================================
+
+keyword_extractor = KeywordExtractor()
+
+
+if __name__ == "__main__":
+    # Regera a tabela distribuída: python keywords.py [--data descricoes.jsonl] [--synthetic N] [--seed S]
+    try:
+        from .screen_classifier import load_labeled, synthetic_corpus
+    except ImportError:
+        from screen_classifier import load_labeled, synthetic_corpus
+
+    parser = argparse.ArgumentParser(description="Gera a tabela de frequência de documentos das palavras-chave")
+    parser.add_argument("--data", action="append", default=[], help="JSONL com {text, ...} por linha; pode repetir")
+    parser.add_argument("--synthetic", type=int, default=300, help="descrições sintéticas por tipo de tela (0 desliga)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DF_PATH)
+    args = parser.parse_args()
+
+    texts = synthetic_corpus(args.synthetic, args.seed)[0] if args.synthetic else []
+    sources = [f"screen_classifier.synthetic_corpus(per_class={args.synthetic}, seed={args.seed})"] if args.synthetic else []
+    for path in args.data:
+        texts += load_labeled(path)[0]
+        sources.append(os.path.basename(path))
+
+    table = build_document_frequency(texts, " + ".join(sources))
+    save_document_frequency(table, args.out)
+    print(f"💾 Tabela com {len(table['df'])} termos de {table['documents']} descrições salva em {args.out}")
+
+    description = "Tela de Checkout com endereço, método de pagamento via Pix ou boleto e botão 'Finalizar Compra'."
+    print(f"Descrição: {description}")
+    print(f"Palavras-chave: {KeywordExtractor(table).extract(description)}")
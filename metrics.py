@@ -0,0 +1,447 @@
+"""
+Módulo de Métricas no formato Prometheus (contadores, gauges e histogramas)
+Nebula Agent v6.0
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ============================================
+# CONSTANTES
+# ============================================
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================
+# CÉLULAS POR THREAD (SEM LOCK NO CAMINHO QUENTE)
+# ============================================
+
+class _ThreadCells:
+    """
+    Valores particionados por thread: cada thread escreve apenas nas suas células,
+    então incrementos não disputam lock. A leitura (coleta) soma todas as partições.
+    O lock só é usado quando uma thread escreve pela primeira vez e quando ela
+    termina: as células de uma thread encerrada são somadas numa base e a partição
+    sai da lista, então o custo da coleta acompanha as threads vivas, não as que já
+    passaram pelo processo (o pool do anyio recria as suas depois de ociosas).
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._base = [0.0] * size
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> List[float]:
+        cells = getattr(self._local, "cells", None)
+        if cells is None:
+            cells = [0.0] * self._size
+            with self._lock:
+                self._shards.append(cells)
+            # O dono só é referenciado pelo threading.local: é coletado quando a thread termina
+            owner = _ThreadOwner()
+            weakref.finalize(owner, self._retire, cells)
+            self._local.owner = owner
+            self._local.cells = cells
+        return cells
+
+    def _retire(self, cells: List[float]) -> None:
+        with self._lock:
+            for i, value in enumerate(cells):
+                self._base[i] += value
+            self._shards.remove(cells)
+
+    def snapshot(self) -> List[float]:
+        # Soma sob o lock: uma partição não pode ser aposentada (e contada na base) no meio
+        with self._lock:
+            total = list(self._base)
+            for cells in self._shards:
+                for i, value in enumerate(cells):
+                    total[i] += value
+        return total
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+
+class _ThreadOwner:
+    """Marcador por thread cuja coleta dispara a aposentadoria das células."""
+
+    __slots__ = ("__weakref__",)
+
+
+# ============================================
+# TIPOS DE MÉTRICA
+# ============================================
+
+class _CounterChild:
+    def __init__(self):
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.mine()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.snapshot()[0]
+
+
+class _GaugeChild(_CounterChild):
+    def __init__(self):
+        super().__init__()
+        self._function: Optional[Callable[[], float]] = None
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._cells.mine()[0] -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Lê o valor de uma função na coleta (ex.: tamanho de fila ou de cache)."""
+        self._function = function
+
+    @contextmanager
+    def track_in_progress(self) -> Iterator[None]:
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return super().value()
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = tuple(buckets)
+        # Uma célula por bucket, mais +Inf, soma e contagem
+        self._cells = _ThreadCells(len(self._buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        cells = self._cells.mine()
+        cells[bisect_left(self._buckets, value)] += 1
+        cells[-2] += value
+        cells[-1] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[Tuple[str, float]], float, float]:
+        cells = self._cells.snapshot()
+        cumulative = 0.0
+        buckets = []
+        for bound, count in zip(self._buckets + (float("inf"),), cells[:-2]):
+            cumulative += count
+            buckets.append(("+Inf" if bound == float("inf") else _format_value(bound), cumulative))
+        return buckets, cells[-2], cells[-1]
+
+
+class Metric:
+    """Métrica com labels opcionais; `labels(...)` retorna (e memoriza) a série correspondente."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._child_for(())
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _child_for(self, key: Tuple[str, ...]):
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def labels(self, *values: str, **kwargs: str):
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera labels {self.labelnames}")
+        return self._child_for(values)
+
+    def _label_str(self, values: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{self._label_str(values)} {_format_value(child.value())}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def value(self) -> float:
+        return self._default.value()
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+    def track_in_progress(self):
+        return self._default.track_in_progress()
+
+    def value(self) -> float:
+        return self._default.value()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        buckets, total, count = child.snapshot()
+        lines = []
+        for bound, cumulative in buckets:
+            labels = self._label_str(values, 'le="' + bound + '"')
+            lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+        lines.append(f"{self.name}_sum{self._label_str(values)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._label_str(values)} {_format_value(count)}")
+        return lines
+
+
+# ============================================
+# REGISTRO
+# ============================================
+
+class MetricsRegistry:
+    """Registro de métricas e renderização no formato de exposição do Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].collect())
+        return "\n".join(lines) + "\n"
+
+
+# ============================================
+# FUNÇÕES AUXILIARES
+# ============================================
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# ============================================
+# INSTÂNCIA GLOBAL E MÉTRICAS DO PIPELINE
+# ============================================
+
+registry = MetricsRegistry()
+
+CHAT_STAGE_SECONDS = registry.histogram(
+    "nebula_chat_stage_seconds",
+    "Latência de cada etapa do pipeline /chat em segundos.",
+    ["stage"],
+)
+CHAT_REQUESTS = registry.counter(
+    "nebula_chat_requests_total",
+    "Requisições /chat por resultado.",
+    ["outcome"],
+)
+CHAT_IN_FLIGHT = registry.gauge(
+    "nebula_chat_in_flight",
+    "Requisições /chat em andamento.",
+)
+GHERKIN_GENERATED = registry.counter(
+    "nebula_gherkin_generated_total",
+    "Cenários Gherkin gerados por origem (llm, ml, ml_fallback).",
+    ["source"],
+)
+GHERKIN_VALIDATION = registry.counter(
+    "nebula_gherkin_validation_total",
+    "Saídas do LLM validadas por resultado (valid, repaired, invalid).",
+    ["result"],
+)
+SCENARIO_STORE_ENTRIES = registry.gauge(
+    "nebula_scenario_store_entries",
+    "Cenários guardados no índice de similaridade.",
+)
+AGENT_MEMORY_USERS = registry.gauge(
+    "nebula_agent_memory_users",
+    "Usuários com memória do agente residente.",
+)
+AGENT_MEMORY_BYTES = registry.gauge(
+    "nebula_agent_memory_bytes",
+    "Bytes aproximados das memórias do agente residentes.",
+)
+AGENT_MEMORY_EVICTIONS = registry.counter(
+    "nebula_agent_memory_evictions_total",
+    "Memórias de usuário descartadas por motivo (idle, users, bytes).",
+    ["reason"],
+)
+AGENT_MEMORY_TRIMMED = registry.counter(
+    "nebula_agent_memory_trimmed_total",
+    "Itens removidos para manter a memória de um usuário no orçamento, por tipo (scenario, screen).",
+    ["kind"],
+)
+LLM_REQUESTS = registry.counter(
+    "nebula_llm_requests_total",
+    "Chamadas ao LLM por resultado.",
+    ["outcome"],
+)
+LLM_TOKENS = registry.counter(
+    "nebula_llm_tokens_total",
+    "Tokens consumidos no LLM por tipo (prompt, completion).",
+    ["kind"],
+)
+LLM_COALESCED = registry.counter(
+    "nebula_llm_coalesced_total",
+    "Gerações que reaproveitaram uma chamada idêntica ao LLM já em andamento.",
+)
+LLM_FLIGHTS = registry.gauge(
+    "nebula_llm_flights_in_progress",
+    "Chamadas distintas ao LLM em andamento.",
+)
+LLM_BREAKER_STATE = registry.gauge(
+    "nebula_llm_breaker_state",
+    "Estado do circuit breaker do LLM (0 fechado, 1 semiaberto, 2 aberto).",
+)
+LLM_BREAKER_TRANSITIONS = registry.counter(
+    "nebula_llm_breaker_transitions_total",
+    "Transições do circuit breaker do LLM, por estado de destino.",
+    ["state"],
+)
+LLM_FALLBACKS = registry.counter(
+    "nebula_llm_fallbacks_total",
+    "Gerações servidas pelo motor ML local por motivo.",
+    ["reason"],
+)
+BILLING_ACTIONS = registry.counter(
+    "nebula_billing_actions_total",
+    "Ações de billing por tipo e resultado.",
+    ["action", "result"],
+)
+BILLING_CREDITS = registry.counter(
+    "nebula_billing_credits_charged_total",
+    "Créditos debitados pelas ações de billing.",
+)
+BILLING_CREDITS_REFUNDED = registry.counter(
+    "nebula_billing_credits_refunded_total",
+    "Créditos estornados quando a ação cobrada não foi entregue pelo LLM.",
+)
+REPORT_EXPORTS = registry.counter(
+    "nebula_report_exports_total",
+    "Exportações de relatório por formato e resultado (completed, aborted ou o motivo da recusa).",
+    ["format", "result"],
+)
+REPORT_EXPORT_BYTES = registry.counter(
+    "nebula_report_export_bytes_total",
+    "Bytes enviados nas exportações de relatório por formato.",
+    ["format"],
+)
+ASSET_RESPONSES = registry.counter(
+    "nebula_asset_responses_total",
+    "Respostas do cache de assets por status e codificação.",
+    ["status", "encoding"],
+)
+JOBS_QUEUE_DEPTH = registry.gauge(
+    "nebula_jobs_queue_depth",
+    "Jobs aguardando na fila de segundo plano.",
+    ["queue"],
+)
+JOBS_LAG_SECONDS = registry.histogram(
+    "nebula_jobs_lag_seconds",
+    "Tempo entre o enfileiramento de um job e o início da execução.",
+    ["queue"],
+)
+JOBS_PROCESSED = registry.counter(
+    "nebula_jobs_processed_total",
+    "Jobs executados por fila, tipo e resultado (ok, error, inline).",
+    ["queue", "kind", "result"],
+)
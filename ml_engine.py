@@ -3,9 +3,25 @@ Motor de Machine Learning para Análise Visual e Geração de Cenários
 Nebula Agent v6.0
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from html.parser import HTMLParser
+import asyncio
+import codecs
+import json
+import os
 import re
+import sys
+import threading
+
+try:
+    from .keywords import keyword_extractor
+    from .screen_classifier import screen_classifier
+except ImportError:
+    from keywords import keyword_extractor
+    from screen_classifier import screen_classifier
 
 
 # ============================================
@@ -43,6 +59,13 @@ class ElementType(str, Enum):
     ALERT = "alert"
 
 
+class ExecutorMode(str, Enum):
+    """Onde o motor executa análise e geração (o resultado é sempre picklable)."""
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
 # ============================================
 # CLASSE DE ELEMENTO DE UI
 # ============================================
@@ -76,16 +99,20 @@ class UIElement:
     
     def to_gherkin_step(self) -> str:
         """Converte o elemento para um passo Gherkin."""
-        if self.element_type == ElementType.INPUT:
-            return f'E eu preencho o campo "{self.label}" com "<valor>"'
-        elif self.element_type == ElementType.BUTTON:
-            return f'E eu clico no botão "{self.label}"'
-        elif self.element_type == ElementType.CHECKBOX:
-            return f'E eu marco a caixa de seleção "{self.label}"'
-        elif self.element_type == ElementType.DROPDOWN:
-            return f'E eu seleciono "<opção>" no dropdown "{self.label}"'
-        else:
-            return f'E eu interajo com "{self.label}"'
+        return STEP_TEMPLATES.get(self.element_type, DEFAULT_STEP_TEMPLATE).format(label=self.label)
+
+
+# Passo Gherkin por tipo de elemento
+STEP_TEMPLATES = {
+    ElementType.INPUT: 'E eu preencho o campo "{label}" com "<valor>"',
+    ElementType.BUTTON: 'E eu clico no botão "{label}"',
+    ElementType.CHECKBOX: 'E eu marco a caixa de seleção "{label}"',
+    ElementType.DROPDOWN: 'E eu seleciono "<opção>" no dropdown "{label}"',
+    ElementType.SELECT: 'E eu seleciono "<opção>" no dropdown "{label}"',
+    ElementType.TEXTAREA: 'E eu preencho o campo "{label}" com "<valor>"',
+    ElementType.RADIO: 'E eu seleciono a opção "{label}"',
+}
+DEFAULT_STEP_TEMPLATE = 'E eu interajo com "{label}"'
 
 
 # ============================================
@@ -95,15 +122,29 @@ class UIElement:
 class ScreenAnalysis:
     """Análise de uma tela capturada."""
     
-    def __init__(self, screen_description: str):
+    def __init__(
+        self,
+        screen_description: str,
+        elements: Optional[List[UIElement]] = None,
+        prediction: Optional[Tuple[ScreenType, float]] = None
+    ):
         self.screen_description = screen_description
-        self.screen_type = self._detect_screen_type()
-        self.elements = self._extract_elements()
+        # `prediction` vem da classificação em lote (ScreenAnalysis.batch)
+        self.screen_type, self._type_confidence = prediction or self._detect_screen_type()
+        # Elementos já conhecidos (ex.: lidos do HTML) dispensam a extração pela descrição
+        self.elements = elements if elements is not None else self._extract_elements()
         self.keywords = self._extract_keywords()
         self.confidence = self._calculate_confidence()
     
-    def _detect_screen_type(self) -> ScreenType:
-        """Detecta o tipo de tela baseado na descrição."""
+    def _detect_screen_type(self) -> Tuple[ScreenType, Optional[float]]:
+        """Detecta o tipo de tela (classificador linear; palavras-chave se o modelo faltar)."""
+        if screen_classifier is not None:
+            label, probability = screen_classifier.predict_one(self.screen_description)
+            return ScreenType(label), probability
+        return self._keyword_screen_type(), None
+    
+    def _keyword_screen_type(self) -> ScreenType:
+        """Primeiro tipo cuja lista de palavras-chave aparece na descrição."""
         desc_lower = self.screen_description.lower()
         
         # Mapeamento de palavras-chave para tipos de tela
@@ -194,20 +235,15 @@ class ScreenAnalysis:
         ])
     
     def _extract_keywords(self) -> List[str]:
-        """Extrai palavras-chave da descrição da tela."""
-        # Remover palavras comuns
-        stop_words = {
-            "o", "a", "de", "da", "do", "e", "ou", "com", "para", "em",
-            "que", "um", "uma", "os", "as", "dos", "das", "é", "são"
-        }
-        
-        words = self.screen_description.lower().split()
-        keywords = [word.strip(".,!?;:") for word in words if word.lower() not in stop_words and len(word) > 3]
-        
-        return list(set(keywords))[:10]  # Retornar top 10 únicos
+        """Extrai as 10 palavras-chave mais relevantes da descrição (TF-IDF, ordem determinística)."""
+        return keyword_extractor.extract(self.screen_description, k=10)
     
     def _calculate_confidence(self) -> float:
         """Calcula a confiança da análise (0.0 a 1.0)."""
+        # Probabilidade calibrada do tipo previsto pelo classificador
+        if self._type_confidence is not None:
+            return round(self._type_confidence, 4)
+        
         confidence = 0.5  # Base
         
         # Aumentar confiança se o tipo de tela foi detectado com certeza
@@ -224,6 +260,25 @@ class ScreenAnalysis:
         
         return min(confidence, 1.0)
     
+    @classmethod
+    def batch(cls, screen_descriptions: Sequence[str]) -> List["ScreenAnalysis"]:
+        """Analisa várias descrições classificando o tipo de todas numa única passada."""
+        if screen_classifier is None:
+            return [cls(description) for description in screen_descriptions]
+        predictions = screen_classifier.predict(screen_descriptions)
+        return [
+            cls(description, prediction=(ScreenType(label), probability))
+            for description, (label, probability) in zip(screen_descriptions, predictions)
+        ]
+    
+    @classmethod
+    def from_html(cls, source: Union[str, bytes, Iterable], encoding: str = "utf-8", max_elements: Optional[int] = None) -> "ScreenAnalysis":
+        """Analisa uma página HTML real (texto, bytes, arquivo aberto ou iterável de partes)."""
+        reader = HTMLScreenReader(encoding, max_elements or MAX_HTML_ELEMENTS)
+        for chunk in _html_chunks(source):
+            reader.feed(chunk)
+        return reader.finish()
+    
     def to_dict(self) -> Dict:
         """Converte a análise para dicionário."""
         return {
@@ -235,6 +290,424 @@ class ScreenAnalysis:
         }
 
 
+# ============================================
+# INGESTÃO DE HTML (PARSER INCREMENTAL)
+# ============================================
+
+HTML_CHUNK_SIZE = 64 * 1024
+MAX_LABEL_CHARS = 200
+MAX_DESCRIPTION_CHARS = 2000
+MAX_HTML_ELEMENTS = 500
+
+INPUT_TYPES = {
+    "checkbox": ElementType.CHECKBOX,
+    "radio": ElementType.RADIO,
+    "submit": ElementType.BUTTON,
+    "button": ElementType.BUTTON,
+    "reset": ElementType.BUTTON,
+    "image": ElementType.BUTTON,
+}
+# Conteúdo que não é texto visível da página
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Tags cujo texto vira rótulo (de elemento, tabela ou da própria tela)
+CAPTURED_TAGS = {"label", "button", "a", "title", "h1", "h2", "h3", "caption", "th"}
+# Já entram na descrição por conta própria
+HEADING_TAGS = {"title", "h1", "h2", "h3"}
+
+
+def _clean_label(text: str) -> str:
+    return " ".join(text.split()).strip(" :*")[:MAX_LABEL_CHARS]
+
+
+class HTMLScreenParser(HTMLParser):
+    """
+    Parser incremental (html.parser) que transforma HTML em UIElements: inputs,
+    botões, links, selects, checkboxes, radios, textareas e tabelas, com rótulo, name
+    e required. O HTML é recebido em partes com `feed` e os elementos prontos saem
+    por `drain`, então a memória não depende do tamanho da página: só ficam guardados
+    os textos abertos (limitados), o mapa de <label for> e uma janela curta de
+    elementos recentes, que ainda podem receber um <label for> que venha depois deles.
+    """
+
+    def __init__(self, max_labels: int = 10000, window: int = 32):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.headings: List[str] = []
+        self.text_sample: List[str] = []
+        self._text_budget = MAX_DESCRIPTION_CHARS
+        self._labels_by_id: "OrderedDict[str, str]" = OrderedDict()
+        self._max_labels = max_labels
+        self._window = window
+        self._recent: deque = deque()
+        self._unlabeled: Dict[str, UIElement] = {}
+        self._ready: deque = deque()
+        self._captures: Dict[str, Dict] = {}
+        self._skip_depth = 0
+        self._label_deferred: List[UIElement] = []
+        self._table: Optional[Dict] = None
+        self._table_depth = 0
+        self._tables = 0
+
+    # ============================================
+    # EVENTOS DO PARSER
+    # ============================================
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        attributes = dict(attrs)
+        if tag in ("td", "tr") and "th" in self._captures:
+            # </th> é opcional no HTML
+            self.handle_endtag("th")
+        if tag in CAPTURED_TAGS:
+            if tag in self._captures:
+                self.handle_endtag(tag)
+            self._captures[tag] = {"attrs": attributes, "text": [], "size": 0}
+        if tag == "input":
+            self._start_input(attributes)
+        elif tag == "select":
+            self._add_field(ElementType.SELECT, attributes)
+        elif tag == "textarea":
+            self._add_field(ElementType.TEXTAREA, attributes)
+        elif tag == "table":
+            self._table_depth += 1
+            if self._table_depth == 1:
+                self._tables += 1
+                self._table = {"attrs": attributes, "caption": "", "headers": []}
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        # <input ... /> e afins: não abrem captura de texto
+        if tag in CAPTURED_TAGS or tag in SKIPPED_TAGS or tag == "table":
+            return
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag == "table" and self._table_depth:
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self._end_table()
+            return
+        capture = self._captures.pop(tag, None)
+        if capture is None:
+            return
+        text = _clean_label("".join(capture["text"]))
+        attrs = capture["attrs"]
+        if tag == "label":
+            self._end_label(attrs, text)
+        elif tag == "button":
+            label = attrs.get("aria-label") or text or attrs.get("value") or attrs.get("title") or "Botão"
+            self._emit(UIElement(ElementType.BUTTON, _clean_label(label), attrs.get("name") or attrs.get("id") or ""))
+        elif tag == "a":
+            self._end_link(attrs, text)
+        elif tag == "title":
+            self.title = self.title or text
+        elif tag in ("h1", "h2", "h3"):
+            if text and len(self.headings) < 20:
+                self.headings.append(text)
+        elif self._table is not None:
+            if tag == "caption":
+                self._table["caption"] = text
+            elif tag == "th" and text and len(self._table["headers"]) < 10:
+                self._table["headers"].append(text)
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        for capture in self._captures.values():
+            if capture["size"] < MAX_LABEL_CHARS:
+                capture["text"].append(data[:MAX_LABEL_CHARS])
+                capture["size"] += len(data)
+        if self._text_budget > 0 and not HEADING_TAGS.intersection(self._captures):
+            text = " ".join(data.split())
+            if text:
+                self.text_sample.append(text[:self._text_budget])
+                self._text_budget -= len(text) + 1
+
+    # ============================================
+    # ELEMENTOS
+    # ============================================
+
+    def _start_input(self, attrs: Dict[str, Optional[str]]) -> None:
+        input_type = (attrs.get("type") or "text").lower()
+        if input_type == "hidden":
+            return
+        element_type = INPUT_TYPES.get(input_type, ElementType.INPUT)
+        if element_type == ElementType.BUTTON:
+            label = attrs.get("aria-label") or attrs.get("value") or attrs.get("title") or "Enviar"
+            self._emit(UIElement(ElementType.BUTTON, _clean_label(label), attrs.get("name") or attrs.get("id") or ""))
+            return
+        self._add_field(element_type, attrs)
+
+    def _add_field(self, element_type: ElementType, attrs: Dict[str, Optional[str]]) -> None:
+        element_id = attrs.get("id") or ""
+        label = attrs.get("aria-label") or self._labels_by_id.pop(element_id, "")
+        fallback = attrs.get("placeholder") or attrs.get("title") or attrs.get("name") or element_id or element_type.value
+        element = UIElement(
+            element_type,
+            _clean_label(label or fallback),
+            attrs.get("name") or element_id or "",
+            required="required" in attrs or attrs.get("aria-required") == "true",
+            placeholder=attrs.get("placeholder") or ""
+        )
+        if not label and "label" in self._captures:
+            # Dentro de <label>: o rótulo é o texto do label, conhecido só no fechamento
+            self._label_deferred.append(element)
+            return
+        self._emit(element, weak_label=not label and bool(element_id), element_id=element_id)
+
+    def _end_label(self, attrs: Dict[str, Optional[str]], text: str) -> None:
+        deferred, self._label_deferred = self._label_deferred, []
+        for element in deferred:
+            if text:
+                element.label = text
+            self._emit(element)
+        target = attrs.get("for")
+        if not target or not text:
+            return
+        element = self._unlabeled.pop(target, None)
+        if element is not None:
+            # <label for> depois do campo, ainda dentro da janela de elementos recentes
+            element.label = text
+            return
+        self._labels_by_id[target] = text
+        if len(self._labels_by_id) > self._max_labels:
+            self._labels_by_id.popitem(last=False)
+
+    def _end_link(self, attrs: Dict[str, Optional[str]], text: str) -> None:
+        if attrs.get("role") == "button":
+            element_type = ElementType.BUTTON
+        elif attrs.get("href") is not None:
+            element_type = ElementType.LINK
+        else:
+            return
+        label = attrs.get("aria-label") or text or attrs.get("title") or attrs.get("href") or "Link"
+        self._emit(UIElement(element_type, _clean_label(label), attrs.get("id") or ""))
+
+    def _end_table(self) -> None:
+        table, self._table = self._table, None
+        attrs = table["attrs"]
+        label = table["caption"] or attrs.get("aria-label") or ""
+        if not label and table["headers"]:
+            label = "Tabela: " + ", ".join(table["headers"])
+        name = attrs.get("id") or f"tabela_{self._tables}"
+        self._emit(UIElement(ElementType.TABLE, _clean_label(label or "Tabela"), name))
+
+    def _emit(self, element: UIElement, weak_label: bool = False, element_id: str = "") -> None:
+        # Campos sem rótulo e com id esperam na janela por um <label for> posterior
+        pending_id = element_id if weak_label else ""
+        self._recent.append((element, pending_id))
+        if pending_id:
+            self._unlabeled[pending_id] = element
+        while len(self._recent) > self._window:
+            self._release(*self._recent.popleft())
+
+    def _release(self, element: UIElement, pending_id: str) -> None:
+        if pending_id and self._unlabeled.get(pending_id) is element:
+            del self._unlabeled[pending_id]
+        self._ready.append(element)
+
+    # ============================================
+    # SAÍDA
+    # ============================================
+
+    def drain(self) -> List[UIElement]:
+        """Elementos prontos desde a última chamada, na ordem da página."""
+        ready = list(self._ready)
+        self._ready.clear()
+        return ready
+
+    def close(self) -> None:
+        """Fecha o parser e libera a janela de elementos recentes."""
+        super().close()
+        for element in self._label_deferred:
+            self._emit(element)
+        self._label_deferred = []
+        while self._recent:
+            self._release(*self._recent.popleft())
+        self._unlabeled.clear()
+
+    def description(self) -> str:
+        """Descrição textual da página (título, cabeçalhos e começo do texto visível)."""
+        parts = [f"Tela {self.title}" if self.title else "Tela"]
+        parts.extend(self.headings)
+        parts.append(" ".join(self.text_sample))
+        return ". ".join(part for part in parts if part)[:MAX_DESCRIPTION_CHARS]
+
+
+def _html_chunks(source: Union[str, bytes, Iterable]) -> Iterator[Union[str, bytes]]:
+    # Texto inteiro, arquivo aberto ou iterável de partes (str ou bytes)
+    if isinstance(source, (str, bytes)):
+        for start in range(0, len(source), HTML_CHUNK_SIZE):
+            yield source[start:start + HTML_CHUNK_SIZE]
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(HTML_CHUNK_SIZE), source.read(0))
+    else:
+        yield from source
+
+
+class HTMLScreenReader:
+    """
+    Ingestão incremental de uma página: `feed` com partes em bytes ou texto (ex.: o
+    corpo de um upload lido aos poucos) e `finish` para obter a ScreenAnalysis. Guarda
+    no máximo `max_elements` elementos; `elements_total` conta todos os encontrados.
+    """
+
+    def __init__(self, encoding: str = "utf-8", max_elements: int = MAX_HTML_ELEMENTS):
+        self.parser = HTMLScreenParser()
+        self.max_elements = max_elements
+        self.elements: List[UIElement] = []
+        self.elements_total = 0
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        if isinstance(chunk, bytes):
+            self.bytes_read += len(chunk)
+            chunk = self._decoder.decode(chunk)
+        else:
+            self.bytes_read += len(chunk)
+        self.parser.feed(chunk)
+        self._collect()
+
+    def finish(self) -> "ScreenAnalysis":
+        self.parser.feed(self._decoder.decode(b"", final=True))
+        self.parser.close()
+        self._collect()
+        return ScreenAnalysis(self.parser.description(), elements=self.elements)
+
+    def _collect(self) -> None:
+        for element in self.parser.drain():
+            self.elements_total += 1
+            if len(self.elements) < self.max_elements:
+                self.elements.append(element)
+
+
+def iter_html_elements(source: Union[str, bytes, Iterable], encoding: str = "utf-8") -> Iterator[UIElement]:
+    """Percorre o HTML em partes e gera os UIElements à medida que são encontrados."""
+    parser = HTMLScreenParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in _html_chunks(source):
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        yield from parser.drain()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.drain()
+
+
+# ============================================
+# TEMPLATES DE CENÁRIO PRÉ-COMPILADOS
+# ============================================
+
+class OutputFormat(str, Enum):
+    """Formatos de saída do cenário gerado."""
+    PLAIN = "plain"
+    MARKDOWN = "markdown"
+    JSON = "json"
+
+
+FEATURE_NAMES = {
+    ScreenType.LOGIN: "Autenticação de Usuário",
+    ScreenType.REGISTRATION: "Registro de Novo Usuário",
+    ScreenType.CHECKOUT: "Processo de Checkout",
+    ScreenType.DASHBOARD: "Acesso ao Dashboard",
+    ScreenType.FORM: "Preenchimento de Formulário",
+    ScreenType.LIST: "Visualização de Lista",
+}
+
+GIVEN_STEPS = {
+    ScreenType.LOGIN: "Dado que estou na página de login",
+    ScreenType.REGISTRATION: "Dado que estou na página de registro",
+    ScreenType.CHECKOUT: "Dado que tenho itens no carrinho",
+    ScreenType.DASHBOARD: "Dado que estou autenticado no sistema",
+    ScreenType.FORM: "Dado que estou na página com o formulário",
+}
+
+THEN_STEPS = {
+    ScreenType.LOGIN: "Então devo ser redirecionado para o dashboard",
+    ScreenType.REGISTRATION: "Então devo receber uma mensagem de sucesso",
+    ScreenType.CHECKOUT: "Então o pedido deve ser confirmado",
+    ScreenType.DASHBOARD: "Então devo visualizar meus dados",
+    ScreenType.FORM: "Então o formulário deve ser enviado com sucesso",
+}
+
+DEFAULT_FEATURE_NAME = "Funcionalidade da Aplicação"
+DEFAULT_GIVEN_STEP = "Dado que estou na aplicação"
+DEFAULT_THEN_STEP = "Então a ação deve ser bem-sucedida"
+DEFAULT_WHEN_STEP = "Quando eu realizo uma ação"
+MAX_SCENARIO_NAME = 80
+
+
+class CompiledTemplate:
+    """
+    Cenário de um ScreenType com as partes estáticas montadas uma única vez.
+    Na renderização só entram a intenção do usuário e os passos dos elementos.
+    """
+    
+    def __init__(self, screen_type: ScreenType):
+        self.screen_type = screen_type
+        self.feature_name = FEATURE_NAMES.get(screen_type, DEFAULT_FEATURE_NAME)
+        self.given_step = GIVEN_STEPS.get(screen_type, DEFAULT_GIVEN_STEP)
+        self.then_step = THEN_STEPS.get(screen_type, DEFAULT_THEN_STEP)
+        self._head = sys.intern(f"Feature: {self.feature_name}\n  Como um usuário\n  Quero ")
+        self._scenario = sys.intern("\n  Para validar a funcionalidade\n\n  Scenario: ")
+        self._given = sys.intern(f"\n    {self.given_step}\n")
+        self._then = sys.intern(f"\n    {self.then_step}")
+    
+    @staticmethod
+    def scenario_name(user_intent: str) -> str:
+        """Nome do cenário (limitado a 80 caracteres)."""
+        if len(user_intent) > MAX_SCENARIO_NAME:
+            return user_intent[:MAX_SCENARIO_NAME] + "..."
+        return user_intent
+    
+    @staticmethod
+    def when_steps(elements: List[UIElement]) -> List[str]:
+        steps = [element.to_gherkin_step() for element in elements]
+        return steps or [DEFAULT_WHEN_STEP]
+    
+    def render_plain(self, user_intent: str, elements: List[UIElement]) -> str:
+        return "".join((
+            self._head, user_intent,
+            self._scenario, self.scenario_name(user_intent),
+            self._given,
+            "    ", "\n    ".join(self.when_steps(elements)),
+            self._then,
+        ))
+    
+    def to_steps(self, user_intent: str, elements: List[UIElement]) -> Dict:
+        """Estrutura do cenário como lista de passos (base do formato JSON)."""
+        lines = [self.given_step, *self.when_steps(elements), self.then_step]
+        steps = []
+        for line in lines:
+            keyword, _, text = line.partition(" ")
+            steps.append({"keyword": keyword, "text": text})
+        return {
+            "feature": self.feature_name,
+            "screen_type": self.screen_type.value,
+            "intent": user_intent,
+            "scenario": self.scenario_name(user_intent),
+            "steps": steps,
+        }
+    
+    def render(self, user_intent: str, elements: List[UIElement], output_format: str = OutputFormat.PLAIN) -> str:
+        """Renderiza o cenário no formato pedido (plain, markdown ou json)."""
+        if output_format == OutputFormat.PLAIN:
+            return self.render_plain(user_intent, elements)
+        if output_format == OutputFormat.MARKDOWN:
+            return "".join(("```gherkin\n", self.render_plain(user_intent, elements), "\n```"))
+        if output_format == OutputFormat.JSON:
+            return json.dumps(self.to_steps(user_intent, elements), ensure_ascii=False)
+        raise ValueError(f"Formato de saída inválido: {output_format}")
+
+
+# Compilados uma vez na importação do módulo
+TEMPLATES: Dict[ScreenType, CompiledTemplate] = {screen_type: CompiledTemplate(screen_type) for screen_type in ScreenType}
+
+
 # ============================================
 # CLASSE DE GERADOR DE CENÁRIOS
 # ============================================
@@ -244,92 +717,247 @@ class ScenarioGenerator:
     
     def __init__(self, screen_analysis: ScreenAnalysis):
         self.screen_analysis = screen_analysis
+        self.template = TEMPLATES[screen_analysis.screen_type]
     
-    def generate_scenario(self, user_intent: str) -> str:
+    def generate_scenario(self, user_intent: str, output_format: str = OutputFormat.PLAIN) -> str:
         """Gera um cenário Gherkin completo."""
-        feature_name = self._generate_feature_name()
-        scenario_name = self._generate_scenario_name(user_intent)
-        given_steps = self._generate_given_steps()
-        when_steps = self._generate_when_steps()
-        then_steps = self._generate_then_steps()
-        
-        gherkin = f"""Feature: {feature_name}
-  Como um usuário
-  Quero {user_intent}
-  Para validar a funcionalidade
-
-  Scenario: {scenario_name}
-{given_steps}
-{when_steps}
-{then_steps}"""
-        
-        return gherkin
-    
-    def _generate_feature_name(self) -> str:
-        """Gera o nome da feature."""
-        feature_names = {
-            ScreenType.LOGIN: "Autenticação de Usuário",
-            ScreenType.REGISTRATION: "Registro de Novo Usuário",
-            ScreenType.CHECKOUT: "Processo de Checkout",
-            ScreenType.DASHBOARD: "Acesso ao Dashboard",
-            ScreenType.FORM: "Preenchimento de Formulário",
-            ScreenType.LIST: "Visualização de Lista",
-        }
-        
-        return feature_names.get(self.screen_analysis.screen_type, "Funcionalidade da Aplicação")
-    
-    def _generate_scenario_name(self, user_intent: str) -> str:
-        """Gera o nome do cenário."""
-        # Limitar a 80 caracteres
-        scenario = user_intent[:80]
-        if len(user_intent) > 80:
-            scenario += "..."
-        return scenario
-    
-    def _generate_given_steps(self) -> str:
-        """Gera os passos Given."""
-        steps = []
-        
-        # Passo inicial baseado no tipo de tela
-        given_map = {
-            ScreenType.LOGIN: "Dado que estou na página de login",
-            ScreenType.REGISTRATION: "Dado que estou na página de registro",
-            ScreenType.CHECKOUT: "Dado que tenho itens no carrinho",
-            ScreenType.DASHBOARD: "Dado que estou autenticado no sistema",
-            ScreenType.FORM: "Dado que estou na página com o formulário",
-        }
-        
-        steps.append(f"    {given_map.get(self.screen_analysis.screen_type, 'Dado que estou na aplicação')}")
-        
-        return "\n".join(steps)
+        return self.template.render(user_intent, self.screen_analysis.elements, output_format)
+
+
+# ============================================
+# GERADOR DE FEATURE COMPLETA (SCENARIO OUTLINE + EXAMPLES)
+# ============================================
+
+# Cenários de continuação sugeridos por tipo de tela
+NEXT_SCENARIOS = {
+    ScreenType.LOGIN: [
+        "Validação de credenciais inválidas",
+        "Recuperação de senha",
+        "Login com dois fatores"
+    ],
+    ScreenType.REGISTRATION: [
+        "Validação de email duplicado",
+        "Validação de senha fraca",
+        "Confirmação de email"
+    ],
+    ScreenType.CHECKOUT: [
+        "Validação de endereço",
+        "Processamento de pagamento",
+        "Confirmação de pedido"
+    ],
+}
+
+# Valores de exemplo (válido, inválido) por palavra contida no nome/rótulo do campo
+EXAMPLE_VALUES = [
+    (("email", "e-mail"), "usuario@exemplo.com", "usuario@"),
+    (("senha", "password"), "Senha@123", "123"),
+    (("cpf",), "529.982.247-25", "111.111.111-11"),
+    (("cep", "zip"), "01001-000", "00000"),
+    (("telefone", "celular", "phone"), "(11) 91234-5678", "1234"),
+    (("nome", "name", "usuário", "usuario", "username"), "Maria Silva", "@@"),
+    (("cidade", "city"), "São Paulo", "123"),
+    (("endereço", "endereco", "address"), "Rua das Flores, 100", "-"),
+    (("data", "date"), "01/01/2030", "31/02/2030"),
+]
+DEFAULT_VALID_VALUE = "valor válido"
+DEFAULT_INVALID_VALUE = "###"
+
+# Elementos que recebem valor (entram nas tabelas de validação e de erro)
+VALUE_ELEMENTS = (ElementType.INPUT, ElementType.TEXTAREA, ElementType.DROPDOWN, ElementType.SELECT, ElementType.RADIO)
+
+
+def example_values(element: UIElement) -> Tuple[str, str]:
+    """Par (valor válido, valor inválido) para um elemento, pelo nome ou rótulo."""
+    text = f"{element.name} {element.label}".lower()
+    for words, valid, invalid in EXAMPLE_VALUES:
+        if any(word in text for word in words):
+            return valid, invalid
+    return DEFAULT_VALID_VALUE, DEFAULT_INVALID_VALUE
+
+
+def _cell(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("|", "\\|")
+
+
+def _table_row(values: Iterable[str]) -> str:
+    return "      | " + " | ".join(_cell(v) for v in values) + " |\n"
+
+
+class FeatureGenerator:
+    """
+    Gera um arquivo .feature com vários Scenario Outlines (caminho feliz, validação,
+    erro, interação e cenários previstos), com tabelas Examples cobrindo todos os elementos.
+    As partes são produzidas sob demanda para não montar o documento inteiro em memória.
+    """
     
-    def _generate_when_steps(self) -> str:
-        """Gera os passos When."""
-        steps = []
-        
-        # Adicionar passos para cada elemento
-        for element in self.screen_analysis.elements[:3]:  # Limitar a 3 elementos
-            step = element.to_gherkin_step()
-            steps.append(f"    {step}")
-        
-        return "\n".join(steps) if steps else "    Quando eu realizo uma ação"
+    def __init__(self, screen_analysis: ScreenAnalysis):
+        self.screen_analysis = screen_analysis
+        self.template = TEMPLATES[screen_analysis.screen_type]
+        self._placeholders: Dict[int, str] = {}
+        self._used_placeholders = set()
     
-    def _generate_then_steps(self) -> str:
-        """Gera os passos Then."""
-        steps = []
-        
-        # Passo final baseado no tipo de tela
-        then_map = {
-            ScreenType.LOGIN: "Então devo ser redirecionado para o dashboard",
-            ScreenType.REGISTRATION: "Então devo receber uma mensagem de sucesso",
-            ScreenType.CHECKOUT: "Então o pedido deve ser confirmado",
-            ScreenType.DASHBOARD: "Então devo visualizar meus dados",
-            ScreenType.FORM: "Então o formulário deve ser enviado com sucesso",
-        }
-        
-        steps.append(f"    {then_map.get(self.screen_analysis.screen_type, 'Então a ação deve ser bem-sucedida')}")
-        
-        return "\n".join(steps)
+    def iter_feature(self, user_intent: str) -> Iterator[str]:
+        template = self.template
+        yield f"Feature: {template.feature_name}\n  Como um usuário\n  Quero {user_intent}\n  Para validar a funcionalidade\n"
+        yield from self._happy_path(user_intent)
+        yield from self._required_fields()
+        yield from self._invalid_values()
+        yield from self._interactions()
+        yield from self._predicted()
+    
+    def generate(self, user_intent: str) -> str:
+        return "".join(self.iter_feature(user_intent))
+    
+    def render(self, user_intent: str, output_format: str = OutputFormat.PLAIN) -> str:
+        """Renderiza a feature no formato pedido (plain, markdown ou json com o texto da feature)."""
+        if output_format == OutputFormat.PLAIN:
+            return self.generate(user_intent)
+        if output_format == OutputFormat.MARKDOWN:
+            return "".join(("```gherkin\n", self.generate(user_intent), "```"))
+        if output_format == OutputFormat.JSON:
+            return json.dumps({
+                "feature": self.template.feature_name,
+                "screen_type": self.screen_analysis.screen_type.value,
+                "intent": user_intent,
+                "gherkin": self.generate(user_intent),
+            }, ensure_ascii=False)
+        raise ValueError(f"Formato de saída inválido: {output_format}")
+    
+    def _value_elements(self) -> Iterator[UIElement]:
+        return (e for e in self.screen_analysis.elements if e.element_type in VALUE_ELEMENTS)
+    
+    def _placeholder(self, element: UIElement) -> str:
+        """Nome de coluna do Examples para o elemento (sem espaços e único na feature)."""
+        name = self._placeholders.get(id(element))
+        if name is None:
+            base = re.sub(r"[\W_]+", "_", element.name).strip("_") or "valor"
+            name, suffix = base, 2
+            while name in self._used_placeholders:
+                name, suffix = f"{base}_{suffix}", suffix + 1
+            self._placeholders[id(element)] = name
+            self._used_placeholders.add(name)
+        return name
+    
+    def _step_with_placeholder(self, element: UIElement) -> str:
+        if element.element_type not in VALUE_ELEMENTS:
+            return element.to_gherkin_step()
+        placeholder = f"<{self._placeholder(element)}>"
+        if element.element_type in (ElementType.INPUT, ElementType.TEXTAREA):
+            return f'E eu preencho o campo "{element.label}" com "{placeholder}"'
+        return f'E eu seleciono "{placeholder}" em "{element.label}"'
+    
+    def _happy_path(self, user_intent: str) -> Iterator[str]:
+        yield f"\n  Scenario Outline: {self.template.scenario_name(user_intent)} com dados válidos\n"
+        yield f"    {self.template.given_step}\n"
+        has_steps = False
+        for element in self.screen_analysis.elements:
+            has_steps = True
+            yield f"    {self._step_with_placeholder(element)}\n"
+        if not has_steps:
+            yield f"    {DEFAULT_WHEN_STEP}\n"
+        yield f"    {self.template.then_step}\n"
+        names = [self._placeholder(e) for e in self._value_elements()]
+        yield "\n    Examples:\n"
+        if names:
+            yield _table_row(names)
+            yield _table_row(example_values(e)[0] for e in self._value_elements())
+        else:
+            yield _table_row(["cenario"])
+            yield _table_row(["padrão"])
+    
+    def _required_fields(self) -> Iterator[str]:
+        rows = ((e.label, f'O campo "{e.label}" é obrigatório') for e in self._value_elements())
+        yield from self._outline(
+            "Validação de campo obrigatório <campo>",
+            ['E eu deixo o campo "<campo>" vazio', "E eu confirmo a ação", 'Então devo ver a mensagem "<mensagem>"'],
+            ["campo", "mensagem"],
+            rows,
+        )
+    
+    def _invalid_values(self) -> Iterator[str]:
+        rows = (
+            (e.label, example_values(e)[1], f'Valor inválido para "{e.label}"')
+            for e in self._value_elements()
+        )
+        yield from self._outline(
+            "Erro com valor inválido em <campo>",
+            ['E eu preencho o campo "<campo>" com "<valor>"', "E eu confirmo a ação", 'Então devo ver a mensagem "<mensagem>"'],
+            ["campo", "valor", "mensagem"],
+            rows,
+        )
+    
+    def _interactions(self) -> Iterator[str]:
+        rows = ((e.label, e.element_type.value) for e in self.screen_analysis.elements)
+        yield from self._outline(
+            "Interação com o elemento <elemento>",
+            ['Quando eu interajo com o elemento "<elemento>" do tipo "<tipo>"', "Então o elemento deve responder corretamente"],
+            ["elemento", "tipo"],
+            rows,
+        )
+    
+    def _predicted(self) -> Iterator[str]:
+        rows = ((flow,) for flow in NEXT_SCENARIOS.get(self.screen_analysis.screen_type, []))
+        yield from self._outline(
+            "<fluxo>",
+            ['Quando eu executo o fluxo "<fluxo>"', 'Então o fluxo "<fluxo>" deve ser concluído conforme esperado'],
+            ["fluxo"],
+            rows,
+        )
+    
+    def _outline(self, title: str, steps: List[str], header: List[str], rows: Iterator[Tuple[str, ...]]) -> Iterator[str]:
+        """Emite um Scenario Outline apenas se houver ao menos uma linha de Examples."""
+        first = next(rows, None)
+        if first is None:
+            return
+        yield f"\n  Scenario Outline: {title}\n    {self.template.given_step}\n"
+        for step in steps:
+            yield f"    {step}\n"
+        yield "\n    Examples:\n"
+        yield _table_row(header)
+        yield _table_row(first)
+        for row in rows:
+            yield _table_row(row)
+
+
+# ============================================
+# TAREFAS DOS WORKERS (NÍVEL DE MÓDULO PARA SEREM PICKLABLE)
+# ============================================
+
+WARMUP_DESCRIPTION = "Tela de Login com campos 'Usuário', 'Senha', botão 'Entrar' e link 'Esqueci a Senha'."
+
+
+def _analyze(screen_description: str) -> ScreenAnalysis:
+    return ScreenAnalysis(screen_description)
+
+
+def _generate(
+    screen_analysis: ScreenAnalysis,
+    user_intent: str,
+    output_format: str = OutputFormat.PLAIN,
+    single_scenario: bool = False
+) -> str:
+    if single_scenario:
+        return ScenarioGenerator(screen_analysis).generate_scenario(user_intent, output_format)
+    return FeatureGenerator(screen_analysis).render(user_intent, output_format)
+
+
+def _generate_feature(screen_analysis: ScreenAnalysis, user_intent: str) -> str:
+    return FeatureGenerator(screen_analysis).generate(user_intent)
+
+
+def _analyze_and_generate(screen_description: str, user_intent: str) -> Tuple[ScreenAnalysis, str]:
+    analysis = ScreenAnalysis(screen_description)
+    return analysis, FeatureGenerator(analysis).generate(user_intent)
+
+
+def _analyze_and_generate_pair(pair: Tuple[str, str]) -> Tuple[ScreenAnalysis, str]:
+    return _analyze_and_generate(*pair)
+
+
+def _warm_worker() -> int:
+    """Inicializador dos workers: compila os regex e aquece o caminho completo uma vez."""
+    _analyze_and_generate(WARMUP_DESCRIPTION, "aquecer o worker")
+    return os.getpid()
 
 
 # ============================================
@@ -339,39 +967,143 @@ class ScenarioGenerator:
 class MLEngine:
     """Motor de Machine Learning para análise e geração de cenários."""
     
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        self.mode = ExecutorMode(mode or os.environ.get("NEBULA_ML_EXECUTOR", ExecutorMode.INLINE.value))
+        self.max_workers = max_workers or int(os.environ.get("NEBULA_ML_WORKERS", 0)) or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+    
+    # ============================================
+    # EXECUTOR (INLINE, THREADS OU PROCESSOS)
+    # ============================================
+    
+    def configure_executor(self, mode: str, max_workers: Optional[int] = None) -> None:
+        """Troca o modo de execução; o pool anterior é encerrado."""
+        self.shutdown()
+        self.mode = ExecutorMode(mode)
+        if max_workers:
+            self.max_workers = max_workers
+    
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == ExecutorMode.INLINE:
+            return None
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.mode == ExecutorMode.PROCESS:
+                        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_worker)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ml-engine")
+        return self._executor
+    
+    def start(self) -> None:
+        """Cria o pool e sobe todos os workers já aquecidos (chamado na inicialização do servidor)."""
+        executor = self._get_executor()
+        if executor is None:
+            _warm_worker()
+            return
+        # Workers de processo só nascem sob demanda; uma tarefa por worker força a criação de todos
+        for future in [executor.submit(_warm_worker) for _ in range(self.max_workers)]:
+            future.result()
+        print(f"✅ Motor ML: pool {self.mode.value} com {self.max_workers} workers aquecidos")
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra o pool (se houver)."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+    
+    def _run(self, fn: Callable, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return fn(*args)
+        return executor.submit(fn, *args).result()
+    
+    async def _run_async(self, fn: Callable, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    
+    # ============================================
+    # API DO MOTOR
+    # ============================================
+    
     def analyze_screen(self, screen_description: str) -> ScreenAnalysis:
         """Analisa uma tela capturada."""
-        return ScreenAnalysis(screen_description)
+        return self._run(_analyze, screen_description)
+    
+    def generate_gherkin(
+        self,
+        screen_analysis: ScreenAnalysis,
+        user_intent: str,
+        output_format: str = OutputFormat.PLAIN,
+        single_scenario: bool = False
+    ) -> str:
+        """
+        Gera o Gherkin da tela (plain, markdown ou json): o arquivo .feature completo, com
+        Scenario Outlines e Examples cobrindo todos os elementos. Com `single_scenario`,
+        gera só o cenário único do caminho principal.
+        """
+        return self._run(_generate, screen_analysis, user_intent, output_format, single_scenario)
     
-    def generate_gherkin(self, screen_analysis: ScreenAnalysis, user_intent: str) -> str:
-        """Gera um cenário Gherkin."""
-        generator = ScenarioGenerator(screen_analysis)
-        return generator.generate_scenario(user_intent)
+    def analyze_and_generate(self, screen_description: str, user_intent: str) -> Tuple[ScreenAnalysis, str]:
+        """Analisa a tela e gera a feature em uma única ida ao worker."""
+        return self._run(_analyze_and_generate, screen_description, user_intent)
+    
+    async def analyze_screen_async(self, screen_description: str) -> ScreenAnalysis:
+        """Versão assíncrona de analyze_screen (não bloqueia o event loop fora do modo inline)."""
+        return await self._run_async(_analyze, screen_description)
+    
+    async def generate_gherkin_async(
+        self,
+        screen_analysis: ScreenAnalysis,
+        user_intent: str,
+        output_format: str = OutputFormat.PLAIN,
+        single_scenario: bool = False
+    ) -> str:
+        """Versão assíncrona de generate_gherkin."""
+        return await self._run_async(_generate, screen_analysis, user_intent, output_format, single_scenario)
+    
+    async def analyze_and_generate_async(self, screen_description: str, user_intent: str) -> Tuple[ScreenAnalysis, str]:
+        """Versão assíncrona de analyze_and_generate."""
+        return await self._run_async(_analyze_and_generate, screen_description, user_intent)
+    
+    def analyze_and_generate_batch(self, pairs: Iterable[Tuple[str, str]], chunksize: int = 16) -> List[Tuple[ScreenAnalysis, str]]:
+        """Processa vários pares (descrição, intenção) distribuindo-os entre os workers."""
+        executor = self._get_executor()
+        if executor is None:
+            return [_analyze_and_generate_pair(pair) for pair in pairs]
+        if self.mode == ExecutorMode.PROCESS:
+            return list(executor.map(_analyze_and_generate_pair, pairs, chunksize=chunksize))
+        return list(executor.map(_analyze_and_generate_pair, pairs))
+    
+    def analyze_screens(self, screen_descriptions: Sequence[str]) -> List[ScreenAnalysis]:
+        """Analisa várias telas de uma vez (classificação de tipo em lote, no processo atual)."""
+        return ScreenAnalysis.batch(list(screen_descriptions))
+    
+    def analyze_html(self, source: Union[str, bytes, Iterable], encoding: str = "utf-8") -> ScreenAnalysis:
+        """
+        Analisa o HTML de uma página (upload ou página salva) com o parser incremental.
+        Roda no processo atual: a página é lida em partes, sem ir inteira para o pool.
+        """
+        return ScreenAnalysis.from_html(source, encoding)
     
     def predict_next_scenarios(self, screen_analysis: ScreenAnalysis) -> List[str]:
         """Prediz possíveis cenários futuros baseado na análise."""
-        scenarios = []
-        
-        # Baseado no tipo de tela, sugerir próximos cenários
-        next_scenarios = {
-            ScreenType.LOGIN: [
-                "Validação de credenciais inválidas",
-                "Recuperação de senha",
-                "Login com dois fatores"
-            ],
-            ScreenType.REGISTRATION: [
-                "Validação de email duplicado",
-                "Validação de senha fraca",
-                "Confirmação de email"
-            ],
-            ScreenType.CHECKOUT: [
-                "Validação de endereço",
-                "Processamento de pagamento",
-                "Confirmação de pedido"
-            ],
-        }
-        
-        return next_scenarios.get(self.screen_analysis.screen_type, [])
+        return list(NEXT_SCENARIOS.get(screen_analysis.screen_type, []))
+    
+    def iter_feature(self, screen_analysis: ScreenAnalysis, user_intent: str) -> Iterator[str]:
+        """
+        Gera o arquivo .feature completo em partes, sob demanda.
+        Roda no processo atual (geradores não atravessam o pool de processos).
+        """
+        return FeatureGenerator(screen_analysis).iter_feature(user_intent)
+    
+    def generate_feature(self, screen_analysis: ScreenAnalysis, user_intent: str) -> str:
+        """Gera o arquivo .feature completo (Scenario Outlines com Examples)."""
+        return self._run(_generate_feature, screen_analysis, user_intent)
 
 
 # ============================================
@@ -397,5 +1129,5 @@ if __name__ == "__main__":
     
     # Gerar Gherkin
     gherkin = ml_engine.generate_gherkin(analysis, "fazer login com sucesso")
-    print(f"Cenário Gherkin Gerado:\n{gherkin}")
+    print(f"Feature Gherkin Gerada:\n{gherkin}")
 
@@ -0,0 +1,233 @@
+"""
+Módulo de Exportação de Relatórios (cenários, análises de tela e tarefas)
+Nebula Agent v6.0
+"""
+
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    from .text_index import fold_text
+except ImportError:
+    from text_index import fold_text
+
+# ============================================
+# FORMATOS
+# ============================================
+
+# formato -> (media type, extensão do arquivo); o Starlette acrescenta o charset aos tipos text/*
+EXPORT_FORMATS = {
+    "zip": ("application/zip", "zip"),
+    "csv": ("text/csv", "csv"),
+    "json": ("application/json", "json"),
+}
+
+# Os pedaços pequenos (um cenário, uma linha de CSV) são agrupados até este tamanho antes de sair
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+CSV_COLUMNS = ["record_type", "id", "created_at", "category", "status", "title", "content"]
+
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(text: str, max_length: int = 48) -> str:
+    """"Cadastro de usuário" -> "cadastro-de-usuario" (nome de arquivo seguro)."""
+    return SLUG_RE.sub("-", fold_text(text))[:max_length].strip("-") or "cenario"
+
+
+# ============================================
+# CONTEÚDO DO RELATÓRIO
+# ============================================
+
+class ReportSnapshot:
+    """
+    O que entra no relatório de um usuário: cenários gerados, análises de tela e as
+    tarefas do board. Guarda só as listas de referências (os objetos já estão em
+    memória); cada registro é serializado quando o stream chega nele.
+    """
+
+    def __init__(self, user_id: str, scenarios: List, screens: List[Dict], tasks: List, board_id: Optional[str] = None):
+        self.user_id = user_id
+        self.board_id = board_id
+        self.scenarios = scenarios
+        self.screens = screens
+        self.tasks = tasks
+        self.generated_at = datetime.now().isoformat()
+
+    @classmethod
+    def capture(cls, user_id: str, memory, board=None) -> "ReportSnapshot":
+        """Cópia rasa da memória do agente do usuário e do board (opcional)."""
+        return cls(
+            user_id,
+            memory.scenarios.entries(),
+            list(memory.analyzed_screens),
+            list(board.tasks.values()) if board is not None else [],
+            board.board_id if board is not None else None
+        )
+
+    def summary(self) -> Dict:
+        return {
+            "user_id": self.user_id,
+            "board_id": self.board_id,
+            "generated_at": self.generated_at,
+            "scenarios": len(self.scenarios),
+            "screen_analyses": len(self.screens),
+            "tasks": len(self.tasks)
+        }
+
+    def screen_records(self) -> Iterator[Dict]:
+        # Análises de tela não têm id: a posição no histórico identifica cada uma
+        for number, analysis in enumerate(self.screens, 1):
+            yield {"id": number, **analysis}
+
+
+# ============================================
+# ESCRITORES EM STREAMING
+# ============================================
+
+class _ChunkSink(io.RawIOBase):
+    """Arquivo só de escrita que acumula os bytes até o gerador retirá-los."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        self.size = 0
+        return data
+
+
+def _coalesce(pieces: Iterable[bytes], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Agrupa pedaços pequenos em blocos de ~chunk_size."""
+    buffer: List[bytes] = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _json_pieces(snapshot: ReportSnapshot) -> Iterator[bytes]:
+    # Abre o objeto com os campos do resumo (sem a chave final) e acrescenta as listas
+    yield json.dumps(snapshot.summary(), ensure_ascii=False)[:-1].encode("utf-8")
+    sections = (
+        ("scenarios", (entry.to_dict() for entry in snapshot.scenarios)),
+        ("screen_analyses", snapshot.screen_records()),
+        ("tasks", (task.to_dict() for task in snapshot.tasks)),
+    )
+    for name, records in sections:
+        yield f', "{name}": ['.encode("utf-8")
+        separator = ""
+        for record in records:
+            yield (separator + json.dumps(record, ensure_ascii=False)).encode("utf-8")
+            separator = ", "
+        yield b"]"
+    yield b"}"
+
+
+def iter_json(snapshot: ReportSnapshot) -> Iterator[bytes]:
+    """O relatório como um único documento JSON, escrito registro a registro."""
+    return _coalesce(_json_pieces(snapshot))
+
+
+def _csv_rows(snapshot: ReportSnapshot) -> Iterator[List]:
+    for entry in snapshot.scenarios:
+        yield ["scenario", entry.id, entry.created_at, entry.screen_type, entry.source, entry.intent, entry.gherkin]
+    for record in snapshot.screen_records():
+        yield [
+            "screen_analysis", record["id"], "", record.get("screen_type", ""), record.get("confidence", ""),
+            record.get("description", ""), json.dumps(record.get("elements", []), ensure_ascii=False)
+        ]
+    for task in snapshot.tasks:
+        yield [
+            "task", task.id, task.created_at.isoformat(), task.priority.value, task.status.value,
+            task.title, task.description
+        ]
+
+
+def iter_csv(snapshot: ReportSnapshot) -> Iterator[bytes]:
+    """O relatório em CSV: uma linha por registro, com o tipo na primeira coluna."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def pieces() -> Iterator[bytes]:
+        # BOM: o Excel em pt-BR abre o arquivo como UTF-8
+        writer.writerow(CSV_COLUMNS)
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+        for row in _csv_rows(snapshot):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue().encode("utf-8")
+
+    return _coalesce(pieces())
+
+
+def iter_zip(snapshot: ReportSnapshot) -> Iterator[bytes]:
+    """
+    Um arquivo .feature por cenário, mais screen_analyses.jsonl, tasks.jsonl e
+    report.json (resumo). O zip é escrito num destino sem seek (descritores de dados
+    após cada arquivo), então cada parte sai assim que é comprimida. Só o diretório
+    central (os ZipInfo, menos de 1 KB por arquivo) fica em memória até o fim; o número
+    de cenários já é limitado pelo orçamento da memória do usuário.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for number, entry in enumerate(snapshot.scenarios, 1):
+            name = f"features/{number:05d}-{entry.screen_type}-{slugify(entry.intent)}.feature"
+            archive.writestr(name, entry.gherkin.rstrip("\n") + "\n")
+            if sink.size >= EXPORT_CHUNK_SIZE:
+                yield sink.take()
+
+        for name, records in (
+            ("screen_analyses.jsonl", snapshot.screen_records()),
+            ("tasks.jsonl", (task.to_dict() for task in snapshot.tasks)),
+        ):
+            with archive.open(name, "w") as member:
+                for record in records:
+                    member.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                    if sink.size >= EXPORT_CHUNK_SIZE:
+                        yield sink.take()
+
+        archive.writestr("report.json", json.dumps(snapshot.summary(), ensure_ascii=False, indent=2))
+    # Ao fechar, o zip escreve o diretório central
+    yield sink.take()
+
+
+EXPORT_WRITERS = {
+    "zip": iter_zip,
+    "csv": iter_csv,
+    "json": iter_json,
+}
+
+
+def iter_report(snapshot: ReportSnapshot, export_format: str) -> Iterator[bytes]:
+    """Blocos do relatório no formato pedido (zip, csv ou json)."""
+    if export_format not in EXPORT_WRITERS:
+        raise ValueError(f"Formato de exportação inválido: {export_format}")
+    return EXPORT_WRITERS[export_format](snapshot)
+
+
+def export_filename(snapshot: ReportSnapshot, export_format: str) -> str:
+    stamp = snapshot.generated_at[:19].replace(":", "").replace("-", "").replace("T", "-")
+    return f"nebula-report-{slugify(snapshot.user_id, 32)}-{stamp}.{EXPORT_FORMATS[export_format][1]}"
@@ -0,0 +1,251 @@
+"""
+Módulo de Armazenamento de Cenários com Índice de Similaridade
+Nebula Agent v6.0
+"""
+
+import heapq
+import math
+import re
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+try:
+    from .text_index import fold_text
+except ImportError:
+    from text_index import fold_text
+
+# ============================================
+# TOKENIZAÇÃO
+# ============================================
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Palavras sem valor para similaridade (já sem acento), incluindo as palavras-chave do Gherkin.
+# "nao" e "sem" ficam de fora: invertem o sentido do cenário
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de da do das dos e em no na nos nas por pelo pela para com que
+se ao aos eu ele ela eles elas meu minha seu sua este esta esse essa isso isto ja
+ou como mais mas quando entao dado dada dados dadas cenario cenarios funcionalidade esquema
+contexto exemplos exemplo quero gerar gere crie criar gherkin teste testes
+the and or of to in on with given when then but feature scenario outline background examples
+""".split())
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Conjunto de termos do texto, sem acentos e sem stopwords (strings internadas)."""
+    return frozenset(
+        sys.intern(token) for token in TOKEN_RE.findall(fold_text(text))
+        if len(token) > 1 and token not in STOPWORDS
+    )
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+# ============================================
+# ARMAZENAMENTO DE CENÁRIOS
+# ============================================
+
+# Objeto, slots e entrada no OrderedDict de cada cenário (estimativa para o orçamento de bytes)
+ENTRY_OVERHEAD = 256
+
+
+class ScenarioEntry:
+    """Cenário gerado, com os conjuntos de termos usados na busca."""
+
+    __slots__ = ("id", "intent", "screen_type", "gherkin", "source", "created_at", "intent_tokens", "tokens", "hits", "size")
+
+    def __init__(
+        self,
+        entry_id: int,
+        intent: str,
+        screen_type: str,
+        gherkin: str,
+        source: str,
+        created_at: Optional[str] = None
+    ):
+        self.id = entry_id
+        self.intent = intent
+        self.screen_type = screen_type
+        self.gherkin = gherkin
+        self.source = source
+        self.created_at = created_at or datetime.now().isoformat()
+        self.intent_tokens = tokenize(intent)
+        self.tokens = self.intent_tokens | tokenize(gherkin)
+        self.hits = 0
+        # Bytes aproximados em memória: textos, conjuntos de termos e posições no índice
+        # (as strings dos termos são internadas e compartilhadas)
+        self.size = (
+            ENTRY_OVERHEAD + sys.getsizeof(intent) + sys.getsizeof(gherkin)
+            + sys.getsizeof(self.intent_tokens) + sys.getsizeof(self.tokens) + 8 * len(self.tokens)
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "intent": self.intent,
+            "screen_type": self.screen_type,
+            "gherkin": self.gherkin,
+            "source": self.source,
+            "created_at": self.created_at,
+            "reuses": self.hits,
+        }
+
+
+class ScenarioStore:
+    """
+    Cenários gerados com um índice invertido (termo -> ids, em ordem de inserção)
+    sobre a intenção e os passos do Gherkin, atualizado a cada inserção.
+
+    A consulta percorre as listas dos termos mais raros primeiro e para ao visitar
+    `postings_budget` ids, então o custo não cresce com o número de cenários: quase
+    duplicatas compartilham justamente os termos raros, e os termos comuns (passos
+    genéricos) pesam pouco no IDF. Os candidatos são ordenados pelo Jaccard ponderado
+    por IDF. Limitado a `max_entries`; os mais antigos saem primeiro. `bytes` acompanha
+    o tamanho aproximado dos cenários guardados.
+    """
+
+    def __init__(self, max_entries: int = 100_000, reuse_threshold: float = 0.85, postings_budget: int = 1024):
+        self.max_entries = max_entries
+        self.reuse_threshold = reuse_threshold
+        self.postings_budget = postings_budget
+        self._entries: "OrderedDict[int, ScenarioEntry]" = OrderedDict()
+        self._postings: Dict[str, List[int]] = {}
+        self._next_id = 1
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        intent: str,
+        screen_type: str,
+        gherkin: str,
+        source: str,
+        created_at: Optional[str] = None
+    ) -> ScenarioEntry:
+        """Guarda um cenário gerado e o indexa."""
+        entry = ScenarioEntry(0, intent, screen_type, gherkin, source, created_at)
+        with self._lock:
+            entry.id = self._next_id
+            self._next_id += 1
+            self._entries[entry.id] = entry
+            self.bytes += entry.size
+            postings = self._postings
+            for token in entry.tokens:
+                ids = postings.get(token)
+                if ids is None:
+                    postings[token] = [entry.id]
+                else:
+                    ids.append(entry.id)
+
+            while len(self._entries) > self.max_entries:
+                self._pop_oldest()
+            return entry
+
+    def _pop_oldest(self) -> ScenarioEntry:
+        # Chamado com o lock
+        _, oldest = self._entries.popitem(last=False)
+        self.bytes -= oldest.size
+        postings = self._postings
+        # Remoção em ordem de inserção: o id mais antigo está no início de cada lista
+        for token in oldest.tokens:
+            ids = postings[token]
+            if len(ids) == 1:
+                del postings[token]
+            else:
+                del ids[0]
+        return oldest
+
+    def evict_oldest(self) -> Optional[ScenarioEntry]:
+        """Remove e retorna o cenário mais antigo (None se vazio)."""
+        with self._lock:
+            return self._pop_oldest() if self._entries else None
+
+    def _idf(self, token: str, cache: Dict[str, float]) -> float:
+        weight = cache.get(token)
+        if weight is None:
+            weight = cache[token] = math.log(1.0 + len(self._entries) / (1 + len(self._postings.get(token, ()))))
+        return weight
+
+    def _candidates(self, tokens: FrozenSet[str]) -> Dict[int, float]:
+        # Chamado com o lock: massa de IDF que cada candidato compartilha com a consulta
+        postings = self._postings
+        lists = sorted((postings[t] for t in tokens if t in postings), key=len)
+        scores: Dict[int, float] = {}
+        budget = self.postings_budget
+        for ids in lists:
+            if budget <= 0:
+                break
+            weight = math.log(1.0 + len(self._entries) / (1 + len(ids)))
+            # Lista longa demais para o orçamento: só os cenários mais recentes
+            recent = ids if len(ids) <= budget else islice(reversed(ids), budget)
+            for entry_id in recent:
+                scores[entry_id] = scores.get(entry_id, 0.0) + weight
+            budget -= len(ids)
+        return scores
+
+    def _weighted_jaccard(self, tokens: FrozenSet[str], other: FrozenSet[str], cache: Dict[str, float]) -> float:
+        inter = sum(self._idf(t, cache) for t in tokens & other)
+        union = inter + sum(self._idf(t, cache) for t in tokens ^ other)
+        return inter / union if union else 0.0
+
+    def find_reusable(self, intent: str, screen_type: str, sources: Iterable[str] = ("llm",)) -> Optional[ScenarioEntry]:
+        """
+        Cenário anterior com a mesma tela e intenção quase idêntica (Jaccard dos termos
+        >= reuse_threshold), gerado por uma das `sources`. None se não houver.
+        """
+        tokens = tokenize(intent)
+        if not tokens:
+            return None
+        best, best_score = None, self.reuse_threshold
+        with self._lock:
+            scores = self._candidates(tokens)
+            # Os que compartilham mais IDF primeiro; poucos precisam da comparação exata
+            for entry_id in heapq.nlargest(32, scores, key=scores.get):
+                entry = self._entries[entry_id]
+                if entry.screen_type != screen_type or entry.source not in sources:
+                    continue
+                score = jaccard(tokens, entry.intent_tokens)
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is not None:
+                best.hits += 1
+        return best
+
+    def similar(self, text: str, limit: int = 5, screen_type: Optional[str] = None) -> List[Tuple[ScenarioEntry, float]]:
+        """Cenários mais parecidos com o texto (intenção ou Gherkin), com o Jaccard ponderado por IDF."""
+        tokens = tokenize(text)
+        with self._lock:
+            scores = self._candidates(tokens)
+            # Com filtro de tela, mais candidatos são descartados: pega uma janela maior
+            ranked = heapq.nlargest(limit * (20 if screen_type else 4), scores, key=scores.get)
+            scored, cache = [], {}
+            for entry_id in ranked:
+                entry = self._entries[entry_id]
+                if screen_type and entry.screen_type != screen_type:
+                    continue
+                scored.append((max(
+                    self._weighted_jaccard(tokens, entry.intent_tokens, cache),
+                    self._weighted_jaccard(tokens, entry.tokens, cache)
+                ), entry_id, entry))
+        scored.sort(reverse=True)
+        return [(entry, round(score, 3)) for score, _, entry in scored[:limit]]
+
+    def get(self, entry_id: int) -> Optional[ScenarioEntry]:
+        return self._entries.get(entry_id)
+
+    def entries(self) -> List[ScenarioEntry]:
+        """Cópia dos cenários guardados, do mais antigo ao mais recente."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
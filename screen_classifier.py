@@ -0,0 +1,510 @@
+"""
+Módulo de Classificação do Tipo de Tela (n-gramas com hashing + modelo linear)
+Nebula Agent v6.0
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .text_index import fold_text
+except ImportError:
+    from text_index import fold_text
+
+# ============================================
+# FEATURES: N-GRAMAS DE CARACTERES COM HASHING
+# ============================================
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screen_classifier.npz")
+
+FEATURE_BITS = 16
+NGRAM_SIZES = (3, 4, 5)
+SEPARATOR = "\x00"
+MAX_CACHED_WORDS = 50000
+_PRIME = np.uint32(16777619)
+_GOLDEN = np.uint32(2654435769)
+# Depois de fold_text o texto é ASCII: letras e dígitos ficam, o resto vira espaço
+_WORD_BYTES = b"abcdefghijklmnopqrstuvwxyz0123456789" + SEPARATOR.encode("ascii")
+_TOKEN_TABLE = bytes(c if c in _WORD_BYTES else 0x20 for c in range(256))
+
+
+def _batch_tokens(texts: Sequence[str]) -> List[str]:
+    """
+    Palavras do lote (sem acento, minúsculas) numa única lista, com um separador
+    abrindo cada texto. Normalizar e separar o lote de uma vez (translate + split, em
+    C) é bem mais barato que uma regex por texto.
+    """
+    if not texts:
+        return []
+    joined = fold_text(f" {SEPARATOR} " + f" {SEPARATOR} ".join(texts))
+    if joined.count(SEPARATOR) != len(texts):
+        # Algum texto já continha o separador
+        return _batch_tokens([text.replace(SEPARATOR, " ") for text in texts])
+    return joined.encode("ascii").translate(_TOKEN_TABLE).decode("ascii").split()
+
+
+def tokenize_batch(texts: Sequence[str]) -> List[List[str]]:
+    """Palavras de cada texto, na ordem recebida."""
+    tokenized: List[List[str]] = []
+    for token in _batch_tokens(texts):
+        if token == SEPARATOR:
+            tokenized.append([])
+        else:
+            tokenized[-1].append(token)
+    return tokenized
+
+
+def word_ngrams(words: Sequence[str], bits: int = FEATURE_BITS) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    N-gramas de caracteres (3 a 5) de cada palavra, com as bordas marcadas por espaço
+    (" tela "), em 2**bits posições. O hashing é vetorizado sobre as palavras
+    concatenadas e é estável entre processos (não usa hash() do Python). Retorna, por
+    tamanho de n-grama, as colunas em ordem de palavra e a quantidade por palavra.
+    """
+    width = max(NGRAM_SIZES)
+    prepared = [f" {word} ".ljust(width).encode("ascii") for word in words]
+    lengths = np.fromiter((len(p) for p in prepared), dtype=np.int64, count=len(prepared))
+    data = np.frombuffer(b"".join(prepared), dtype=np.uint8).astype(np.uint32)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    blocks = []
+    for n in NGRAM_SIZES:
+        count = len(data) - n + 1
+        # Hash polinomial com overflow em uint32; n entra na semente para separar os tamanhos
+        h = np.full(count, n, dtype=np.uint32)
+        for k in range(n):
+            h = h * _PRIME + data[k:k + count]
+        # Só os n-gramas que não cruzam a fronteira entre duas palavras
+        per_word = lengths - n + 1
+        keep = np.ones(count, dtype=bool)
+        keep[((starts + per_word)[:-1, None] + np.arange(n - 1)).ravel()] = False
+        blocks.append((((h[keep] * _GOLDEN) >> np.uint32(32 - bits)).astype(np.int64), per_word))
+    return blocks
+
+
+def featurize(texts: Sequence[str], bits: int = FEATURE_BITS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Matriz esparsa (linha, coluna, valor) dos n-gramas de cada texto (repetições somam
+    no bincount), com valor 1/sqrt(total de n-gramas do texto).
+    """
+    tokens = tokenize_batch(texts)
+    vocabulary = {word: i for i, word in enumerate(dict.fromkeys(w for words in tokens for w in words))}
+    per_word_columns: List[List[np.ndarray]] = [[] for _ in vocabulary]
+    for columns, per_word in word_ngrams(list(vocabulary), bits) if vocabulary else ():
+        for i, chunk in enumerate(np.split(columns, np.cumsum(per_word)[:-1])):
+            per_word_columns[i].append(chunk)
+    word_columns = [np.concatenate(chunks) for chunks in per_word_columns]
+
+    rows, cols = [], []
+    for text_id, words in enumerate(tokens):
+        for word in words:
+            columns = word_columns[vocabulary[word]]
+            cols.append(columns)
+            rows.append(np.full(len(columns), text_id, dtype=np.int64))
+    if not cols:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    totals = np.bincount(rows, minlength=len(texts))
+    scale = (1.0 / np.sqrt(np.maximum(totals, 1))).astype(np.float32)
+    return rows, cols, scale[rows]
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+# ============================================
+# MODELO LINEAR (SOFTMAX) COM TEMPERATURA CALIBRADA
+# ============================================
+
+class ScreenClassifier:
+    """
+    Regressão logística multinomial sobre n-gramas com hashing. Os pesos ficam num
+    array NumPy (2**bits x classes) salvo em .npz, carregado em milissegundos. A
+    confiança é a probabilidade da classe prevista após temperature scaling,
+    calibrada num conjunto separado do treino.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        classes: List[str],
+        temperature: float = 1.0,
+        bits: int = FEATURE_BITS,
+        max_cached_words: int = MAX_CACHED_WORDS
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.classes = list(classes)
+        self.temperature = temperature
+        self.bits = bits
+        self.max_cached_words = max_cached_words
+        self._lock = threading.Lock()
+        self._reset_word_cache()
+
+    # ============================================
+    # PERSISTÊNCIA
+    # ============================================
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH, max_cached_words: int = MAX_CACHED_WORDS) -> "ScreenClassifier":
+        """Carrega o modelo (.npz sem compressão; pesos em float16 no disco)."""
+        with np.load(path) as data:
+            return cls(
+                data["weights"].astype(np.float32),
+                data["bias"].astype(np.float32),
+                [str(c) for c in data["classes"]],
+                float(data["temperature"]),
+                int(data["bits"]),
+                max_cached_words,
+            )
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        np.savez(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias.astype(np.float32),
+            classes=np.array(self.classes),
+            temperature=np.float32(self.temperature),
+            bits=np.int32(self.bits),
+        )
+
+    # ============================================
+    # INFERÊNCIA EM LOTE
+    # ============================================
+
+    def _reset_word_cache(self) -> None:
+        # O separador de textos é a linha 0: vetor nulo, nenhum n-grama
+        self._word_index: Dict[str, int] = {SEPARATOR: 0}
+        self._word_vectors = np.zeros((1, len(self.classes)), dtype=np.float32)
+        self._word_counts = np.zeros(1, dtype=np.float32)
+
+    def _cache_words(self, words: List[str]) -> None:
+        # Chamado com o lock: soma dos pesos dos n-gramas de cada palavra nova
+        vectors = np.zeros((len(words), len(self.classes)), dtype=np.float32)
+        counts = np.zeros(len(words), dtype=np.float32)
+        for columns, per_word in word_ngrams(words, self.bits):
+            vectors += np.add.reduceat(self.weights[columns], np.concatenate(([0], np.cumsum(per_word)[:-1])), axis=0)
+            counts += per_word
+        start = len(self._word_index)
+        self._word_index.update((word, start + i) for i, word in enumerate(words))
+        self._word_vectors = np.concatenate([self._word_vectors, vectors])
+        self._word_counts = np.concatenate([self._word_counts, counts])
+
+    def logits(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Logits do lote. O modelo é linear e os n-gramas não cruzam palavras, então o
+        vetor de cada palavra (soma dos pesos dos seus n-gramas) fica em cache e cada
+        texto custa uma soma de poucas linhas. O lote é normalizado e tokenizado de uma
+        vez.
+        """
+        if not texts:
+            return np.zeros((0, len(self.classes)), dtype=np.float32)
+        tokens = _batch_tokens(texts)
+        with self._lock:
+            missing = set(tokens).difference(self._word_index)
+            if len(self._word_index) + len(missing) > self.max_cached_words:
+                # Cache cheio: recomeça, e todas as palavras do lote passam a faltar
+                self._reset_word_cache()
+                missing = set(tokens).difference(self._word_index)
+            if missing:
+                self._cache_words(sorted(missing))
+            index = self._word_index
+            ids = np.fromiter(map(index.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+            vectors, counts = self._word_vectors[ids], self._word_counts[ids]
+
+        offsets = np.flatnonzero(ids == 0)
+        scale = 1.0 / np.sqrt(np.maximum(np.add.reduceat(counts, offsets), 1.0))
+        return np.add.reduceat(vectors, offsets, axis=0) * scale[:, None] + self.bias
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilidades calibradas (textos x classes)."""
+        return _softmax(self.logits(texts) / self.temperature)
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """(classe, confiança) de cada texto, numa única passada vetorizada."""
+        if not texts:
+            return []
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return [(self.classes[i], float(proba[row, i])) for row, i in enumerate(best)]
+
+    def predict_one(self, text: str) -> Tuple[str, float]:
+        return self.predict([text])[0]
+
+
+# ============================================
+# TREINO
+# ============================================
+
+def train_classifier(
+    texts: Sequence[str],
+    labels: Sequence[str],
+    classes: Optional[List[str]] = None,
+    bits: int = FEATURE_BITS,
+    epochs: int = 300,
+    learning_rate: float = 0.05,
+    l2: float = 1e-5,
+    calibration_split: float = 0.2,
+    seed: int = 0
+) -> Tuple[ScreenClassifier, Dict]:
+    """
+    Treina o modelo com Adam (gradiente completo) e calibra a temperatura num
+    conjunto separado. Retorna o classificador e as métricas da calibração.
+    """
+    classes = classes or sorted(set(labels))
+    class_index = {c: i for i, c in enumerate(classes)}
+    order = np.random.RandomState(seed).permutation(len(texts))
+    split = int(len(texts) * (1 - calibration_split))
+    train_ids, calib_ids = order[:split], order[split:]
+
+    rows, cols, values = featurize([texts[i] for i in train_ids], bits)
+    y = np.array([class_index[labels[i]] for i in train_ids])
+    n, dim, k = len(train_ids), 1 << bits, len(classes)
+    targets = np.zeros((n, k), dtype=np.float32)
+    targets[np.arange(n), y] = 1.0
+
+    weights = np.zeros((dim, k), dtype=np.float32)
+    bias = np.zeros(k, dtype=np.float32)
+    model = ScreenClassifier(weights, bias, classes, 1.0, bits)
+    moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for step in range(1, epochs + 1):
+        logits = np.empty((n, k), dtype=np.float32)
+        contributions = weights[cols] * values[:, None]
+        for c in range(k):
+            logits[:, c] = np.bincount(rows, weights=contributions[:, c], minlength=n)
+        delta = (_softmax(logits + bias) - targets) / n
+        grad_w = np.empty_like(weights)
+        for c in range(k):
+            grad_w[:, c] = np.bincount(cols, weights=values * delta[rows, c], minlength=dim)
+        grad_w += l2 * weights
+        grad_b = delta.sum(axis=0)
+
+        for param, grad, m, v in ((weights, grad_w, moments[0], moments[1]), (bias, grad_b, moments[2], moments[3])):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+    # Temperature scaling: a temperatura que minimiza a log-loss no conjunto de calibração
+    calib_texts = [texts[i] for i in calib_ids]
+    calib_y = np.array([class_index[labels[i]] for i in calib_ids])
+    metrics: Dict = {"train": n, "calibration": len(calib_ids)}
+    if len(calib_ids):
+        calib_logits = model.logits(calib_texts)
+        best = (float("inf"), 1.0)
+        for temperature in np.arange(0.05, 5.01, 0.05):
+            proba = _softmax(calib_logits / temperature)
+            nll = float(-np.log(proba[np.arange(len(calib_y)), calib_y] + 1e-12).mean())
+            best = min(best, (nll, float(temperature)))
+        model.temperature = round(best[1], 2)
+        proba = _softmax(calib_logits / model.temperature)
+        metrics.update({
+            "temperature": model.temperature,
+            "calibration_nll": round(best[0], 4),
+            "calibration_accuracy": round(float((proba.argmax(axis=1) == calib_y).mean()), 4),
+            "calibration_ece": round(expected_calibration_error(proba, calib_y), 4),
+        })
+    return model, metrics
+
+
+def expected_calibration_error(proba: np.ndarray, y: np.ndarray, bins: int = 10) -> float:
+    """ECE: diferença média entre confiança e acurácia, por faixa de confiança."""
+    confidence = proba.max(axis=1)
+    correct = proba.argmax(axis=1) == y
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    ece = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            ece += in_bin.mean() * abs(correct[in_bin].mean() - confidence[in_bin].mean())
+    return float(ece)
+
+
+# ============================================
+# CORPUS ROTULADO (SINTÉTICO)
+# ============================================
+
+# Vocabulário por tipo de tela: títulos e elementos típicos
+CORPUS_VOCABULARY: Dict[str, Dict[str, List[str]]] = {
+    "login": {
+        "titles": ["Login", "Entrar", "Acesso", "Autenticação", "Acesso ao Sistema", "Área do Cliente", "Acesso Restrito"],
+        "parts": [
+            "campos 'Usuário' e 'Senha'", "campo 'Email'", "campo 'Senha'", "botão 'Entrar'", "botão 'Acessar'",
+            "link 'Esqueci a Senha'", "opção 'Lembrar-me'", "botão 'Entrar com Google'", "captcha",
+            "link 'Criar conta'", "campo 'CPF' para acesso", "código de verificação em duas etapas",
+        ],
+    },
+    "registration": {
+        "titles": ["Cadastro", "Cadastro de Novo Usuário", "Criar Conta", "Registro", "Inscrição", "Cadastre-se"],
+        "parts": [
+            "campos 'Nome', 'Email' e 'CPF'", "campo 'Confirmar Senha'", "botão 'Criar Conta'", "botão 'Cadastrar'",
+            "checkbox 'Aceito os termos de uso'", "campo 'Data de Nascimento'", "campo 'Telefone'", "botão 'Registrar'",
+            "campo 'Senha' com requisitos de segurança", "link 'Já tenho conta'", "seleção de plano",
+        ],
+    },
+    "checkout": {
+        "titles": ["Checkout", "Pagamento", "Finalizar Compra", "Carrinho", "Resumo do Pedido", "Confirmação de Compra"],
+        "parts": [
+            "formulário de endereço de entrega", "seleção de método de pagamento (Cartão, Pix, Boleto)", "campo 'Cupom de desconto'",
+            "botão 'Finalizar Compra'", "resumo do pedido com subtotal e frete", "campos do cartão de crédito",
+            "parcelamento", "botão 'Pagar'", "cálculo de frete por CEP", "lista de itens do carrinho", "total a pagar",
+        ],
+    },
+    "dashboard": {
+        "titles": ["Dashboard", "Painel", "Início", "Home", "Visão Geral", "Painel Administrativo"],
+        "parts": [
+            "gráficos de vendas", "cards de indicadores", "menu lateral de navegação", "métricas do mês",
+            "gráfico de pizza", "atalhos rápidos", "widgets de resumo", "últimas atividades", "KPIs",
+            "filtro de período", "notificações recentes",
+        ],
+    },
+    "form": {
+        "titles": ["Formulário", "Formulário de Contato", "Configurações", "Perfil de Usuário", "Editar Dados", "Solicitação"],
+        "parts": [
+            "campos editáveis", "botão 'Enviar'", "botão 'Salvar'", "campo 'Mensagem'", "dropdown 'Assunto'",
+            "campos 'Nome' e 'Email'", "toggles de preferências", "botão 'Salvar Alterações'", "upload de anexo",
+            "campo 'Observações'", "abas de configuração", "foto de perfil",
+        ],
+    },
+    "list": {
+        "titles": ["Listagem", "Lista de Produtos", "Resultados da Busca", "Clientes", "Pedidos", "Catálogo"],
+        "parts": [
+            "tabela de itens", "filtros", "campo de busca", "paginação", "ordenação por coluna",
+            "botões de ação (editar, deletar)", "seleção em lote", "contador de resultados", "exportar para CSV",
+            "colunas 'Nome', 'Status' e 'Data'", "lista de resultados",
+        ],
+    },
+    "detail": {
+        "titles": ["Detalhes do Produto", "Detalhes do Pedido", "Visualizar Cliente", "Ficha do Item", "Detalhe"],
+        "parts": [
+            "informações completas do item", "galeria de imagens", "especificações técnicas", "histórico de alterações",
+            "botão 'Editar'", "botão 'Voltar para a lista'", "avaliações", "dados do responsável", "status atual",
+            "abas de detalhes", "linha do tempo",
+        ],
+    },
+    "modal": {
+        "titles": ["Modal de Confirmação", "Diálogo", "Popup", "Janela de Aviso", "Modal"],
+        "parts": [
+            "sobreposição escurecida", "botões 'Confirmar' e 'Cancelar'", "ícone 'X' para fechar", "mensagem 'Tem certeza?'",
+            "janela centralizada", "fundo bloqueado", "pergunta de confirmação", "botão 'Fechar'",
+        ],
+    },
+    "error": {
+        "titles": ["Erro", "Página não encontrada", "Erro 404", "Erro 500", "Falha", "Acesso Negado"],
+        "parts": [
+            "mensagem de erro", "código do erro", "botão 'Tentar novamente'", "ilustração de falha",
+            "link 'Voltar ao início'", "texto 'Algo deu errado'", "detalhes técnicos do problema", "aviso de sessão expirada",
+        ],
+    },
+    "success": {
+        "titles": ["Sucesso", "Pedido Confirmado", "Cadastro Concluído", "Pagamento Aprovado", "Operação Realizada"],
+        "parts": [
+            "mensagem de sucesso", "ícone de check verde", "número do protocolo", "botão 'Continuar'",
+            "texto 'Operação realizada com sucesso'", "resumo da operação concluída", "link 'Ver comprovante'",
+        ],
+    },
+    "unknown": {
+        "titles": ["Genérica", "Sem título", "Página", "Conteúdo", "Tela"],
+        "parts": [
+            "texto institucional", "banner", "rodapé", "imagem", "parágrafos de conteúdo", "vídeo incorporado",
+            "lista de links", "seção 'Sobre nós'",
+        ],
+    },
+}
+# Elementos comuns a qualquer tela; incluem palavras que enganavam a busca por palavras-chave
+SHARED_PARTS = [
+    "menu superior", "ícone do usuário no topo", "campo de busca no cabeçalho", "link 'Ajuda'", "rodapé com contato",
+    "botão 'Voltar'", "carrinho no cabeçalho", "aviso de cookies", "logo da empresa", "botão 'Enviar feedback'",
+    "link 'Sair'", "seletor de idioma",
+]
+PREFIXES = ["Tela de", "Página de", "Tela", "Screen de", "Página"]
+
+
+def synthetic_corpus(per_class: int = 300, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """
+    Descrições rotuladas geradas a partir do vocabulário de cada tipo de tela. Parte
+    delas não tem título e algumas trazem um elemento de outro tipo, para o modelo
+    não depender só do título nem de uma única palavra.
+    """
+    rng = random.Random(seed)
+    labels_in_order = list(CORPUS_VOCABULARY)
+    texts, labels = [], []
+    for label, vocabulary in CORPUS_VOCABULARY.items():
+        for _ in range(per_class):
+            parts = rng.sample(vocabulary["parts"], rng.randint(1, 3))
+            parts += rng.sample(SHARED_PARTS, rng.randint(0, 3))
+            if rng.random() < 0.15:
+                other = CORPUS_VOCABULARY[rng.choice(labels_in_order)]
+                parts.append(rng.choice(other["parts"]))
+            rng.shuffle(parts)
+            head = f"{rng.choice(PREFIXES)} {rng.choice(vocabulary['titles'])}" if rng.random() < 0.65 else "Tela"
+            body = f"{', '.join(parts[:-1])} e {parts[-1]}" if len(parts) > 1 else parts[0]
+            text = f"{head} com {body}."
+            texts.append(text)
+            labels.append(label)
+    return texts, labels
+
+
+def load_labeled(path: str) -> Tuple[List[str], List[str]]:
+    """Lê descrições rotuladas de um JSONL com {"text": ..., "label": ...} por linha."""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                texts.append(record["text"])
+                labels.append(record["label"])
+    return texts, labels
+
+
+# ============================================
+# INSTÂNCIA GLOBAL
+# ============================================
+
+def load_default_classifier(path: str = MODEL_PATH) -> Optional[ScreenClassifier]:
+    """Modelo distribuído com o código; None (com aviso) se o arquivo faltar ou for inválido."""
+    try:
+        return ScreenClassifier.load(path)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"⚠️ Classificador de tela indisponível ({e}). Usando a busca por palavras-chave.")
+        return None
+
+
+screen_classifier = load_default_classifier()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina o classificador de tipo de tela")
+    parser.add_argument("--data", action="append", default=[], help="JSONL rotulado ({text, label}); pode repetir")
+    parser.add_argument("--synthetic", type=int, default=300, help="descrições sintéticas por tipo (0 desliga)")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    texts, labels = synthetic_corpus(args.synthetic, args.seed) if args.synthetic else ([], [])
+    for path in args.data:
+        extra_texts, extra_labels = load_labeled(path)
+        texts += extra_texts
+        labels += extra_labels
+
+    start = time.perf_counter()
+    model, metrics = train_classifier(texts, labels, classes=list(CORPUS_VOCABULARY), epochs=args.epochs, seed=args.seed)
+    print(f"✅ Treinado com {len(texts)} descrições em {time.perf_counter() - start:.1f}s: {metrics}")
+    model.save(args.out)
+    print(f"💾 Modelo salvo em {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
@@ -4,10 +4,17 @@ Nebula Agent v6.0
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import uuid
 
+try:
+    from .text_index import InvertedIndex
+    from .flow_metrics import FlowMetrics
+except ImportError:
+    from text_index import InvertedIndex
+    from flow_metrics import FlowMetrics
+
 
 # ============================================
 # ENUMS E CONSTANTES
@@ -29,6 +36,15 @@ class TaskPriority(str, Enum):
     CRITICAL = "critical"
 
 
+# Peso de cada campo da tarefa na busca textual
+SEARCH_FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.5,
+    "description": 1.0,
+    "comments": 1.0,
+}
+
+
 # ============================================
 # CLASSE DE TAREFA
 # ============================================
@@ -42,9 +58,10 @@ class Task:
         description: str = "",
         priority: TaskPriority = TaskPriority.MEDIUM,
         status: TaskStatus = TaskStatus.TODO,
-        assignee: str = ""
+        assignee: str = "",
+        task_id: Optional[str] = None
     ):
-        self.id = str(uuid.uuid4())
+        self.id = task_id or str(uuid.uuid4())
         self.title = title
         self.description = description
         self.priority = priority
@@ -56,13 +73,13 @@ class Task:
         self.comments: List[Dict] = []
         self.tags: List[str] = []
     
-    def update_status(self, new_status: TaskStatus) -> None:
-        """Atualiza o status da tarefa."""
+    def update_status(self, new_status: TaskStatus, at: Optional[datetime] = None) -> None:
+        """Atualiza o status da tarefa (`at` permite um único horário para um lote)."""
         self.status = new_status
-        self.updated_at = datetime.now()
+        self.updated_at = at or datetime.now()
         
         if new_status == TaskStatus.DONE:
-            self.completed_at = datetime.now()
+            self.completed_at = self.updated_at
     
     def add_comment(self, author: str, text: str) -> None:
         """Adiciona um comentário à tarefa."""
@@ -78,6 +95,15 @@ class Task:
         if tag not in self.tags:
             self.tags.append(tag)
     
+    def search_fields(self) -> Dict:
+        """Textos da tarefa indexados na busca."""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "comments": [comment["text"] for comment in self.comments],
+            "tags": self.tags
+        }
+    
     def to_dict(self) -> Dict:
         """Converte a tarefa para um dicionário."""
         return {
@@ -105,6 +131,12 @@ class ScrumbanBoard:
     def __init__(self, board_id: str = "default"):
         self.board_id = board_id
         self.tasks: Dict[str, Task] = {}
+        self.search_index = InvertedIndex(SEARCH_FIELD_WEIGHTS)
+        self.flow = FlowMetrics(
+            [status.value for status in TaskStatus],
+            start_status=TaskStatus.IN_PROGRESS.value,
+            done_status=TaskStatus.DONE.value
+        )
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
     
@@ -113,17 +145,27 @@ class ScrumbanBoard:
         title: str,
         description: str = "",
         priority: TaskPriority = TaskPriority.MEDIUM,
-        assignee: str = ""
+        assignee: str = "",
+        task_id: Optional[str] = None
     ) -> Task:
-        """Cria uma nova tarefa no board."""
+        """
+        Cria uma nova tarefa no board (`task_id` permite reservar o ID antes). Se já
+        existe uma tarefa com esse ID (job reexecutado do spool), ela é devolvida sem
+        alterações, para não contar a criação duas vezes nas métricas de fluxo.
+        """
+        if task_id is not None and task_id in self.tasks:
+            return self.tasks[task_id]
         task = Task(
             title=title,
             description=description,
             priority=priority,
             status=TaskStatus.TODO,
-            assignee=assignee
+            assignee=assignee,
+            task_id=task_id
         )
         self.tasks[task.id] = task
+        self.search_index.index(task.id, task.search_fields())
+        self.flow.task_created(task.id, task.status.value, task.created_at)
         self.updated_at = datetime.now()
         return task
     
@@ -136,18 +178,115 @@ class ScrumbanBoard:
         task = self.get_task(task_id)
         if task:
             task.update_status(new_status)
+            self.flow.task_moved(task_id, new_status.value, task.updated_at)
             self.updated_at = datetime.now()
             return True
         return False
     
+    def add_comment(self, task_id: str, author: str, text: str) -> bool:
+        """Adiciona um comentário a uma tarefa (e o indexa na busca)."""
+        task = self.get_task(task_id)
+        if not task:
+            return False
+        task.add_comment(author, text)
+        self.search_index.add_fields(task_id, {"comments": [text]})
+        self.updated_at = datetime.now()
+        return True
+    
+    def add_tag(self, task_id: str, tag: str) -> bool:
+        """Adiciona uma tag a uma tarefa (e a indexa na busca)."""
+        task = self.get_task(task_id)
+        if not task:
+            return False
+        if tag not in task.tags:
+            task.add_tag(tag)
+            self.search_index.add_fields(task_id, {"tags": [tag]})
+            self.updated_at = datetime.now()
+        return True
+    
     def delete_task(self, task_id: str) -> bool:
         """Deleta uma tarefa do board."""
         if task_id in self.tasks:
             del self.tasks[task_id]
+            self.search_index.remove(task_id)
             self.updated_at = datetime.now()
+            self.flow.task_removed(task_id, self.updated_at)
             return True
         return False
     
+    # ============================================
+    # OPERAÇÕES EM LOTE (TUDO OU NADA)
+    # ============================================
+    
+    def create_tasks(self, specs: List[Dict]) -> List[Task]:
+        """
+        Cria várias tarefas de uma vez. Cada item tem title e, opcionalmente, description,
+        priority (TaskPriority) e assignee. Indexa o lote numa única atualização.
+        """
+        tasks = [
+            Task(
+                title=spec["title"],
+                description=spec.get("description", ""),
+                priority=spec.get("priority", TaskPriority.MEDIUM),
+                status=TaskStatus.TODO,
+                assignee=spec.get("assignee", "")
+            )
+            for spec in specs
+        ]
+        for task in tasks:
+            self.tasks[task.id] = task
+            self.flow.task_created(task.id, task.status.value, task.created_at)
+        self.search_index.index_many((task.id, task.search_fields()) for task in tasks)
+        self.updated_at = datetime.now()
+        return tasks
+    
+    def update_statuses(self, changes: List[Tuple[str, TaskStatus]]) -> Dict:
+        """
+        Aplica várias mudanças de status com o mesmo horário. Se alguma tarefa não
+        existir, nada é alterado e os ids ausentes são retornados em "missing".
+        """
+        missing = [task_id for task_id, _ in changes if task_id not in self.tasks]
+        if missing:
+            return {"success": False, "updated": 0, "missing": missing}
+        
+        now = datetime.now()
+        for task_id, new_status in changes:
+            self.tasks[task_id].update_status(new_status, now)
+            self.flow.task_moved(task_id, new_status.value, now)
+        self.updated_at = now
+        return {"success": True, "updated": len(changes), "missing": []}
+    
+    def delete_tasks(self, task_ids: List[str]) -> Dict:
+        """Deleta várias tarefas. Se alguma não existir, nenhuma é deletada."""
+        missing = [task_id for task_id in task_ids if task_id not in self.tasks]
+        if missing:
+            return {"success": False, "deleted": 0, "missing": missing}
+        
+        now = datetime.now()
+        unique_ids = list(dict.fromkeys(task_ids))
+        for task_id in unique_ids:
+            del self.tasks[task_id]
+            self.flow.task_removed(task_id, now)
+        self.search_index.remove_many(unique_ids)
+        self.updated_at = now
+        return {"success": True, "deleted": len(unique_ids), "missing": []}
+    
+    def search_tasks(self, query: str, offset: int = 0, limit: int = 20, status: Optional[TaskStatus] = None) -> Dict:
+        """
+        Busca textual (sem acentos) em título, descrição, comentários e tags.
+        Retorna as tarefas com todos os termos, da mais à menos relevante, paginadas.
+        """
+        where = (lambda task_id: self.tasks[task_id].status == status) if status else None
+        total, page = self.search_index.search(query, offset, limit, where)
+        
+        return {
+            "query": query,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "results": [{**self.tasks[task_id].to_dict(), "score": score} for task_id, score in page]
+        }
+    
     def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
         """Retorna todas as tarefas com um status específico."""
         return [task for task in self.tasks.values() if task.status == status]
@@ -161,12 +300,13 @@ class ScrumbanBoard:
         return [task for task in self.tasks.values() if task.assignee == assignee]
     
     def get_board_stats(self) -> Dict:
-        """Retorna estatísticas do board."""
+        """Retorna estatísticas do board (contagens mantidas pelas métricas de fluxo)."""
+        wip = self.flow.wip()
         total_tasks = len(self.tasks)
-        completed_tasks = len(self.get_tasks_by_status(TaskStatus.DONE))
-        in_progress = len(self.get_tasks_by_status(TaskStatus.IN_PROGRESS))
-        blocked = len(self.get_tasks_by_status(TaskStatus.BLOCKED))
-        todo = len(self.get_tasks_by_status(TaskStatus.TODO))
+        completed_tasks = wip[TaskStatus.DONE.value]
+        in_progress = wip[TaskStatus.IN_PROGRESS.value]
+        blocked = wip[TaskStatus.BLOCKED.value]
+        todo = wip[TaskStatus.TODO.value]
         
         return {
             "total_tasks": total_tasks,
@@ -177,6 +317,13 @@ class ScrumbanBoard:
             "completion_percentage": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         }
     
+    def get_flow_metrics(self, days: int = 30) -> Dict:
+        """Métricas de fluxo pré-calculadas: WIP, permanência, cycle/lead time e throughput."""
+        return {
+            "board_id": self.board_id,
+            **self.flow.snapshot(days)
+        }
+    
     def get_board_data(self) -> Dict:
         """Retorna os dados completos do board organizados por status."""
         return {
@@ -223,14 +370,15 @@ class ScrumbanManager:
         title: str,
         description: str = "",
         priority: TaskPriority = TaskPriority.MEDIUM,
-        assignee: str = ""
+        assignee: str = "",
+        task_id: Optional[str] = None
     ) -> Optional[Dict]:
         """Cria uma nova tarefa em um board."""
         board = self.get_board(board_id)
         if not board:
             board = self.create_board(board_id)
         
-        task = board.create_task(title, description, priority, assignee)
+        task = board.create_task(title, description, priority, assignee, task_id)
         return task.to_dict()
     
     def update_task_status(self, board_id: str, task_id: str, new_status: TaskStatus) -> bool:
@@ -240,6 +388,42 @@ class ScrumbanManager:
             return board.update_task_status(task_id, new_status)
         return False
     
+    def create_tasks(self, board_id: str, specs: List[Dict]) -> List[Dict]:
+        """Cria várias tarefas em um board numa única operação."""
+        board = self.get_board(board_id)
+        if not board:
+            board = self.create_board(board_id)
+        
+        return [task.to_dict() for task in board.create_tasks(specs)]
+    
+    def update_statuses(self, board_id: str, changes: List[Tuple[str, TaskStatus]]) -> Dict:
+        """Atualiza o status de várias tarefas (tudo ou nada)."""
+        board = self.get_board(board_id)
+        if board:
+            return board.update_statuses(changes)
+        return {"success": False, "updated": 0, "missing": [task_id for task_id, _ in changes]}
+    
+    def delete_tasks(self, board_id: str, task_ids: List[str]) -> Dict:
+        """Deleta várias tarefas (tudo ou nada)."""
+        board = self.get_board(board_id)
+        if board:
+            return board.delete_tasks(task_ids)
+        return {"success": False, "deleted": 0, "missing": list(task_ids)}
+    
+    def search_tasks(
+        self,
+        board_id: str,
+        query: str,
+        offset: int = 0,
+        limit: int = 20,
+        status: Optional[TaskStatus] = None
+    ) -> Optional[Dict]:
+        """Busca textual nas tarefas de um board."""
+        board = self.get_board(board_id)
+        if board:
+            return board.search_tasks(query, offset, limit, status)
+        return None
+    
     def get_board_data(self, board_id: str) -> Optional[Dict]:
         """Obtém os dados completos de um board."""
         board = self.get_board(board_id)
@@ -253,6 +437,13 @@ class ScrumbanManager:
         if board:
             return board.get_board_stats()
         return None
+    
+    def get_flow_metrics(self, board_id: str, days: int = 30) -> Optional[Dict]:
+        """Obtém as métricas de fluxo de um board."""
+        board = self.get_board(board_id)
+        if board:
+            return board.get_flow_metrics(days)
+        return None
 
 
 # ============================================
@@ -271,10 +462,10 @@ scrumban_manager.create_board(DEFAULT_BOARD_ID)
 # FUNÇÕES AUXILIARES
 # ============================================
 
-def create_task_from_message(board_id: str, message: str) -> Optional[Dict]:
+def create_task_from_message(board_id: str, message: str, task_id: Optional[str] = None) -> Optional[Dict]:
     """
     Cria uma tarefa a partir de uma mensagem do usuário.
-    Útil para integração com o agente de chat.
+    Útil para integração com o agente de chat (que reserva o `task_id` e cria a tarefa em segundo plano).
     """
     # Extrair informações da mensagem (simples)
     title = message[:100]  # Primeiros 100 caracteres
@@ -292,7 +483,8 @@ def create_task_from_message(board_id: str, message: str) -> Optional[Dict]:
         title=title,
         description=description,
         priority=priority,
-        assignee="Nebula Agent"
+        assignee="Nebula Agent",
+        task_id=task_id
     )
 
 
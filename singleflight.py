@@ -0,0 +1,76 @@
+"""
+Módulo de Coalescência de Chamadas (single-flight)
+Nebula Agent v6.0
+"""
+
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave: a primeira executa a função e as
+    demais aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """Executa (ou aguarda) a chamada da chave. Retorna (resultado, compartilhado)."""
+        future, shared = self._join(key)
+        if not shared:
+            self._lead(key, future, fn, args, kwargs)
+        return future.result(), shared
+
+    def submit(self, key: str, executor: Executor, fn: Callable, *args, **kwargs) -> Tuple[Future, bool]:
+        """
+        Versão não bloqueante de `do`: a chamada líder roda no `executor`. Retorna
+        (future, compartilhado); quem aguarda pode desistir por timeout sem cancelar o voo.
+        Se o executor recusar a tarefa (ex.: já encerrado) ou cancelá-la antes de começar,
+        a chave é liberada e o future recebe o erro (ou é cancelado).
+        """
+        future, shared = self._join(key)
+        if not shared:
+            try:
+                task = executor.submit(self._lead, key, future, fn, args, kwargs)
+            except BaseException as e:
+                self._forget(key)
+                future.set_exception(e)
+                return future, shared
+            task.add_done_callback(lambda task: self._abandon(key, future) if task.cancelled() else None)
+        return future, shared
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, True
+            future = Future()
+            self._calls[key] = future
+            return future, False
+
+    def _lead(self, key: str, future: Future, fn: Callable, args: tuple, kwargs: dict) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            return
+        self._forget(key)
+        future.set_result(result)
+
+    def _abandon(self, key: str, future: Future) -> None:
+        # A tarefa foi cancelada na fila do executor: _lead nunca vai rodar
+        self._forget(key)
+        future.cancel()
+
+    def _forget(self, key: str) -> None:
+        # Removida antes de publicar o resultado: chamadas posteriores iniciam um novo voo
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._calls)
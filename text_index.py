@@ -0,0 +1,255 @@
+"""
+Módulo de Índice Invertido de Texto (pt-BR)
+Nebula Agent v6.0
+"""
+
+import math
+import re
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# ============================================
+# NORMALIZAÇÃO E TOKENIZAÇÃO
+# ============================================
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Stopwords do português (já sem acento)
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de da do das dos e em no na nos nas por pelo pela pelos pelas para
+com que se ao aos eu tu ele ela vos eles elas meu minha seu sua este esta esse essa isso
+isto aquele aquela ja ou como mais mas quando entao ate sobre entre apos
+""".split())
+
+
+def fold_text(text: str) -> str:
+    """Minúsculas e sem acentos (pt-BR): "Ação" -> "acao"."""
+    return unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+
+
+def stem(token: str) -> str:
+    """Reduz plurais simples do português: "botões" -> "botao", "campos" -> "campo"."""
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    if token.endswith(("oes", "aes")):
+        return token[:-3] + "ao"
+    if token.endswith("ns"):
+        return token[:-2] + "m"
+    return token[:-1]
+
+
+def tokenize(text: str) -> List[str]:
+    """Termos do texto na ordem em que aparecem (sem acento, sem stopwords, plural reduzido)."""
+    return [
+        sys.intern(stem(token)) for token in TOKEN_RE.findall(fold_text(text))
+        if token not in STOPWORDS
+    ]
+
+
+# ============================================
+# ÍNDICE INVERTIDO COM RANQUEAMENTO BM25
+# ============================================
+
+class InvertedIndex:
+    """
+    Índice invertido incremental com campos ponderados (BM25F simplificado).
+
+    Cada documento guarda a frequência ponderada de seus termos, então reindexar ou
+    remover um documento só toca nas listas dos termos dele. Internamente os
+    documentos ocupam posições densas, o que permite pontuar uma lista inteira de uma
+    vez com NumPy. A busca é conjuntiva (todos os termos da consulta), começando pela
+    lista do termo mais raro. O ranking de cada consulta fica em cache, invalidado a
+    cada alteração, para que a paginação não o recalcule.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None, cache_size: int = 64):
+        self.field_weights = field_weights or {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._slots: Dict[Hashable, int] = {}
+        self._keys: List[Optional[Hashable]] = []
+        self._free: List[int] = []
+        self._lengths = np.zeros(1024)
+        self._total_length = 0.0
+        self._cache: "OrderedDict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    # ============================================
+    # ATUALIZAÇÃO
+    # ============================================
+
+    def _weighted_terms(self, fields: Dict[str, object]) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for field, value in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            texts = [value] if isinstance(value, str) else value
+            for text in texts:
+                for term in tokenize(text):
+                    terms[term] = terms.get(term, 0.0) + weight
+        return terms
+
+    def index(self, doc_id: Hashable, fields: Dict[str, object]) -> None:
+        """Indexa (ou reindexa) o documento. Campos são textos ou listas de textos."""
+        terms = self._weighted_terms(fields)
+        with self._lock:
+            self._remove(doc_id)
+            self._add(doc_id, terms)
+
+    def add_fields(self, doc_id: Hashable, fields: Dict[str, object]) -> None:
+        """Soma textos novos a um documento já indexado (ex.: um comentário ou uma tag)."""
+        terms = self._weighted_terms(fields)
+        with self._lock:
+            self._add(doc_id, terms)
+
+    def remove(self, doc_id: Hashable) -> None:
+        """Remove o documento do índice."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def index_many(self, documents: Iterable[Tuple[Hashable, Dict[str, object]]]) -> None:
+        """Indexa um lote de documentos numa única atualização (um lock, uma invalidação)."""
+        batch = [(doc_id, self._weighted_terms(fields)) for doc_id, fields in documents]
+        with self._lock:
+            for doc_id, terms in batch:
+                self._remove(doc_id)
+                self._add(doc_id, terms)
+
+    def remove_many(self, doc_ids: Iterable[Hashable]) -> None:
+        """Remove um lote de documentos numa única atualização."""
+        with self._lock:
+            for doc_id in doc_ids:
+                self._remove(doc_id)
+
+    def _slot_for(self, doc_id: Hashable) -> int:
+        slot = self._slots.get(doc_id)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = doc_id
+        else:
+            slot = len(self._keys)
+            self._keys.append(doc_id)
+            if slot >= len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros(len(self._lengths))])
+        self._slots[doc_id] = slot
+        self._doc_terms[slot] = {}
+        return slot
+
+    def _add(self, doc_id: Hashable, terms: Dict[str, float]) -> None:
+        slot = self._slot_for(doc_id)
+        doc_terms = self._doc_terms[slot]
+        postings = self._postings
+        for term, weight in terms.items():
+            tf = doc_terms[term] = doc_terms.get(term, 0.0) + weight
+            docs = postings.get(term)
+            if docs is None:
+                postings[term] = {slot: tf}
+            else:
+                docs[slot] = tf
+        added = sum(terms.values())
+        self._lengths[slot] += added
+        self._total_length += added
+        self._cache.clear()
+
+    def _remove(self, doc_id: Hashable) -> None:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        for term in self._doc_terms.pop(slot):
+            docs = self._postings[term]
+            del docs[slot]
+            if not docs:
+                del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0.0
+        self._keys[slot] = None
+        self._free.append(slot)
+        self._cache.clear()
+
+    # ============================================
+    # BUSCA
+    # ============================================
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = 20,
+        where: Optional[Callable[[Hashable], bool]] = None
+    ) -> Tuple[int, List[Tuple[Hashable, float]]]:
+        """
+        Documentos com todos os termos da consulta, por relevância. Retorna (total, página).
+        `where` filtra os documentos (ex.: por status) antes da paginação.
+        """
+        terms = tuple(sorted(set(tokenize(query))))
+        if not terms:
+            return 0, []
+        with self._lock:
+            ranked = self._cache.get(terms)
+            if ranked is None:
+                ranked = self._rank(terms)
+                self._cache[terms] = ranked
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(terms)
+            slots, scores = ranked
+            keys = self._keys
+
+            if where is None:
+                page = range(offset, min(offset + limit, len(slots)))
+                return len(slots), [(keys[slots[i]], round(float(scores[i]), 4)) for i in page]
+
+            matches = [i for i, slot in enumerate(slots.tolist()) if where(keys[slot])]
+            return len(matches), [
+                (keys[slots[i]], round(float(scores[i]), 4)) for i in matches[offset:offset + limit]
+            ]
+
+    def _rank(self, terms: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        # Chamado com o lock. Retorna (posições, scores) em ordem decrescente de score
+        postings = []
+        for term in terms:
+            docs = self._postings.get(term)
+            if not docs:
+                return np.zeros(0, dtype=np.int64), np.zeros(0)
+            postings.append(docs)
+        postings.sort(key=len)
+
+        doc_count = len(self._doc_terms)
+        avg_length = self._total_length / doc_count if doc_count else 1.0
+        k1, b = self.K1, self.B
+
+        rarest = postings[0]
+        slots = np.fromiter(rarest.keys(), dtype=np.int64, count=len(rarest))
+        tfs = np.fromiter(rarest.values(), dtype=np.float64, count=len(rarest))
+        norms = k1 * (1.0 - b + b * self._lengths[slots] / avg_length)
+        scores = np.zeros(len(slots))
+
+        for position, docs in enumerate(postings):
+            if position:
+                # Só os documentos que ainda restam são consultados nas listas maiores
+                get = docs.get
+                tfs = np.fromiter((get(slot, 0.0) for slot in slots.tolist()), dtype=np.float64, count=len(slots))
+                present = tfs > 0
+                slots, tfs, norms, scores = slots[present], tfs[present], norms[present], scores[present]
+                if not len(slots):
+                    break
+            idf = math.log(1.0 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores += idf * tfs * (k1 + 1.0) / (tfs + norms)
+
+        # Empates ficam na ordem de inserção
+        order = np.argsort(-scores, kind="stable")
+        return slots[order], scores[order]
+
+    def __len__(self) -> int:
+        return len(self._slots)
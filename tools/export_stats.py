@@ -0,0 +1,100 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+REPORT_VERSION = 1
+
+
+def peak_rss_mb() -> float:
+	# ru_maxrss is KiB on Linux and bytes on macOS; unavailable on Windows
+	try:
+		import resource
+	except ImportError:
+		return float("nan")
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+@dataclass
+class StageRecord:
+	name: str
+	wall_s: float = 0.0
+	cpu_s: float = 0.0
+	# Process high-water mark at the end of the stage, and how much this stage raised it
+	peak_rss_mb: float = 0.0
+	rss_growth_mb: float = 0.0
+	counts: Dict[str, int] = field(default_factory=dict)
+
+	def count(self, key: str, value: int) -> None:
+		self.counts[key] = self.counts.get(key, 0) + int(value)
+
+
+class StageRecorder:
+	def __init__(self, profile_dir: Optional[str] = None):
+		self.stages: List[StageRecord] = []
+		self.profile_dir = profile_dir
+		self.started_at = datetime.now()
+		self._wall0 = time.perf_counter()
+		self._cpu0 = time.process_time()
+
+	@contextmanager
+	def stage(self, name: str) -> Iterator[StageRecord]:
+		# Stages are flat: only one cProfile profiler may be active at a time
+		record = StageRecord(name)
+		profiler = cProfile.Profile() if self.profile_dir else None
+		rss0 = peak_rss_mb()
+		wall0 = time.perf_counter()
+		cpu0 = time.process_time()
+		if profiler:
+			profiler.enable()
+		try:
+			yield record
+		finally:
+			if profiler:
+				profiler.disable()
+			record.wall_s = round(time.perf_counter() - wall0, 4)
+			record.cpu_s = round(time.process_time() - cpu0, 4)
+			record.peak_rss_mb = round(peak_rss_mb(), 1)
+			record.rss_growth_mb = round(max(0.0, record.peak_rss_mb - rss0), 1)
+			self.stages.append(record)
+			if profiler:
+				self._dump_profile(name, profiler)
+			print(
+				f"[TIME] {name}: {record.wall_s:.2f} s wall, {record.cpu_s:.2f} s cpu, "
+				f"peak RSS {record.peak_rss_mb:.0f} MB (+{record.rss_growth_mb:.0f})"
+			)
+
+	def _dump_profile(self, name: str, profiler: cProfile.Profile) -> None:
+		os.makedirs(self.profile_dir, exist_ok=True)
+		profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.pstats"))
+		text = io.StringIO()
+		pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(30)
+		with open(os.path.join(self.profile_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+			f.write(text.getvalue())
+
+	def report(self, **meta) -> Dict:
+		return {
+			"version": REPORT_VERSION,
+			"started_at": self.started_at.isoformat(),
+			**meta,
+			"total": {
+				"wall_s": round(time.perf_counter() - self._wall0, 4),
+				"cpu_s": round(time.process_time() - self._cpu0, 4),
+				"peak_rss_mb": round(peak_rss_mb(), 1),
+			},
+			"stages": [asdict(s) for s in self.stages],
+		}
+
+	def write(self, path: str, **meta) -> Dict:
+		report = self.report(**meta)
+		with open(path, "w", encoding="utf-8") as f:
+			json.dump(report, f, ensure_ascii=False, indent=2)
+		return report
@@ -0,0 +1,406 @@
+import argparse
+import heapq
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_SPEED_KPH = 40.0
+WITNESS_SETTLE_LIMIT = 60
+
+
+def travel_time_s(edge: Dict) -> float:
+	speed_kph = float(edge.get("speed_kph") or DEFAULT_SPEED_KPH)
+	if speed_kph <= 0.0:
+		speed_kph = DEFAULT_SPEED_KPH
+	return float(edge.get("length_m", 0.0)) / (speed_kph / 3.6)
+
+
+@dataclass
+class CSRGraph:
+	# Arcs of node u are indices[indptr[u]:indptr[u + 1]]; edge_index maps each arc back to "edges"
+	indptr: List[int]
+	indices: List[int]
+	weights: List[float]
+	edge_index: List[int]
+
+	@property
+	def num_nodes(self) -> int:
+		return len(self.indptr) - 1
+
+	def to_dict(self) -> Dict:
+		return {
+			"weight": "travel_time_s",
+			"indptr": self.indptr,
+			"indices": self.indices,
+			"weights": self.weights,
+			"edge_index": self.edge_index,
+		}
+
+
+def build_csr(num_nodes: int, edges: Sequence[Dict]) -> CSRGraph:
+	# Two-way edges (oneway == false) contribute a reverse arc, as ARoadNetworkActor does for splines
+	arcs: List[Tuple[int, int, float, int]] = []
+	for i, edge in enumerate(edges):
+		u, v = edge["from"], edge["to"]
+		w = travel_time_s(edge)
+		arcs.append((u, v, w, i))
+		if not edge.get("oneway", True):
+			arcs.append((v, u, w, i))
+	arcs.sort(key=lambda a: a[0])
+	indptr = [0] * (num_nodes + 1)
+	for u, _, _, _ in arcs:
+		indptr[u + 1] += 1
+	for u in range(num_nodes):
+		indptr[u + 1] += indptr[u]
+	return CSRGraph(
+		indptr=indptr,
+		indices=[a[1] for a in arcs],
+		weights=[round(a[2], 3) for a in arcs],
+		edge_index=[a[3] for a in arcs],
+	)
+
+
+def strongly_connected_components(csr: CSRGraph) -> List[int]:
+	# Iterative Tarjan; labels are renumbered so 0 is the largest component
+	n = csr.num_nodes
+	indptr, indices = csr.indptr, csr.indices
+	index = [-1] * n
+	low = [0] * n
+	on_stack = [False] * n
+	comp = [-1] * n
+	stack: List[int] = []
+	counter = 0
+	num_comps = 0
+	for root in range(n):
+		if index[root] != -1:
+			continue
+		work = [(root, indptr[root])]
+		index[root] = low[root] = counter
+		counter += 1
+		stack.append(root)
+		on_stack[root] = True
+		while work:
+			u, k = work[-1]
+			if k < indptr[u + 1]:
+				work[-1] = (u, k + 1)
+				v = indices[k]
+				if index[v] == -1:
+					index[v] = low[v] = counter
+					counter += 1
+					stack.append(v)
+					on_stack[v] = True
+					work.append((v, indptr[v]))
+				elif on_stack[v]:
+					low[u] = min(low[u], index[v])
+				continue
+			work.pop()
+			if work:
+				parent = work[-1][0]
+				low[parent] = min(low[parent], low[u])
+			if low[u] == index[u]:
+				while True:
+					w = stack.pop()
+					on_stack[w] = False
+					comp[w] = num_comps
+					if w == u:
+						break
+				num_comps += 1
+	sizes = [0] * num_comps
+	for c in comp:
+		sizes[c] += 1
+	order = sorted(range(num_comps), key=lambda c: -sizes[c])
+	relabel = {c: i for i, c in enumerate(order)}
+	return [relabel[c] for c in comp]
+
+
+def prune_to_largest_component(nodes: List[Dict], edges: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+	labels = strongly_connected_components(build_csr(len(nodes), edges))
+	keep = [i for i, label in enumerate(labels) if label == 0]
+	remap = {old: new for new, old in enumerate(keep)}
+	pruned_nodes = [dict(nodes[old], id=new) for new, old in enumerate(keep)]
+	pruned_edges = [
+		dict(edge, **{"from": remap[edge["from"]], "to": remap[edge["to"]]})
+		for edge in edges
+		if edge["from"] in remap and edge["to"] in remap
+	]
+	return pruned_nodes, pruned_edges
+
+
+@dataclass
+class ContractionHierarchy:
+	rank: List[int]
+	# (from, to, weight, via): shortcut from -> to replacing from -> via -> to
+	shortcuts: List[Tuple[int, int, float, int]] = field(default_factory=list)
+
+	def to_dict(self) -> Dict:
+		return {"rank": self.rank, "shortcuts": [list(s) for s in self.shortcuts]}
+
+
+def _witness_exists(
+	out_adj: List[Dict[int, float]], contracted: List[bool], source: int, target: int, skip: int, limit: float
+) -> bool:
+	dist = {source: 0.0}
+	heap = [(0.0, source)]
+	settled = 0
+	while heap:
+		d, u = heapq.heappop(heap)
+		if d > limit:
+			return False
+		if u == target:
+			return True
+		if d > dist.get(u, math.inf):
+			continue
+		settled += 1
+		if settled > WITNESS_SETTLE_LIMIT:
+			return False
+		for v, w in out_adj[u].items():
+			if v == skip or contracted[v]:
+				continue
+			nd = d + w
+			if nd < dist.get(v, math.inf):
+				dist[v] = nd
+				heapq.heappush(heap, (nd, v))
+	return False
+
+
+def _needed_shortcuts(
+	v: int, out_adj: List[Dict[int, float]], in_adj: List[Dict[int, float]], contracted: List[bool]
+) -> List[Tuple[int, int, float]]:
+	needed = []
+	for u, w_uv in in_adj[v].items():
+		if contracted[u]:
+			continue
+		for x, w_vx in out_adj[v].items():
+			if x == u or contracted[x]:
+				continue
+			cost = w_uv + w_vx
+			if out_adj[u].get(x, math.inf) <= cost:
+				continue
+			if not _witness_exists(out_adj, contracted, u, x, v, cost):
+				needed.append((u, x, cost))
+	return needed
+
+
+def contract(csr: CSRGraph) -> ContractionHierarchy:
+	n = csr.num_nodes
+	out_adj: List[Dict[int, float]] = [dict() for _ in range(n)]
+	in_adj: List[Dict[int, float]] = [dict() for _ in range(n)]
+	for u in range(n):
+		for k in range(csr.indptr[u], csr.indptr[u + 1]):
+			v, w = csr.indices[k], csr.weights[k]
+			if v != u and w < out_adj[u].get(v, math.inf):
+				out_adj[u][v] = w
+				in_adj[v][u] = w
+	contracted = [False] * n
+	deleted_neighbours = [0] * n
+
+	def priority(v: int, needed: List[Tuple[int, int, float]]) -> int:
+		degree = sum(1 for u in in_adj[v] if not contracted[u]) + sum(1 for x in out_adj[v] if not contracted[x])
+		return len(needed) - degree + deleted_neighbours[v]
+
+	heap = [(priority(v, _needed_shortcuts(v, out_adj, in_adj, contracted)), v) for v in range(n)]
+	heapq.heapify(heap)
+	rank = [0] * n
+	shortcuts: List[Tuple[int, int, float, int]] = []
+	order = 0
+	while heap:
+		_, v = heapq.heappop(heap)
+		if contracted[v]:
+			continue
+		# Lazy update: re-evaluate and defer if no longer the cheapest node
+		needed = _needed_shortcuts(v, out_adj, in_adj, contracted)
+		p = priority(v, needed)
+		if heap and p > heap[0][0]:
+			heapq.heappush(heap, (p, v))
+			continue
+		for u, x, cost in needed:
+			out_adj[u][x] = cost
+			in_adj[x][u] = cost
+			shortcuts.append((u, x, round(cost, 3), v))
+		contracted[v] = True
+		rank[v] = order
+		order += 1
+		for neighbour in set(in_adj[v]) | set(out_adj[v]):
+			if not contracted[neighbour]:
+				deleted_neighbours[neighbour] += 1
+	return ContractionHierarchy(rank=rank, shortcuts=shortcuts)
+
+
+def routing_payload(num_nodes: int, edges: Sequence[Dict], with_ch: bool = False) -> Dict:
+	csr = build_csr(num_nodes, edges)
+	labels = strongly_connected_components(csr)
+	payload = csr.to_dict()
+	payload["scc"] = labels
+	payload["scc_count"] = max(labels) + 1 if labels else 0
+	if with_ch:
+		payload["ch"] = contract(csr).to_dict()
+	return payload
+
+
+class LaneRouter:
+	"""Travel-time shortest-path queries over an exported lanes_graph.json."""
+
+	def __init__(self, graph: Dict):
+		self.nodes = graph["nodes"]
+		self.edges = graph["edges"]
+		routing = graph.get("routing")
+		if routing:
+			self.csr = CSRGraph(routing["indptr"], routing["indices"], routing["weights"], routing["edge_index"])
+			self.scc = routing.get("scc") or strongly_connected_components(self.csr)
+		else:
+			self.csr = build_csr(len(self.nodes), self.edges)
+			self.scc = strongly_connected_components(self.csr)
+		self._up: Optional[List[List[Tuple[int, float]]]] = None
+		self._down: Optional[List[List[Tuple[int, float]]]] = None
+		self._via: Dict[Tuple[int, int], int] = {}
+		if routing and routing.get("ch"):
+			self._load_ch(routing["ch"])
+
+	@classmethod
+	def from_json(cls, path: str) -> "LaneRouter":
+		with open(path, "r", encoding="utf-8") as f:
+			return cls(json.load(f))
+
+	@property
+	def has_ch(self) -> bool:
+		return self._up is not None
+
+	def reachable(self, source: int, target: int) -> bool:
+		# Same SCC is sufficient (not necessary) for reachability
+		return self.scc[source] == self.scc[target]
+
+	def shortest_path(self, source: int, target: int) -> Tuple[float, List[int]]:
+		indptr, indices, weights = self.csr.indptr, self.csr.indices, self.csr.weights
+		dist = {source: 0.0}
+		prev: Dict[int, int] = {}
+		heap = [(0.0, source)]
+		while heap:
+			d, u = heapq.heappop(heap)
+			if u == target:
+				return d, self._backtrack(prev, source, target)
+			if d > dist[u]:
+				continue
+			for k in range(indptr[u], indptr[u + 1]):
+				v = indices[k]
+				nd = d + weights[k]
+				if nd < dist.get(v, math.inf):
+					dist[v] = nd
+					prev[v] = u
+					heapq.heappush(heap, (nd, v))
+		return math.inf, []
+
+	def shortest_path_ch(self, source: int, target: int) -> Tuple[float, List[int]]:
+		if self._up is None or self._down is None:
+			return self.shortest_path(source, target)
+		graphs = (self._up, self._down)
+		dists: Tuple[Dict[int, float], Dict[int, float]] = ({source: 0.0}, {target: 0.0})
+		prevs: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+		heaps = ([(0.0, source)], [(0.0, target)])
+		best, meet = math.inf, -1
+		while heaps[0] or heaps[1]:
+			for side in (0, 1):
+				heap = heaps[side]
+				if not heap:
+					continue
+				d, u = heapq.heappop(heap)
+				if d > dists[side].get(u, math.inf) or d >= best:
+					if d >= best:
+						heap.clear()
+					continue
+				other = dists[1 - side].get(u)
+				if other is not None and d + other < best:
+					best, meet = d + other, u
+				for v, w in graphs[side][u]:
+					nd = d + w
+					if nd < dists[side].get(v, math.inf):
+						dists[side][v] = nd
+						prevs[side][v] = u
+						heapq.heappush(heap, (nd, v))
+		if meet < 0:
+			return math.inf, []
+		forward = self._backtrack(prevs[0], source, meet)
+		backward = self._backtrack(prevs[1], target, meet)
+		packed = forward + backward[::-1][1:]
+		path = [packed[0]]
+		for u, v in zip(packed, packed[1:]):
+			path.extend(self._unpack(u, v))
+		return best, path
+
+	def _load_ch(self, ch: Dict) -> None:
+		rank = ch["rank"]
+		n = self.csr.num_nodes
+		up: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+		down: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+
+		def add(u: int, v: int, w: float) -> None:
+			if rank[u] < rank[v]:
+				up[u].append((v, w))
+			elif rank[u] > rank[v]:
+				down[v].append((u, w))
+
+		for u in range(n):
+			for k in range(self.csr.indptr[u], self.csr.indptr[u + 1]):
+				add(u, self.csr.indices[k], self.csr.weights[k])
+		for u, v, w, via in ch["shortcuts"]:
+			add(u, v, w)
+			self._via[(u, v)] = via
+		self._up, self._down = up, down
+
+	def _unpack(self, u: int, v: int) -> List[int]:
+		# Shortcuts are only added when strictly cheaper than the existing arc, so the last one wins
+		via = self._via.get((u, v))
+		if via is None:
+			return [v]
+		return self._unpack(u, via) + self._unpack(via, v)
+
+	@staticmethod
+	def _backtrack(prev: Dict[int, int], source: int, target: int) -> List[int]:
+		path = [target]
+		while path[-1] != source:
+			path.append(prev[path[-1]])
+		return path[::-1]
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Validate shortest-path latency on an exported lanes_graph.json.")
+	parser.add_argument("graph", type=str, help="Path to lanes_graph.json")
+	parser.add_argument("--queries", type=int, default=500, help="Number of random source/target pairs")
+	parser.add_argument("--seed", type=int, default=42)
+	args = parser.parse_args()
+
+	router = LaneRouter.from_json(args.graph)
+	n = router.csr.num_nodes
+	main_component = [i for i, label in enumerate(router.scc) if label == 0]
+	print(f"[ROUTE] {n} nodes, {len(router.csr.indices)} arcs, {max(router.scc) + 1 if n else 0} SCCs, CH: {router.has_ch}")
+	if len(main_component) < 2:
+		print("[ROUTE] Not enough connected nodes to query")
+		return
+	rng = random.Random(args.seed)
+	pairs = [tuple(rng.sample(main_component, 2)) for _ in range(args.queries)]
+	modes = [("dijkstra", router.shortest_path)]
+	if router.has_ch:
+		modes.append(("ch", router.shortest_path_ch))
+	results: Dict[str, List[float]] = {}
+	for name, fn in modes:
+		latencies = []
+		costs = []
+		for s, t in pairs:
+			start = time.perf_counter()
+			cost, _ = fn(s, t)
+			latencies.append((time.perf_counter() - start) * 1000.0)
+			costs.append(cost)
+		results[name] = costs
+		latencies.sort()
+		p50 = latencies[len(latencies) // 2]
+		p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+		print(f"[ROUTE] {name:<8} p50={p50:.3f} ms  p95={p95:.3f} ms  max={latencies[-1]:.3f} ms")
+	if "ch" in results:
+		mismatches = sum(1 for a, b in zip(results["dijkstra"], results["ch"]) if abs(a - b) > 1e-6 * max(1.0, a))
+		print(f"[ROUTE] CH vs Dijkstra mismatches: {mismatches}/{len(pairs)}")
+
+
+if __name__ == "__main__":
+	main()
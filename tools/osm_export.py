@@ -2,24 +2,37 @@ import argparse
 import json
 import math
 import os
-import random
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
+import geopandas as gpd
 import networkx as nx
+import numpy as np
 import osmnx as ox
 import pandas as pd
+import shapely
+from shapely import STRtree
 from shapely.geometry import Point, Polygon, LineString, mapping
 from shapely.ops import unary_union
 
+from export_stats import StageRecorder, peak_rss_mb
+from lane_routing import prune_to_largest_component, routing_payload
+
+M_PER_DEG_LAT = 110_540.0
+M_PER_DEG_LON = 111_320.0
+
 
 @dataclass
 class ExportPaths:
 	output_dir: str
 	roads_geojson: str
 	buildings_geojson: str
+	buildings_chunks_dir: str
+	buildings_index_json: str
 	lanes_graph_json: str
 	spawn_points_csv: str
+	report_json: str
+	profile_dir: str
 
 
 def ensure_output_paths(output_dir: str) -> ExportPaths:
@@ -28,8 +41,12 @@ def ensure_output_paths(output_dir: str) -> ExportPaths:
 		output_dir=output_dir,
 		roads_geojson=os.path.join(output_dir, "roads.geojson"),
 		buildings_geojson=os.path.join(output_dir, "buildings.geojson"),
+		buildings_chunks_dir=os.path.join(output_dir, "buildings"),
+		buildings_index_json=os.path.join(output_dir, "buildings_index.json"),
 		lanes_graph_json=os.path.join(output_dir, "lanes_graph.json"),
 		spawn_points_csv=os.path.join(output_dir, "spawn_points.csv"),
+		report_json=os.path.join(output_dir, "export_report.json"),
+		profile_dir=os.path.join(output_dir, "profile"),
 	)
 
 
@@ -51,28 +68,224 @@ def load_place_geometry(place: Optional[str], polygon_path: Optional[str]) -> Po
 	return geom
 
 
-def export_roads(geom: Polygon, roads_path: str) -> Tuple[nx.MultiDiGraph, List[LineString]]:
-	G = ox.graph_from_polygon(geom, network_type="drive", simplify=True)
-	edges_gdf = ox.graph_to_gdfs(G, nodes=False, edges=True)
-	edges_gdf.to_file(roads_path, driver="GeoJSON")
-	lines = [geom for geom in edges_gdf.geometry if isinstance(geom, LineString)]
+def _json_value(value):
+	if isinstance(value, (str, int, float, bool)) or value is None:
+		if isinstance(value, float) and not math.isfinite(value):
+			return None
+		return value
+	if isinstance(value, (list, tuple)):
+		return [_json_value(v) for v in value]
+	if isinstance(value, np.generic):
+		return _json_value(value.item())
+	return str(value)
+
+
+def iter_road_edges(G: nx.MultiDiGraph) -> Iterator[Tuple[Dict, np.ndarray]]:
+	# Same features as ox.graph_to_gdfs(G, nodes=False), without materializing a GeoDataFrame
+	node_xy = {nid: (data["x"], data["y"]) for nid, data in G.nodes(data=True)}
+	for u, v, key, data in G.edges(keys=True, data=True):
+		line = data.get("geometry")
+		coords = shapely.get_coordinates(line) if line is not None else np.array([node_xy[u], node_xy[v]], dtype=float)
+		props = {"u": _json_value(u), "v": _json_value(v), "key": key}
+		for name, value in data.items():
+			if name != "geometry":
+				props[name] = _json_value(value)
+		yield props, coords
+
+
+class RoadLineBuffer:
+	# Flat coordinate buffer for road centerlines; lines are rebuilt in one vectorized call
+	def __init__(self):
+		self._coords: List[np.ndarray] = []
+		self._sizes: List[int] = []
+
+	def __len__(self) -> int:
+		return len(self._sizes)
+
+	def add(self, coords: np.ndarray) -> None:
+		if len(coords) >= 2:
+			self._coords.append(np.asarray(coords, dtype=float))
+			self._sizes.append(len(coords))
+
+	def to_lines(self) -> np.ndarray:
+		if not self._sizes:
+			return np.empty(0, dtype=object)
+		indices = np.repeat(np.arange(len(self._sizes)), self._sizes)
+		return shapely.linestrings(np.concatenate(self._coords), indices=indices)
+
+
+class GeoJSONStreamWriter:
+	def __init__(self, path: str, precision: int = 6):
+		self.path = path
+		self.precision = precision
+		self.count = 0
+		self._f = None
+
+	def __enter__(self) -> "GeoJSONStreamWriter":
+		self._f = open(self.path, "w", encoding="utf-8")
+		self._f.write('{"type": "FeatureCollection", "crs": {"type": "name", "properties": {"name": "urn:ogc:def:crs:OGC:1.3:CRS84"}}, "features": [\n')
+		return self
+
+	def write_line(self, props: Dict, coords: np.ndarray) -> None:
+		feature = {
+			"type": "Feature",
+			"properties": props,
+			"geometry": {"type": "LineString", "coordinates": np.round(coords, self.precision).tolist()},
+		}
+		if self.count:
+			self._f.write(",\n")
+		self._f.write(json.dumps(feature, ensure_ascii=False, separators=(",", ":")))
+		self.count += 1
+
+	def __exit__(self, *exc) -> None:
+		self._f.write("\n]}\n")
+		self._f.close()
+
+
+def download_road_graph(geom: Polygon) -> nx.MultiDiGraph:
+	# Simplified inside osmnx: with clean_periphery it simplifies the buffered graph before
+	# truncating to the AOI, which keeps boundary intersections and their street_count.
+	# Simplifying after the download would merge those nodes and change the export.
+	return ox.graph_from_polygon(geom, network_type="drive", simplify=True)
+
+
+def export_roads(geom: Polygon, roads_path: str, precision: int = 6) -> Tuple[nx.MultiDiGraph, np.ndarray]:
+	G = download_road_graph(geom)
+	lines = stream_roads(G, roads_path, precision)
 	return G, lines
 
 
-def export_buildings(geom: Polygon, buildings_path: str) -> None:
+def stream_roads(G: nx.MultiDiGraph, roads_path: str, precision: int = 6) -> np.ndarray:
+	# Single pass over the edges: each feature is written as it is produced and its
+	# coordinates are kept (flat) for spawn sampling
+	buffer = RoadLineBuffer()
+	with GeoJSONStreamWriter(roads_path, precision) as writer:
+		for props, coords in iter_road_edges(G):
+			writer.write_line(props, coords)
+			buffer.add(coords)
+	return buffer.to_lines()
+
+
+@dataclass
+class BuildingsConfig:
+	simplify_m: float = 0.5
+	# World Partition style grid cell size; 0 keeps only the monolithic buildings.geojson
+	chunk_size_m: float = 256.0
+	chunk_format: str = "geojson"
+	write_monolithic: bool = True
+
+
+CHUNK_EXTENSIONS = {"geojson": ".geojson", "parquet": ".parquet"}
+
+
+def simplify_footprints(buildings: gpd.GeoDataFrame, tolerance_m: float) -> gpd.GeoDataFrame:
+	if tolerance_m <= 0.0 or buildings.empty:
+		return buildings
+	metric_crs = buildings.estimate_utm_crs()
+	projected = buildings.to_crs(metric_crs)
+	projected["geometry"] = projected.geometry.simplify(tolerance_m, preserve_topology=True)
+	projected = projected[~projected.geometry.is_empty]
+	return projected.to_crs(buildings.crs)
+
+
+def write_building_chunks(buildings: gpd.GeoDataFrame, paths: ExportPaths, config: BuildingsConfig) -> Dict:
+	ext = CHUNK_EXTENSIONS[config.chunk_format]
+	os.makedirs(paths.buildings_chunks_dir, exist_ok=True)
+	index: Dict = {
+		"crs": "EPSG:4326",
+		"format": config.chunk_format,
+		"chunk_size_m": config.chunk_size_m,
+		"feature_count": int(len(buildings)),
+		"chunks": [],
+	}
+	if buildings.empty:
+		with open(paths.buildings_index_json, "w", encoding="utf-8") as f:
+			json.dump(index, f, ensure_ascii=False, indent=2)
+		return index
+
+	# Assign each footprint to the grid cell holding its representative point (metric CRS)
+	metric_crs = buildings.estimate_utm_crs()
+	anchors = buildings.to_crs(metric_crs).geometry.representative_point()
+	origin_x = math.floor(anchors.x.min() / config.chunk_size_m) * config.chunk_size_m
+	origin_y = math.floor(anchors.y.min() / config.chunk_size_m) * config.chunk_size_m
+	ix = np.floor((anchors.x.to_numpy() - origin_x) / config.chunk_size_m).astype(np.int64)
+	iy = np.floor((anchors.y.to_numpy() - origin_y) / config.chunk_size_m).astype(np.int64)
+	index["metric_crs"] = metric_crs.to_string()
+	index["grid_origin_m"] = [origin_x, origin_y]
+
+	keys = pd.Series(list(zip(ix.tolist(), iy.tolist())), index=buildings.index)
+	for (cx, cy), chunk in buildings.groupby(keys, sort=True):
+		chunk_id = f"{cx}_{cy}"
+		rel_path = os.path.join(os.path.basename(paths.buildings_chunks_dir), f"chunk_{chunk_id}{ext}")
+		out_path = os.path.join(paths.output_dir, rel_path)
+		chunk = gpd.GeoDataFrame(chunk, geometry="geometry", crs=buildings.crs)
+		if config.chunk_format == "parquet":
+			chunk.to_parquet(out_path)
+		else:
+			chunk.to_file(out_path, driver="GeoJSON")
+		minx, miny, maxx, maxy = chunk.total_bounds
+		index["chunks"].append(
+			{
+				"id": chunk_id,
+				"ix": cx,
+				"iy": cy,
+				"path": rel_path.replace(os.sep, "/"),
+				"count": int(len(chunk)),
+				"bounds": [float(minx), float(miny), float(maxx), float(maxy)],
+				"cell_bounds_m": [
+					origin_x + cx * config.chunk_size_m,
+					origin_y + cy * config.chunk_size_m,
+					origin_x + (cx + 1) * config.chunk_size_m,
+					origin_y + (cy + 1) * config.chunk_size_m,
+				],
+			}
+		)
+	with open(paths.buildings_index_json, "w", encoding="utf-8") as f:
+		json.dump(index, f, ensure_ascii=False, indent=2)
+	return index
+
+
+def query_building_chunks(index_path: str, bbox: Tuple[float, float, float, float]) -> List[str]:
+	# Chunk files (absolute paths) whose content bounds intersect bbox (minx, miny, maxx, maxy, EPSG:4326)
+	with open(index_path, "r", encoding="utf-8") as f:
+		index = json.load(f)
+	base = os.path.dirname(os.path.abspath(index_path))
+	qminx, qminy, qmaxx, qmaxy = bbox
+	return [
+		os.path.join(base, chunk["path"])
+		for chunk in index["chunks"]
+		if chunk["bounds"][0] <= qmaxx and chunk["bounds"][2] >= qminx and chunk["bounds"][1] <= qmaxy and chunk["bounds"][3] >= qminy
+	]
+
+
+def download_buildings(geom: Polygon) -> gpd.GeoDataFrame:
 	tags = {"building": True}
 	buildings = ox.geometries_from_polygon(geom, tags)
 	# Keep only polygonal footprints
-	buildings = buildings[buildings.geometry.type.isin(["Polygon", "MultiPolygon"])]
-	if buildings.empty:
-		# Create empty valid GeoJSON
-		with open(buildings_path, "w", encoding="utf-8") as f:
-			json.dump({"type": "FeatureCollection", "features": []}, f)
-		return
-	buildings.to_file(buildings_path, driver="GeoJSON")
+	return buildings[buildings.geometry.type.isin(["Polygon", "MultiPolygon"])]
+
 
+def export_buildings(geom: Polygon, paths: ExportPaths, config: BuildingsConfig) -> List[Polygon]:
+	buildings = simplify_footprints(download_buildings(geom), config.simplify_m)
+	return write_buildings(buildings, paths, config)
 
-def graph_to_lane_json(G: nx.MultiDiGraph, out_path: str) -> None:
+
+def write_buildings(buildings: gpd.GeoDataFrame, paths: ExportPaths, config: BuildingsConfig) -> List[Polygon]:
+	if config.write_monolithic:
+		if buildings.empty:
+			# Create empty valid GeoJSON
+			with open(paths.buildings_geojson, "w", encoding="utf-8") as f:
+				json.dump({"type": "FeatureCollection", "features": []}, f)
+		else:
+			buildings.to_file(paths.buildings_geojson, driver="GeoJSON")
+	if config.chunk_size_m > 0.0:
+		write_building_chunks(buildings, paths, config)
+	return list(buildings.geometry.values)
+
+
+def graph_to_lane_json(
+	G: nx.MultiDiGraph, out_path: str, routing: bool = False, contraction: bool = False, drop_islands: bool = False
+) -> Tuple[int, int]:
 	nodes = []
 	edges = []
 	node_id_map: Dict[int, int] = {}
@@ -106,33 +319,169 @@ def graph_to_lane_json(G: nx.MultiDiGraph, out_path: str) -> None:
 				"oneway": oneway,
 			}
 		)
+	if drop_islands:
+		nodes, edges = prune_to_largest_component(nodes, edges)
+	graph = {"nodes": nodes, "edges": edges}
+	if routing or contraction:
+		graph["routing"] = routing_payload(len(nodes), edges, with_ch=contraction)
 	with open(out_path, "w", encoding="utf-8") as f:
-		json.dump({"nodes": nodes, "edges": edges}, f, ensure_ascii=False, indent=2)
-
-
-def generate_spawn_points(sidewalk_geom: Polygon, road_lines: List[LineString], out_csv: str, count: int) -> None:
-	points: List[Tuple[float, float]] = []
-	if not road_lines:
-		df = pd.DataFrame(columns=["x", "y", "z", "spawn_tag"])
-		df.to_csv(out_csv, index=False)
-		return
-	# Use road midpoints as a simple baseline for spawn locations
-	for line in road_lines:
-		if line.length <= 1.0:
-			continue
-		midpoint = line.interpolate(0.5, normalized=True)
-		points.append((midpoint.x, midpoint.y))
-	# Sample additional random points nearby roads
-	random.seed(42)
-	while len(points) < count:
-		line = random.choice(road_lines)
-		t = random.random()
-		pt = line.interpolate(t, normalized=True)
-		# Small perpendicular jitter
-		jitter_len = random.uniform(-2.0, 2.0)
-		points.append((pt.x + jitter_len, pt.y))
-	rows = [{"x": x, "y": y, "z": 0.0, "spawn_tag": "pedestrian"} for x, y in points[:count]]
-	pd.DataFrame(rows).to_csv(out_csv, index=False)
+		json.dump(graph, f, ensure_ascii=False, indent=2)
+	return len(nodes), len(edges)
+
+
+@dataclass
+class SpawnConfig:
+	count: int = 500
+	seed: int = 42
+	min_offset_m: float = 1.5
+	max_offset_m: float = 4.0
+	min_spacing_m: float = 0.0
+	spawn_tag: str = "pedestrian"
+	max_rounds: int = 20
+
+
+# Local equirectangular frame: (origin_x, origin_y, meters per unit x, meters per unit y)
+MetricFrame = Tuple[float, float, float, float]
+
+
+def _metric_frame(geoms: np.ndarray, geographic: bool) -> MetricFrame:
+	if not geographic:
+		return 0.0, 0.0, 1.0, 1.0
+	minx, miny, maxx, maxy = shapely.total_bounds(geoms)
+	lon0 = (minx + maxx) / 2.0
+	lat0 = (miny + maxy) / 2.0
+	return lon0, lat0, M_PER_DEG_LON * math.cos(math.radians(lat0)), M_PER_DEG_LAT
+
+
+def _to_frame(geoms, frame: MetricFrame):
+	x0, y0, kx, ky = frame
+	return shapely.transform(geoms, lambda c: (c - (x0, y0)) * (kx, ky))
+
+
+def _from_frame(xy: np.ndarray, frame: MetricFrame) -> np.ndarray:
+	x0, y0, kx, ky = frame
+	return xy / (kx, ky) + (x0, y0)
+
+
+class _SpacingGrid:
+	# Background grid for Poisson-disk acceptance: cell side r/sqrt(2) holds at most one point,
+	# so only the 5x5 neighbourhood needs checking.
+	def __init__(self, spacing: float):
+		self.r2 = spacing * spacing
+		self.cell = spacing / math.sqrt(2.0)
+		self.cells: Dict[Tuple[int, int], Tuple[float, float]] = {}
+
+	def accept(self, xy: np.ndarray) -> np.ndarray:
+		keep = np.zeros(len(xy), dtype=bool)
+		ij = np.floor(xy / self.cell).astype(np.int64)
+		cells = self.cells
+		r2 = self.r2
+		for k, ((x, y), (i, j)) in enumerate(zip(xy.tolist(), ij.tolist())):
+			if (i, j) in cells:
+				continue
+			ok = True
+			for di in range(-2, 3):
+				for dj in range(-2, 3):
+					other = cells.get((i + di, j + dj))
+					if other is not None and (other[0] - x) ** 2 + (other[1] - y) ** 2 < r2:
+						ok = False
+						break
+				if not ok:
+					break
+			if ok:
+				cells[(i, j)] = (x, y)
+				keep[k] = True
+		return xy[keep]
+
+
+def _sample_along_lines(
+	lines: np.ndarray, lengths: np.ndarray, cum: np.ndarray, n: int, rng: np.random.Generator, config: SpawnConfig
+) -> np.ndarray:
+	# Length-weighted choice of line + position, all lines at once
+	s = rng.random(n) * cum[-1]
+	idx = np.minimum(np.searchsorted(cum, s, side="right"), len(lines) - 1)
+	line_len = lengths[idx]
+	along = s - (cum[idx] - line_len)
+	chosen = lines[idx]
+	eps = np.minimum(0.5, line_len * 0.5)
+	base = shapely.get_coordinates(shapely.line_interpolate_point(chosen, along))
+	ahead = shapely.get_coordinates(shapely.line_interpolate_point(chosen, np.minimum(along + eps, line_len)))
+	behind = shapely.get_coordinates(shapely.line_interpolate_point(chosen, np.maximum(along - eps, 0.0)))
+	tangent = ahead - behind
+	norm = np.hypot(tangent[:, 0], tangent[:, 1])
+	norm[norm == 0.0] = 1.0
+	normal = np.column_stack((-tangent[:, 1], tangent[:, 0])) / norm[:, None]
+	side = rng.choice((-1.0, 1.0), size=n)
+	offset = rng.uniform(config.min_offset_m, config.max_offset_m, size=n) * side
+	return base + normal * offset[:, None]
+
+
+def sample_spawn_points(
+	sidewalk_geom: Optional[Polygon],
+	road_lines: Sequence[LineString],
+	config: SpawnConfig,
+	footprints: Optional[Sequence[Polygon]] = None,
+	geographic: bool = True,
+) -> np.ndarray:
+	lines = np.asarray([line for line in road_lines if isinstance(line, LineString)], dtype=object)
+	if len(lines) == 0 or config.count <= 0:
+		return np.empty((0, 2))
+	frame = _metric_frame(lines, geographic)
+	lines = _to_frame(lines, frame)
+	lengths = shapely.length(lines)
+	valid = lengths > 0.0
+	lines, lengths = lines[valid], lengths[valid]
+	if len(lines) == 0:
+		return np.empty((0, 2))
+	cum = np.cumsum(lengths)
+
+	area = None
+	if sidewalk_geom is not None:
+		area = _to_frame(sidewalk_geom, frame)
+		shapely.prepare(area)
+	tree = None
+	if footprints is not None and len(footprints) > 0:
+		tree = STRtree(_to_frame(np.asarray(list(footprints), dtype=object), frame))
+	grid = _SpacingGrid(config.min_spacing_m) if config.min_spacing_m > 0.0 else None
+
+	rng = np.random.default_rng(config.seed)
+	chunks: List[np.ndarray] = []
+	total = 0
+	for _ in range(config.max_rounds):
+		need = config.count - total
+		xy = _sample_along_lines(lines, lengths, cum, int(need * 1.5) + 64, rng, config)
+		if area is not None:
+			xy = xy[shapely.contains_xy(area, xy[:, 0], xy[:, 1])]
+		if tree is not None and len(xy):
+			hits = tree.query(shapely.points(xy), predicate="intersects")
+			mask = np.ones(len(xy), dtype=bool)
+			mask[hits[0]] = False
+			xy = xy[mask]
+		if grid is not None:
+			xy = grid.accept(xy)
+		xy = xy[:need]
+		chunks.append(xy)
+		total += len(xy)
+		if total >= config.count:
+			break
+	if total < config.count:
+		print(f"[WARN] Only {total}/{config.count} spawn points fit the spacing/exclusion constraints")
+	return _from_frame(np.concatenate(chunks), frame)
+
+
+def generate_spawn_points(
+	sidewalk_geom: Optional[Polygon],
+	road_lines: Sequence[LineString],
+	out_csv: str,
+	config: SpawnConfig,
+	footprints: Optional[Sequence[Polygon]] = None,
+	geographic: bool = True,
+) -> int:
+	xy = sample_spawn_points(sidewalk_geom, road_lines, config, footprints, geographic)
+	pd.DataFrame({"x": xy[:, 0], "y": xy[:, 1], "z": 0.0, "spawn_tag": config.spawn_tag}).to_csv(
+		out_csv, index=False, columns=["x", "y", "z", "spawn_tag"]
+	)
+	return len(xy)
 
 
 def main() -> None:
@@ -140,30 +489,98 @@ def main() -> None:
 	group = parser.add_mutually_exclusive_group(required=False)
 	group.add_argument("--place", type=str, default="São Caetano do Sul, São Paulo, Brazil", help="Place name to geocode and export")
 	group.add_argument("--polygon", type=str, help="Path to a GeoJSON polygon FeatureCollection as AOI")
-	parser.add_argument("--output", type=str, default=os.path.join(\"unreal\", \"data\", \"generated\"), help="Output directory (default: unreal/data/generated)")
+	parser.add_argument("--output", type=str, default=os.path.join("unreal", "data", "generated"), help="Output directory (default: unreal/data/generated)")
 	parser.add_argument("--spawn-count", type=int, default=500, help="Approximate number of pedestrian spawn points")
+	parser.add_argument("--coord-precision", type=int, default=6, help="Decimal places kept in roads.geojson coordinates (default: 6, ~0.1 m)")
+	parser.add_argument("--buildings-simplify", type=float, default=0.5, help="Footprint simplification tolerance in meters (0 disables)")
+	parser.add_argument("--buildings-chunk-size", type=float, default=256.0, help="Grid cell size in meters for chunked building output (0 disables chunking)")
+	parser.add_argument("--buildings-format", choices=sorted(CHUNK_EXTENSIONS), default="geojson", help="Encoding of building chunks (parquet requires pyarrow)")
+	parser.add_argument("--no-buildings-geojson", action="store_true", help="Skip the monolithic buildings.geojson (chunks only)")
+	parser.add_argument("--routing", action="store_true", help="Embed CSR adjacency (travel-time weights) and SCC labels in lanes_graph.json")
+	parser.add_argument("--routing-ch", action="store_true", help="Also embed contraction-hierarchy ranks and shortcuts (implies --routing)")
+	parser.add_argument("--drop-islands", action="store_true", help="Keep only the largest strongly connected component of the lane graph")
+	parser.add_argument("--seed", type=int, default=42, help="Random seed for spawn point sampling (default: 42)")
+	parser.add_argument("--spawn-min-spacing", type=float, default=0.0, help="Poisson-disk minimum distance between spawn points in meters (0 disables)")
+	parser.add_argument("--spawn-offset-min", type=float, default=1.5, help="Minimum perpendicular offset from the road centerline in meters")
+	parser.add_argument("--spawn-offset-max", type=float, default=4.0, help="Maximum perpendicular offset from the road centerline in meters")
+	parser.add_argument("--profile", action="store_true", help="Dump cProfile stats per stage to <output>/profile")
 	args = parser.parse_args()
+	if args.buildings_format == "parquet":
+		try:
+			import pyarrow  # noqa: F401
+		except ImportError:
+			parser.error("--buildings-format parquet requires pyarrow (pip install pyarrow)")
 
 	paths = ensure_output_paths(args.output)
+	recorder = StageRecorder(paths.profile_dir if args.profile else None)
 	print(f"[OSM] Resolving geometry for {args.place or args.polygon}")
-	geom = load_place_geometry(args.place, args.polygon)
+	with recorder.stage("geocode"):
+		geom = load_place_geometry(args.place, args.polygon)
 
 	print("[OSM] Exporting roads...")
-	G, road_lines = export_roads(geom, paths.roads_geojson)
-	print(f"[OK] Roads -> {paths.roads_geojson}")
+	# Download and simplification are one stage: osmnx interleaves them (see download_road_graph)
+	with recorder.stage("roads_download") as stage:
+		G = download_road_graph(geom)
+		stage.count("nodes", G.number_of_nodes())
+		stage.count("edges", G.number_of_edges())
+	with recorder.stage("roads_write") as stage:
+		road_lines = stream_roads(G, paths.roads_geojson, args.coord_precision)
+		stage.count("features", len(road_lines))
+		stage.count("bytes", os.path.getsize(paths.roads_geojson))
+	roads_mb = os.path.getsize(paths.roads_geojson) / (1024.0 * 1024.0)
+	print(f"[OK] Roads ({len(road_lines)} lines, {roads_mb:.1f} MB, peak RSS {peak_rss_mb():.0f} MB) -> {paths.roads_geojson}")
 
 	print("[OSM] Exporting buildings...")
-	export_buildings(geom, paths.buildings_geojson)
-	print(f"[OK] Buildings -> {paths.buildings_geojson}")
+	buildings_config = BuildingsConfig(
+		simplify_m=args.buildings_simplify,
+		chunk_size_m=args.buildings_chunk_size,
+		chunk_format=args.buildings_format,
+		write_monolithic=not args.no_buildings_geojson,
+	)
+	with recorder.stage("buildings_download") as stage:
+		buildings = download_buildings(geom)
+		stage.count("features", len(buildings))
+	with recorder.stage("buildings_simplify") as stage:
+		buildings = simplify_footprints(buildings, buildings_config.simplify_m)
+		stage.count("features", len(buildings))
+	with recorder.stage("buildings_write") as stage:
+		footprints = write_buildings(buildings, paths, buildings_config)
+		stage.count("features", len(footprints))
+		if buildings_config.write_monolithic:
+			stage.count("bytes", os.path.getsize(paths.buildings_geojson))
+	del buildings
+	if buildings_config.write_monolithic:
+		print(f"[OK] Buildings -> {paths.buildings_geojson}")
+	if buildings_config.chunk_size_m > 0.0:
+		print(f"[OK] Building chunks -> {paths.buildings_chunks_dir} (index: {paths.buildings_index_json})")
 
 	print("[OSM] Building lane graph...")
-	graph_to_lane_json(G, paths.lanes_graph_json)
+	with recorder.stage("lane_graph") as stage:
+		node_count, edge_count = graph_to_lane_json(
+			G, paths.lanes_graph_json, routing=args.routing, contraction=args.routing_ch, drop_islands=args.drop_islands
+		)
+		stage.count("nodes", node_count)
+		stage.count("edges", edge_count)
+		stage.count("bytes", os.path.getsize(paths.lanes_graph_json))
 	print(f"[OK] Lane graph -> {paths.lanes_graph_json}")
 
 	print("[OSM] Generating spawn points...")
-	generate_spawn_points(geom, road_lines, paths.spawn_points_csv, args.spawn_count)
-	print(f"[OK] Spawn points -> {paths.spawn_points_csv}")
+	spawn_config = SpawnConfig(
+		count=args.spawn_count,
+		seed=args.seed,
+		min_offset_m=args.spawn_offset_min,
+		max_offset_m=args.spawn_offset_max,
+		min_spacing_m=args.spawn_min_spacing,
+	)
+	with recorder.stage("spawn_points") as stage:
+		spawned = generate_spawn_points(geom, road_lines, paths.spawn_points_csv, spawn_config, footprints)
+		stage.count("points", spawned)
+	print(f"[OK] Spawn points ({spawned}) -> {paths.spawn_points_csv}")
 
+	recorder.write(paths.report_json, aoi=args.place if not args.polygon else args.polygon, args=vars(args))
+	print(f"[OK] Report -> {paths.report_json}")
+	if args.profile:
+		print(f"[OK] Profiles -> {paths.profile_dir}")
 	print(f"[DONE] Export complete in {paths.output_dir}")
 
 
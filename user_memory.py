@@ -0,0 +1,397 @@
+"""
+Módulo de Memória do Agente por Usuário
+Nebula Agent v6.0
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .scenario_store import ScenarioStore, ScenarioEntry
+    from .metrics import AGENT_MEMORY_USERS, AGENT_MEMORY_BYTES, AGENT_MEMORY_EVICTIONS, AGENT_MEMORY_TRIMMED, SCENARIO_STORE_ENTRIES
+except ImportError:
+    from scenario_store import ScenarioStore, ScenarioEntry
+    from metrics import AGENT_MEMORY_USERS, AGENT_MEMORY_BYTES, AGENT_MEMORY_EVICTIONS, AGENT_MEMORY_TRIMMED, SCENARIO_STORE_ENTRIES
+
+# ============================================
+# CONFIGURAÇÃO
+# ============================================
+
+# Orçamento de cada usuário: cenários guardados e bytes aproximados (cenários, telas e contexto)
+MEMORY_MAX_ENTRIES = int(os.environ.get("NEBULA_MEMORY_MAX_ENTRIES", os.environ.get("SCENARIO_STORE_MAX", 1000)))
+MEMORY_MAX_BYTES = int(os.environ.get("NEBULA_MEMORY_MAX_BYTES", 1024 * 1024))
+# Memórias residentes no worker: número de usuários, bytes no total e tempo máximo ociosa (0 desativa)
+MEMORY_MAX_USERS = int(os.environ.get("NEBULA_MEMORY_MAX_USERS", 1000))
+MEMORY_TOTAL_BYTES = int(os.environ.get("NEBULA_MEMORY_TOTAL_BYTES", 256 * 1024 * 1024))
+MEMORY_IDLE_SECONDS = float(os.environ.get("NEBULA_MEMORY_IDLE_SECONDS", 3600))
+# Diretório (opcional) onde as memórias descartadas são gravadas e recarregadas após reiniciar
+MEMORY_DIR = os.environ.get("NEBULA_MEMORY_DIR") or None
+
+SCREEN_HISTORY_MAX = int(os.environ.get("SCREEN_HISTORY_MAX", 100))
+CONTEXT_MAX = 20
+# Jaccard mínimo entre intenções para servir um cenário do LLM já gerado (> 1 desativa)
+SCENARIO_REUSE_THRESHOLD = float(os.environ.get("SCENARIO_REUSE_THRESHOLD", 0.85))
+
+
+def approx_size(value: Any) -> int:
+    """Bytes aproximados de um valor JSON (dict, lista, string, número) em memória."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ============================================
+# MEMÓRIA DE UM USUÁRIO
+# ============================================
+
+class AgentMemory:
+    """
+    Memória e contexto do agente de um usuário. Os cenários ficam limitados a
+    `max_entries`; se o total aproximado passar de `max_bytes`, saem primeiro as telas
+    analisadas mais antigas (só histórico) e depois os cenários mais antigos, que
+    servem ao reaproveitamento. O contexto já é limitado às últimas CONTEXT_MAX mensagens.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES, max_bytes: int = MEMORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.conversation_context: List[Dict] = []
+        self.scenarios = ScenarioStore(max_entries, SCENARIO_REUSE_THRESHOLD)
+        self.analyzed_screens: deque = deque()
+        self.user_preferences: Dict = {}
+        self.last_access = time.monotonic()
+        # Alterada desde a última gravação em disco
+        self.dirty = False
+        self._screen_sizes: deque = deque()
+        self._screen_bytes = 0
+        self._context_bytes = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @property
+    def bytes(self) -> int:
+        """Bytes aproximados de cenários, telas analisadas e contexto."""
+        return self.scenarios.bytes + self._screen_bytes + self._context_bytes
+
+    def add_context(self, role: str, content: str):
+        """Adiciona contexto à memória."""
+        with self._lock:
+            self.conversation_context.append({
+                "role": role,
+                "content": content
+            })
+            # Manter apenas os últimos contextos
+            if len(self.conversation_context) > CONTEXT_MAX:
+                self.conversation_context = self.conversation_context[-CONTEXT_MAX:]
+            self._context_bytes = approx_size(self.conversation_context)
+            self.dirty = True
+            self._trim()
+
+    def get_context(self) -> List[Dict]:
+        """Retorna o contexto atual."""
+        return self.conversation_context
+
+    def add_scenario(self, scenario: Dict) -> ScenarioEntry:
+        """Adiciona um cenário gerado à memória (indexado para busca)."""
+        entry = self.scenarios.add(
+            scenario["intent"], scenario["screen_type"], scenario["gherkin"], scenario.get("source", "ml"),
+            scenario.get("created_at")
+        )
+        with self._lock:
+            self.dirty = True
+            self._trim()
+        return entry
+
+    def find_reusable_scenario(self, intent: str, screen_type: str) -> Optional[ScenarioEntry]:
+        """Cenário do LLM já gerado para uma intenção quase idêntica na mesma tela."""
+        return self.scenarios.find_reusable(intent, screen_type)
+
+    def similar_scenarios(self, text: str, limit: int = 5, screen_type: Optional[str] = None) -> List[Dict]:
+        """Cenários parecidos com o texto, do mais ao menos similar."""
+        return [
+            {**entry.to_dict(), "score": score}
+            for entry, score in self.scenarios.similar(text, limit, screen_type)
+        ]
+
+    def add_screen_analysis(self, analysis: Dict):
+        """Adiciona uma análise de tela à memória."""
+        size = approx_size(analysis)
+        with self._lock:
+            self.analyzed_screens.append(analysis)
+            self._screen_sizes.append(size)
+            self._screen_bytes += size
+            if len(self.analyzed_screens) > SCREEN_HISTORY_MAX:
+                self._pop_screen()
+            self.dirty = True
+            self._trim()
+
+    def _pop_screen(self) -> None:
+        self.analyzed_screens.popleft()
+        self._screen_bytes -= self._screen_sizes.popleft()
+
+    def _trim(self) -> None:
+        # Chamado com o lock: volta ao orçamento de bytes, dos itens mais antigos aos mais novos
+        while self.bytes > self.max_bytes:
+            if self.analyzed_screens:
+                self._pop_screen()
+                AGENT_MEMORY_TRIMMED.labels(kind="screen").inc()
+            elif self.scenarios.evict_oldest() is not None:
+                AGENT_MEMORY_TRIMMED.labels(kind="scenario").inc()
+            else:
+                break
+
+    def usage(self) -> Dict:
+        """Uso de memória do usuário em relação ao orçamento."""
+        return {
+            "scenarios": len(self.scenarios),
+            "screens": len(self.analyzed_screens),
+            "context_messages": len(self.conversation_context),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "idle_seconds": round(time.monotonic() - self.last_access, 1)
+        }
+
+    def to_dict(self) -> Dict:
+        """Conteúdo serializável em JSON (para gravar em disco)."""
+        with self._lock:
+            return {
+                "context": list(self.conversation_context),
+                "screens": list(self.analyzed_screens),
+                "scenarios": [entry.to_dict() for entry in self.scenarios.entries()],
+                "preferences": dict(self.user_preferences)
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict, max_entries: int = MEMORY_MAX_ENTRIES, max_bytes: int = MEMORY_MAX_BYTES) -> "AgentMemory":
+        """Reconstrói a memória gravada por `to_dict` (reindexando os cenários)."""
+        memory = cls(max_entries, max_bytes)
+        for item in data.get("scenarios", []):
+            entry = memory.scenarios.add(item["intent"], item["screen_type"], item["gherkin"], item["source"], item.get("created_at"))
+            entry.hits = item.get("reuses", 0)
+        for analysis in data.get("screens", [])[-SCREEN_HISTORY_MAX:]:
+            size = approx_size(analysis)
+            memory.analyzed_screens.append(analysis)
+            memory._screen_sizes.append(size)
+            memory._screen_bytes += size
+        memory.conversation_context = data.get("context", [])[-CONTEXT_MAX:]
+        memory._context_bytes = approx_size(memory.conversation_context)
+        memory.user_preferences = data.get("preferences", {})
+        with memory._lock:
+            memory._trim()
+        return memory
+
+
+# ============================================
+# GERENCIADOR DAS MEMÓRIAS POR USUÁRIO
+# ============================================
+
+class UserMemoryManager:
+    """
+    Memórias do agente por usuário, em ordem LRU. Cada memória respeita o orçamento do
+    usuário (`max_entries` / `max_bytes`); o gerenciador mantém no máximo `max_users`
+    memórias residentes e `total_bytes` somados, e descarta as ociosas há mais de
+    `idle_seconds`, sempre a partir da usada há mais tempo. Com `store_dir`, a memória
+    descartada é gravada em disco (JSON, um arquivo por usuário) e recarregada no
+    próximo acesso; `flush` grava todas, no encerramento. Os limites do gerenciador são
+    verificados a cada `get`.
+    """
+
+    def __init__(
+        self,
+        max_users: int = MEMORY_MAX_USERS,
+        total_bytes: int = MEMORY_TOTAL_BYTES,
+        idle_seconds: float = MEMORY_IDLE_SECONDS,
+        max_entries: int = MEMORY_MAX_ENTRIES,
+        max_bytes: int = MEMORY_MAX_BYTES,
+        store_dir: Optional[str] = MEMORY_DIR
+    ):
+        self.max_users = max_users
+        self.total_bytes = total_bytes
+        self.idle_seconds = idle_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.store_dir = store_dir
+        self.evictions = {"idle": 0, "users": 0, "bytes": 0}
+        self._memories: "OrderedDict[str, AgentMemory]" = OrderedDict()
+        # Descartadas cuja gravação em disco ainda não terminou (reaproveitadas se o usuário voltar)
+        self._saving: Dict[str, AgentMemory] = {}
+        self._lock = threading.Lock()
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+
+    def get(self, user_id: str) -> AgentMemory:
+        """Memória do usuário (carregada do disco ou criada vazia se não estiver residente)."""
+        with self._lock:
+            memory = self._memories.get(user_id) or self._saving.pop(user_id, None)
+        if memory is None:
+            # Leitura e reindexação fora do lock: não seguram os demais usuários
+            loaded = self._load(user_id)
+        with self._lock:
+            current = self._memories.get(user_id)
+            if current is not None:
+                memory = current
+            elif memory is None:
+                memory = loaded
+            self._memories[user_id] = memory
+            self._memories.move_to_end(user_id)
+            memory.last_access = time.monotonic()
+            evicted = self._collect_evictions(memory)
+        for evicted_id, evicted_memory in evicted:
+            self._release(evicted_id, evicted_memory)
+        return memory
+
+    def _collect_evictions(self, keep: AgentMemory) -> List[Tuple[str, AgentMemory]]:
+        # Chamado com o lock: retira da LRU as memórias que passaram dos limites
+        memories = self._memories
+        evicted = []
+
+        def pop_oldest(reason: str) -> bool:
+            user_id, memory = next(iter(memories.items()))
+            if memory is keep:
+                return False
+            del memories[user_id]
+            evicted.append((user_id, memory))
+            self.evictions[reason] += 1
+            AGENT_MEMORY_EVICTIONS.labels(reason=reason).inc()
+            return True
+
+        if self.idle_seconds > 0:
+            cutoff = time.monotonic() - self.idle_seconds
+            while memories and next(iter(memories.values())).last_access < cutoff and pop_oldest("idle"):
+                pass
+        while len(memories) > self.max_users and pop_oldest("users"):
+            pass
+        # O total só pode passar do limite se os orçamentos individuais somados passarem
+        if len(memories) * self.max_bytes > self.total_bytes:
+            total = sum(memory.bytes for memory in memories.values())
+            while total > self.total_bytes and len(memories) > 1:
+                size = next(iter(memories.values())).bytes
+                if not pop_oldest("bytes"):
+                    break
+                total -= size
+        if self.store_dir:
+            for user_id, memory in evicted:
+                if memory.dirty:
+                    self._saving[user_id] = memory
+        return evicted
+
+    def _release(self, user_id: str, memory: AgentMemory) -> None:
+        if not self.store_dir or not memory.dirty:
+            return
+        self._save(user_id, memory)
+        with self._lock:
+            if self._saving.get(user_id) is memory:
+                del self._saving[user_id]
+
+    def _path(self, user_id: str) -> str:
+        # IDs de usuário são livres: o nome do arquivo é um hash
+        digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.store_dir, f"{digest}.json")
+
+    def _save(self, user_id: str, memory: AgentMemory) -> bool:
+        path = self._path(user_id)
+        # Uma gravação por memória por vez: a última a terminar é a mais recente
+        with memory._save_lock:
+            memory.dirty = False
+            data = {"user_id": user_id, **memory.to_dict()}
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+                return True
+            except (OSError, TypeError, ValueError) as e:
+                memory.dirty = True
+                print(f"⚠️ Erro ao gravar a memória do usuário {user_id}: {e}")
+                return False
+
+    def _load(self, user_id: str) -> AgentMemory:
+        if self.store_dir:
+            path = self._path(user_id)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("user_id") == user_id:
+                    return AgentMemory.from_dict(data, self.max_entries, self.max_bytes)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Memória gravada do usuário {user_id} ignorada: {e}")
+        return AgentMemory(self.max_entries, self.max_bytes)
+
+    def flush(self) -> int:
+        """Grava em disco as memórias alteradas (residentes ou em descarte). Retorna quantas."""
+        if not self.store_dir:
+            return 0
+        with self._lock:
+            pending = list(self._memories.items()) + list(self._saving.items())
+        return sum(self._save(user_id, memory) for user_id, memory in pending if memory.dirty)
+
+    def usage(self, user_id: str) -> Optional[Dict]:
+        """Uso de memória de um usuário (sem carregá-lo). None se não houver memória."""
+        with self._lock:
+            memory = self._memories.get(user_id)
+        if memory is not None:
+            return {"user_id": user_id, "resident": True, **memory.usage()}
+        if self.store_dir:
+            try:
+                return {"user_id": user_id, "resident": False, "bytes_on_disk": os.path.getsize(self._path(user_id))}
+            except OSError:
+                pass
+        return None
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            memories = list(self._memories.values())
+        return sum(memory.bytes for memory in memories)
+
+    def resident_scenarios(self) -> int:
+        with self._lock:
+            memories = list(self._memories.values())
+        return sum(len(memory.scenarios) for memory in memories)
+
+    def stats(self, limit: int = 50) -> Dict:
+        """Resumo do gerenciador e os `limit` usuários residentes que mais usam memória."""
+        with self._lock:
+            items = list(self._memories.items())
+        users = sorted(
+            ({"user_id": user_id, **memory.usage()} for user_id, memory in items),
+            key=lambda usage: usage["bytes"],
+            reverse=True
+        )
+        return {
+            "users": len(items),
+            "bytes": sum(usage["bytes"] for usage in users),
+            "limits": {
+                "max_users": self.max_users,
+                "total_bytes": self.total_bytes,
+                "idle_seconds": self.idle_seconds,
+                "max_entries_per_user": self.max_entries,
+                "max_bytes_per_user": self.max_bytes
+            },
+            "persistent": bool(self.store_dir),
+            "evictions": dict(self.evictions),
+            "top_users": users[:limit]
+        }
+
+    def __len__(self) -> int:
+        return len(self._memories)
+
+
+# ============================================
+# INSTÂNCIA GLOBAL
+# ============================================
+
+agent_memories = UserMemoryManager()
+AGENT_MEMORY_USERS.set_function(lambda: len(agent_memories))
+AGENT_MEMORY_BYTES.set_function(agent_memories.resident_bytes)
+SCENARIO_STORE_ENTRIES.set_function(agent_memories.resident_scenarios)